@@ -209,6 +209,12 @@ backup_config() {
 
 # Función para limpiar backups antiguos
 clean_old_backups() {
+    # El panel web aplica su propia política de retención por tipo
+    if [ "${BACKUP_RETENTION_MANAGED:-0}" = "1" ]; then
+        echo -e "${BLUE}ℹ Retención gestionada por el panel web${NC}"
+        return 0
+    fi
+    
     echo -e "${YELLOW}🧹 Limpiando backups antiguos (más de $MAX_BACKUPS días)...${NC}"
     
     local COUNT=$(find "$BACKUP_DIR" -name "backup-*.tar.gz" -mtime +$MAX_BACKUPS 2>/dev/null | wc -l)
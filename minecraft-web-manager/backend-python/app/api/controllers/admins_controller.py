@@ -7,7 +7,7 @@ from datetime import datetime
 
 from app.db.session import get_db
 from app.models.user import User
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 
 
 router = APIRouter()
@@ -61,7 +61,7 @@ async def add_admin(request: AdminRequest, db: Session = Depends(get_db)):
         # Crear nuevo usuario
         new_user = User(
             username=request.username,
-            password_hash=get_password_hash(request.password),
+            password_hash=await get_password_hash_async(request.password),
             role=request.role,
             created_at=datetime.utcnow()
         )
@@ -104,7 +104,7 @@ async def update_admin(user_id: int, request: AdminRequest, db: Session = Depend
         
         # Si se proporciona nueva contraseña
         if request.password:
-            user.password_hash = get_password_hash(request.password)
+            user.password_hash = await get_password_hash_async(request.password)
         
         db.commit()
         db.refresh(user)
@@ -1,7 +1,8 @@
 """Controlador para gestión de baneos"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 from typing import Optional
+from app.core.deps import require_moderator
 from app.services.ban_service import ban_service
 
 
@@ -64,6 +65,8 @@ async def ban_player(request: BanPlayerRequest):
             raise HTTPException(status_code=400, detail="No se pudo banear al jugador")
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -88,6 +91,8 @@ async def ban_ip(request: BanIPRequest):
             raise HTTPException(status_code=400, detail="No se pudo banear la IP")
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -107,9 +112,9 @@ async def pardon_player(uuid: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.delete("/ip/{ip}")
+@router.delete("/ip/{ip:path}")
 async def pardon_ip(ip: str):
-    """Perdonar/desbanear una IP"""
+    """Perdonar/desbanear una IP o un rango CIDR"""
     try:
         success = await ban_service.pardon_ip(ip)
         if success:
@@ -122,6 +127,48 @@ async def pardon_ip(ip: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/import")
+async def import_bans(
+    request: Request,
+    kind: str = Query("players", pattern="^(players|ips)$"),
+    action: str = Query("ban", pattern="^(ban|pardon)$"),
+    format: Optional[str] = Query(None, pattern="^(csv|json|ndjson)$"),
+    moderator: Optional[str] = None,
+    current_user = Depends(require_moderator)
+):
+    """
+    Importar baneos/perdones en bloque (CSV, JSON o NDJSON en el cuerpo)
+    
+    La importación corre en segundo plano; el progreso se consulta en
+    GET /import/{job_id}. Con el servidor en marcha solo se aplican las
+    entradas que se pueden enviar por RCON (baneos permanentes con nombre).
+    """
+    try:
+        content = (await request.body()).decode("utf-8-sig")
+        job = ban_service.start_import(
+            content,
+            kind=kind,
+            action=action,
+            fmt=format,
+            content_type=request.headers.get("content-type"),
+            moderator=moderator or current_user.username
+        )
+        return job
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/import/{job_id}")
+async def get_import_status(job_id: str, current_user = Depends(require_moderator)):
+    """Progreso de una importación masiva"""
+    job = ban_service.get_import(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return job
+
+
 @router.get("/stats")
 async def get_ban_stats():
     """Obtener estadísticas de baneos"""
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Dict, Any
 
 from app.services.config_service import ConfigService
-from app.models.audit_log import AuditLog
+from app.services.audit_service import audit_writer
 
 
 class ConfigController:
@@ -32,14 +32,12 @@ class ConfigController:
             await self.config_service.update_server_properties(properties)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="update_server_properties",
                 resource_type="config",
                 resource_id="server.properties"
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": "Server.properties actualizado correctamente"}
         except Exception as e:
@@ -70,14 +68,12 @@ class ConfigController:
             await self.config_service.update_whitelist(whitelist)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="update_whitelist",
                 resource_type="config",
                 resource_id="whitelist.json"
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": "Whitelist actualizada correctamente"}
         except Exception as e:
@@ -108,14 +104,12 @@ class ConfigController:
             await self.config_service.update_ops(ops)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="update_ops",
                 resource_type="config",
                 resource_id="ops.json"
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": "Ops actualizados correctamente"}
         except Exception as e:
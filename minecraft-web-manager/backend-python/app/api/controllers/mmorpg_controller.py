@@ -1,21 +1,38 @@
 """Controlador API para plugins MMORPG"""
-from fastapi import APIRouter, HTTPException, Query, Body, Depends
+from fastapi import APIRouter, HTTPException, Query, Body, Depends, Request
 
 from app.services.mmorpg_service import mmorpg_service
 from app.services.worldedit_service import worldedit_service
 from app.services.luckperms_service import luckperms_service
 from app.services.worldguard_service import worldguard_service
 from app.core.deps import require_any_role, require_moderator
+from app.core.http_cache import RouteCache
 
 router = APIRouter()
 
 
+def _plugin_config_files(plugin_id: str):
+    """Carpeta del plugin y su config.yml (el resto de archivos los cubre el TTL)"""
+    info = mmorpg_service.get_plugin(plugin_id)
+    if not info:
+        return []
+    folder = mmorpg_service.plugins_path / info["folder"]
+    return [folder, folder / "config.yml"]
+
+
+status_cache = RouteCache(ttl=60, watch=lambda: [mmorpg_service.plugins_path])
+config_cache = RouteCache(ttl=30, watch=_plugin_config_files)
+
+
 @router.get("/status")
-async def get_status():
+async def get_status(request: Request):
     """Estado de plugins MMORPG"""
-    status = mmorpg_service.get_status()
-    any_enabled = any(item["enabled"] for item in status.values())
-    return {"status": status, "any_enabled": any_enabled}
+    def load():
+        status = mmorpg_service.get_status()
+        any_enabled = any(item["enabled"] for item in status.values())
+        return {"status": status, "any_enabled": any_enabled}
+    
+    return await status_cache.respond(request, load)
 
 
 @router.get("/{plugin_id}/files")
@@ -40,8 +57,13 @@ async def read_file(plugin_id: str, path: str = Query(...)):
 
 
 @router.get("/{plugin_id}/config")
-async def get_plugin_config(plugin_id: str, current_user = Depends(require_any_role)):
+async def get_plugin_config(plugin_id: str, request: Request, current_user = Depends(require_any_role)):
     """Obtener configuración visual para un plugin MMORPG (si está soportado)"""
+    return await config_cache.respond(request, lambda: _load_plugin_config(plugin_id), plugin_id)
+
+
+def _load_plugin_config(plugin_id: str):
+    """Configuración visual de un plugin (sin caché)"""
     # Soportar WorldEdit y LuckPerms
     if plugin_id == 'worldedit':
         try:
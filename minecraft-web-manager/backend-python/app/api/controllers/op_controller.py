@@ -1,8 +1,9 @@
 """Controlador para gestión de operadores"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
 from app.services.op_service import op_service
+from app.services.permission_index import permission_index
 
 
 router = APIRouter()
@@ -121,3 +122,34 @@ async def update_op_config(request: UpdateOpConfigRequest):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/permissions/who")
+async def who_can(
+    permission: str = Query(..., min_length=1),
+    min_op_level: int = Query(1, ge=1, le=4)
+):
+    """Jugadores con un permiso (LuckPerms u OP)"""
+    try:
+        return await permission_index.who_can(permission, min_op_level)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/permissions/groups")
+async def get_permission_groups():
+    """Grupos de LuckPerms"""
+    try:
+        groups = await permission_index.get_groups()
+        return {"groups": groups, "total": len(groups)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/permissions/{uuid}")
+async def get_player_permissions(uuid: str):
+    """Grupos, permisos propios y nivel de OP de un jugador"""
+    try:
+        return await permission_index.get_player_permissions(uuid)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
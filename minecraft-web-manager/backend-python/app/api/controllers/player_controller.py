@@ -1,8 +1,10 @@
 """Controlador para gestión de jugadores"""
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel, Field
 from typing import List, Optional
+from app.services.avatar_service import avatar_service, AVATAR_SIZES
 from app.services.player_service import player_service
+from app.services.player_tracker import player_tracker
 
 
 router = APIRouter()
@@ -17,6 +19,10 @@ class UUIDLookupRequest(BaseModel):
     username: str
 
 
+class BulkUUIDLookupRequest(BaseModel):
+    usernames: List[str] = Field(..., max_length=500)
+
+
 @router.get("/online")
 async def get_online_players():
     """Obtener jugadores conectados actualmente"""
@@ -27,6 +33,32 @@ async def get_online_players():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/sessions")
+async def get_player_sessions(
+    name: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    """Historial de sesiones (entradas/salidas leídas de latest.log)"""
+    try:
+        return await player_tracker.get_sessions(name, limit, offset)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/playtime")
+async def get_playtime(
+    days: Optional[int] = Query(None, ge=1),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """Ranking de tiempo de juego por jugador"""
+    try:
+        players = await player_tracker.get_playtime(days, limit)
+        return {"players": players, "total": len(players)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/history")
 async def get_player_history():
     """Obtener historial completo de jugadores"""
@@ -38,15 +70,49 @@ async def get_player_history():
 
 
 @router.get("/search")
-async def search_players(q: str):
+async def search_players(q: str, limit: Optional[int] = Query(None, ge=1, le=1000)):
     """Buscar jugadores por nombre"""
     try:
-        players = await player_service.search_player(q)
+        players = await player_service.search_player(q, limit)
         return {"players": players, "total": len(players)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/autocomplete")
+async def autocomplete_players(q: str, limit: int = Query(10, ge=1, le=100)):
+    """Sugerir jugadores por inicio de nombre"""
+    try:
+        players = await player_service.autocomplete_player(q, limit)
+        return {"players": players, "total": len(players)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/avatar/{player}")
+async def get_player_avatar(
+    player: str,
+    request: Request,
+    size: int = Query(64)
+):
+    """Avatar del jugador (cabeza + capa exterior) servido desde caché local"""
+    if size not in AVATAR_SIZES:
+        raise HTTPException(status_code=400, detail=f"Tamaños válidos: {', '.join(map(str, AVATAR_SIZES))}")
+    
+    try:
+        content, etag, max_age = await avatar_service.get_avatar(player, size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}"
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="image/png", headers=headers)
+
+
 @router.get("/{uuid}")
 async def get_player_by_uuid(uuid: str):
     """Obtener detalles de un jugador por UUID"""
@@ -103,3 +169,13 @@ async def lookup_uuid(request: UUIDLookupRequest):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/uuid-lookup/bulk")
+async def lookup_uuids(request: BulkUUIDLookupRequest):
+    """Obtener UUIDs de varios jugadores (historial local + Mojang en lotes)"""
+    try:
+        results = await player_service.resolve_uuids(request.usernames)
+        return {"players": results, "total": sum(1 for r in results.values() if r)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
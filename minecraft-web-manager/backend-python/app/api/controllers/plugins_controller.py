@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.services.plugin_service import PluginService
 from app.services.recommended_plugins_service import recommended_plugins_service
-from app.models.audit_log import AuditLog
+from app.services.audit_service import audit_writer
 
 
 class PluginsController:
@@ -33,15 +33,13 @@ class PluginsController:
             result = await self.plugin_service.toggle_plugin(plugin_name)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="toggle_plugin",
                 resource_type="plugin",
                 resource_id=plugin_name,
                 details=result
             )
-            db.add(audit)
-            db.commit()
             
             return {
                 "message": f"Plugin {'habilitado' if result['enabled'] else 'deshabilitado'} correctamente",
@@ -64,14 +62,12 @@ class PluginsController:
             await self.plugin_service.delete_plugin(plugin_name)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="delete_plugin",
                 resource_type="plugin",
                 resource_id=plugin_name
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": f"Plugin '{plugin_name}' eliminado correctamente"}
         except Exception as e:
@@ -119,15 +115,13 @@ class PluginsController:
                 )
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="install_recommended_plugin",
                 resource_type="plugin",
                 resource_id=plugin_id,
                 details=json.dumps(result)
             )
-            db.add(audit)
-            db.commit()
             
             return result
         except HTTPException:
@@ -155,15 +149,13 @@ class PluginsController:
                 )
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="uninstall_recommended_plugin",
                 resource_type="plugin",
                 resource_id=plugin_id,
                 details=json.dumps(result)
             )
-            db.add(audit)
-            db.commit()
             
             return result
         except HTTPException:
@@ -1,8 +1,9 @@
 """Controlador para gestión de Resource Packs"""
-from fastapi import APIRouter, HTTPException, UploadFile, File, Body, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Body, Depends, Request
 from pydantic import BaseModel
 from typing import List, Optional
 from pathlib import Path
+from app.core.http_cache import RouteCache
 from app.services.resourcepack_service import resourcepack_service
 from urllib.parse import urlparse
 from sqlalchemy.orm import Session
@@ -12,6 +13,15 @@ from app.models.app_settings import AppSettings
 
 router = APIRouter()
 
+status_cache = RouteCache(ttl=60, watch=lambda: [
+    resourcepack_service.plugin_jar,
+    resourcepack_service.config_file,
+    resourcepack_service.plugin_path,
+    resourcepack_service.output_path / "ResourcePackManager_RSP.zip"
+])
+packs_cache = RouteCache(ttl=60, watch=lambda: [resourcepack_service.mixer_path])
+compatible_plugins_cache = RouteCache(ttl=60, watch=lambda: [resourcepack_service.compatible_plugins_path])
+
 
 class ConfigUpdate(BaseModel):
     autoHost: Optional[bool] = None
@@ -230,11 +240,10 @@ async def host_rollback():
 
 
 @router.get("/status")
-async def get_status():
+async def get_status(request: Request):
     """Obtener estado del plugin ResourcePackManager"""
     try:
-        status = resourcepack_service.get_plugin_status()
-        return status
+        return await status_cache.respond(request, resourcepack_service.get_plugin_status)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -305,14 +314,17 @@ async def update_priority(data: PriorityUpdate):
 
 
 @router.get("/packs")
-async def list_packs():
+async def list_packs(request: Request):
     """Listar resource packs en mixer/"""
     try:
         if not resourcepack_service.is_plugin_installed():
             raise HTTPException(status_code=404, detail="Plugin no instalado")
         
-        packs = resourcepack_service.list_mixer_packs()
-        return {"packs": packs, "total": len(packs)}
+        def load():
+            packs = resourcepack_service.list_mixer_packs()
+            return {"packs": packs, "total": len(packs)}
+        
+        return await packs_cache.respond(request, load)
     except HTTPException:
         raise
     except Exception as e:
@@ -372,14 +384,17 @@ async def delete_pack(filename: str):
 
 
 @router.get("/plugins")
-async def list_compatible_plugins():
+async def list_compatible_plugins(request: Request):
     """Listar plugins compatibles detectados"""
     try:
         if not resourcepack_service.is_plugin_installed():
             raise HTTPException(status_code=404, detail="Plugin no instalado")
         
-        plugins = resourcepack_service.list_compatible_plugins()
-        return {"plugins": plugins, "total": len(plugins)}
+        def load():
+            plugins = resourcepack_service.list_compatible_plugins()
+            return {"plugins": plugins, "total": len(plugins)}
+        
+        return await compatible_plugins_cache.respond(request, load)
     except HTTPException:
         raise
     except Exception as e:
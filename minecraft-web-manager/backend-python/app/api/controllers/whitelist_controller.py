@@ -1,6 +1,7 @@
 """Controlador para gestión de whitelist"""
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from typing import List, Optional
 from app.services.whitelist_service import whitelist_service
 
 
@@ -12,6 +13,16 @@ class AddToWhitelistRequest(BaseModel):
     uuid: str
 
 
+class WhitelistEntry(BaseModel):
+    name: Optional[str] = None
+    uuid: Optional[str] = None
+
+
+class SyncWhitelistRequest(BaseModel):
+    players: List[WhitelistEntry]
+    dry_run: bool = False
+
+
 class ToggleWhitelistRequest(BaseModel):
     enabled: bool
 
@@ -75,6 +86,20 @@ async def clear_whitelist():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/sync")
+async def sync_whitelist(request: SyncWhitelistRequest):
+    """
+    Sincronizar la whitelist con una lista deseada
+    
+    Solo se aplica la diferencia; con dry_run se devuelve sin aplicarla.
+    """
+    try:
+        desired = [player.model_dump() for player in request.players]
+        return await whitelist_service.sync_whitelist(desired, dry_run=request.dry_run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/status")
 async def get_whitelist_status():
     """Obtener estado de la whitelist"""
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.services.world_service import WorldService
 from app.services.server_service import ServerService
-from app.models.audit_log import AuditLog
+from app.services.audit_service import audit_writer
 
 
 class WorldsController:
@@ -78,15 +78,13 @@ class WorldsController:
             )
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="create_world",
                 resource_type="world",
                 resource_id=world["id"],
                 details={"name": name}
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": "Mundo creado correctamente", "world": world}
         except Exception as e:
@@ -107,15 +105,13 @@ class WorldsController:
             world = await self.world_service.update_world(world_id, metadata)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="update_world",
                 resource_type="world",
                 resource_id=world_id,
                 details=metadata
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": "Mundo actualizado correctamente", "world": world}
         except Exception as e:
@@ -143,14 +139,12 @@ class WorldsController:
             result = await self.world_service.activate_world(world_id)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="activate_world",
                 resource_type="world",
                 resource_id=world_id
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": f"Mundo '{world_id}' activado correctamente", "result": result}
         except HTTPException:
@@ -180,14 +174,12 @@ class WorldsController:
             await self.world_service.delete_world(world_id)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="delete_world",
                 resource_type="world",
                 resource_id=world_id
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": f"Mundo '{world_id}' eliminado correctamente"}
         except HTTPException:
@@ -221,14 +213,12 @@ class WorldsController:
             await self.world_service.update_world_properties(world_id, properties)
             
             # Audit log
-            audit = AuditLog(
+            audit_writer.record(
                 user_id=user_id,
                 action="update_world_properties",
                 resource_type="world",
                 resource_id=world_id
             )
-            db.add(audit)
-            db.commit()
             
             return {"message": "Properties actualizadas correctamente"}
         except Exception as e:
@@ -0,0 +1,91 @@
+"""Router de consulta y retención del registro de auditoría"""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core.deps import require_admin
+from app.services.audit_service import audit_service, audit_writer
+
+router = APIRouter(prefix="/api/audit", tags=["audit"])
+
+# Mayor id que admite SQLite (INTEGER de 64 bits)
+MAX_CURSOR = 2 ** 63 - 1
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[int]:
+    """next_cursor recibido del cliente, o 400 si no es uno válido"""
+    if cursor is None or cursor == "":
+        return None
+    if not (cursor.isascii() and cursor.isdigit()) or not 1 <= int(cursor) <= MAX_CURSOR:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return int(cursor)
+
+
+@router.get("/")
+async def list_audit_logs(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user = Depends(require_admin)
+):
+    """Eventos del más reciente al más antiguo (paginado con next_cursor)"""
+    return await audit_service.query(
+        limit=limit,
+        cursor=_parse_cursor(cursor),
+        user_id=user_id,
+        action=action,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        date_from=date_from,
+        date_to=date_to
+    )
+
+
+@router.get("/export")
+async def export_audit_logs(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user = Depends(require_admin)
+):
+    """Exportar los eventos filtrados como NDJSON (una línea JSON por evento)"""
+    filename = f"audit-{datetime.now().strftime('%Y%m%d-%H%M%S')}.ndjson"
+    return StreamingResponse(
+        audit_service.export_ndjson(
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            date_from=date_from,
+            date_to=date_to
+        ),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/archive")
+async def archive_audit_logs(
+    older_than_days: Optional[int] = Query(None, ge=1),
+    current_user = Depends(require_admin)
+):
+    """Archivar ahora los eventos antiguos (por defecto AUDIT_RETENTION_DAYS)"""
+    result = await audit_service.archive_old(older_than_days)
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["message"])
+
+    audit_writer.record(
+        user_id=current_user.id,
+        action="archive_audit_logs",
+        resource_type="audit",
+        details={"archived": result["archived"], "files": result["files"]}
+    )
+    return result
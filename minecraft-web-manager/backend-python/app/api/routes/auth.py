@@ -1,13 +1,24 @@
 """Router de autenticación"""
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Cookie, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
-from app.models.session import Session as DBSession
-from app.core.security import verify_password, create_access_token, create_refresh_token
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    get_password_hash_async,
+    needs_rehash,
+    verify_password_async
+)
 from app.core.deps import get_current_user_from_cookie
+from app.core.rate_limit import login_rate_limiter
+from app.core.user_cache import user_cache
 from app.schemas.schemas import LoginRequest, UserResponse, MessageResponse
+from app.services.session_service import session_service
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -15,18 +26,34 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 @router.post("/login")
 async def login(
     credentials: LoginRequest,
+    request: Request,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login con usuario y contraseña"""
+    # Límite de intentos antes de gastar CPU en bcrypt
+    retry_after = login_rate_limiter.check(request.client.host, credentials.username)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos de login, inténtalo más tarde",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+    
     # Buscar usuario
-    user = db.query(User).filter(User.username == credentials.username).first()
+    user = await db.scalar(select(User).where(User.username == credentials.username))
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user or not await verify_password_async(credentials.password, user.password_hash):
+        login_rate_limiter.failed(request.client.host, credentials.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos"
         )
+    login_rate_limiter.succeeded(request.client.host, credentials.username)
+    
+    # Actualizar el hash si cambió el coste de bcrypt
+    if needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash_async(credentials.password)
     
     # Crear tokens
     token_data = {"user_id": user.id, "username": user.username, "role": user.role}
@@ -34,18 +61,18 @@ async def login(
     refresh_token = create_refresh_token(token_data)
     
     # Guardar sesión en BD
-    session = DBSession(
+    await session_service.create(
+        db,
         user_id=user.id,
-        token=access_token,
+        access_token=access_token,
         refresh_token=refresh_token,
         expires_at=datetime.utcnow() + timedelta(hours=2)
     )
-    db.add(session)
     
     # Actualizar last_login
     user.last_login = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     # Establecer cookies HttpOnly
     response.set_cookie(
@@ -78,7 +105,7 @@ async def login(
 async def logout(
     response: Response,
     current_user: User = Depends(get_current_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Logout - eliminar cookies y sesión"""
     # Eliminar cookies
@@ -86,12 +113,61 @@ async def logout(
     response.delete_cookie("refresh_token")
     
     # Eliminar sesiones de BD
-    db.query(DBSession).filter(DBSession.user_id == current_user.id).delete()
-    db.commit()
+    await session_service.delete_for_user(db, current_user.id)
+    await db.commit()
+    user_cache.invalidate_user(current_user.id)
     
     return {"success": True, "message": "Logout exitoso"}
 
 
+@router.post("/refresh")
+async def refresh(
+    response: Response,
+    refresh_token: Optional[str] = Cookie(None, alias="refresh_token"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Renovar el access token con el refresh token de la cookie"""
+    payload = decode_token(refresh_token) if refresh_token else None
+    if not payload or payload.get("type") != "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido o expirado"
+        )
+    
+    # La sesión debe seguir existiendo (logout y la purga la eliminan)
+    session = await session_service.get_by_refresh_token(db, refresh_token)
+    user = await db.get(User, session.user_id) if session else None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido o expirado"
+        )
+    
+    # Rol y nombre actuales, no los del token original
+    token_data = {"user_id": user.id, "username": user.username, "role": user.role}
+    access_token = create_access_token(token_data)
+    session_service.rotate_access_token(session, access_token)
+    await db.commit()
+    
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        httponly=True,
+        samesite="lax",
+        secure=False  # Cambiar a True en producción con HTTPS
+    )
+    
+    return {
+        "success": True,
+        "message": "Token renovado",
+        "user": {
+            "id": user.id,
+            "username": user.username,
+            "role": user.role
+        }
+    }
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     current_user: User = Depends(get_current_user_from_cookie)
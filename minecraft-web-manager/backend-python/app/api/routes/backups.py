@@ -1,18 +1,50 @@
 """Router de sistema de backups"""
-from fastapi import APIRouter, Depends
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.core.deps import require_any_role, require_moderator, require_admin
-from app.schemas.schemas import BackupInfo, CreateBackupRequest, MessageResponse
+from app.db.session import get_async_db
+from app.schemas.schemas import (
+    BackupInfo,
+    CreateBackupRequest,
+    MessageResponse,
+    ScheduledBackupRequest,
+    ScheduledBackupInfo
+)
+from app.models.scheduled_backup import ScheduledBackup
 from app.services.backup_service import backup_service
+from app.services.backup_scheduler import backup_scheduler, CronExpression
+from app.services.backup_verifier import backup_verifier
 
 router = APIRouter(prefix="/api/backups", tags=["backups"])
 
 
 @router.get("/", response_model=List[BackupInfo])
-async def list_backups(current_user = Depends(require_any_role)):
-    """Listar backups disponibles"""
-    backups = await backup_service.list_backups()
-    return backups
+async def list_backups(
+    response: Response,
+    type: Optional[str] = Query(None, pattern="^(full|world|plugins|config)$"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_size_mb: Optional[float] = None,
+    max_size_mb: Optional[float] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user = Depends(require_any_role)
+):
+    """Listar backups disponibles (paginado; total en X-Total-Count)"""
+    result = await backup_service.list_backups(
+        backup_type=type,
+        date_from=date_from,
+        date_to=date_to,
+        min_size_mb=min_size_mb,
+        max_size_mb=max_size_mb,
+        limit=limit,
+        offset=offset
+    )
+    response.headers["X-Total-Count"] = str(result["total"])
+    return result["backups"]
 
 
 @router.post("/", response_model=MessageResponse)
@@ -28,6 +60,89 @@ async def create_backup(
     return result
 
 
+@router.post("/retention")
+async def apply_retention(
+    dry_run: bool = True,
+    current_user = Depends(require_admin)
+):
+    """Aplicar política de retención (dry_run=true solo muestra qué se borraría)"""
+    return await backup_service.apply_retention(dry_run=dry_run)
+
+
+@router.post("/{backup_id}/verify")
+async def verify_backup(backup_id: int, current_user = Depends(require_moderator)):
+    """Verificar integridad de un backup (checksum, gzip y cabeceras tar)"""
+    result = await backup_verifier.verify(backup_id)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["message"])
+    return result
+
+
+@router.post("/{backup_id}/upload")
+async def upload_backup(backup_id: int, current_user = Depends(require_admin)):
+    """Copiar un backup al destino remoto configurado"""
+    result = await backup_service.upload_backup(backup_id)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    return result
+
+
+@router.get("/schedules", response_model=List[ScheduledBackupInfo])
+async def list_schedules(
+    current_user = Depends(require_any_role),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Listar backups programados"""
+    result = await db.scalars(select(ScheduledBackup).order_by(ScheduledBackup.id))
+    return result.all()
+
+
+@router.post("/schedules", response_model=ScheduledBackupInfo)
+async def create_schedule(
+    schedule_req: ScheduledBackupRequest,
+    current_user = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Crear backup programado"""
+    try:
+        cron = CronExpression(schedule_req.cron_expression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    schedule = ScheduledBackup(
+        name=schedule_req.name,
+        type=schedule_req.type,
+        cron_expression=cron.expression,
+        enabled=schedule_req.enabled,
+        next_run=cron.next_after(datetime.now())
+    )
+    db.add(schedule)
+    await db.commit()
+    await db.refresh(schedule)
+    
+    await backup_scheduler.reload()
+    return schedule
+
+
+@router.delete("/schedules/{schedule_id}", response_model=MessageResponse)
+async def delete_schedule(
+    schedule_id: int,
+    current_user = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Eliminar backup programado"""
+    schedule = await db.get(ScheduledBackup, schedule_id)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Programación no encontrada")
+    
+    name = schedule.name
+    await db.delete(schedule)
+    await db.commit()
+    
+    await backup_scheduler.reload()
+    return {"success": True, "message": f"Programación '{name}' eliminada"}
+
+
 @router.delete("/{filename}", response_model=MessageResponse)
 async def delete_backup(filename: str, current_user = Depends(require_admin)):
     """Eliminar backup"""
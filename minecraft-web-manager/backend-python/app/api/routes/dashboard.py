@@ -0,0 +1,32 @@
+"""Router del resumen del dashboard"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.deps import require_any_role
+from app.services.dashboard_service import dashboard_service
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+@router.get("/summary")
+async def get_dashboard_summary(
+    request: Request,
+    sections: Optional[str] = Query(None, description="Secciones separadas por comas (server,system,worlds,backups,plugins)"),
+    current_user = Depends(require_any_role)
+):
+    """Todo lo que pinta el dashboard en una petición (ETag + If-None-Match)"""
+    requested = [s.strip() for s in sections.split(",") if s.strip()] if sections else None
+    try:
+        payload, etag = await dashboard_service.get_summary(requested)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    # El middleware de compresión entrega el ETag como débil (W/"...")
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags or etag in tags or f"W/{etag}" in tags:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(jsonable_encoder(payload), headers=headers)
@@ -0,0 +1,24 @@
+"""Router de métricas Prometheus"""
+import hmac
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Métricas en formato de texto Prometheus (Bearer METRICS_TOKEN)"""
+    if not settings.metrics_active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,7 +1,8 @@
 """Router de gestión de plugins"""
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request
 from typing import List
 from app.core.deps import require_any_role, require_moderator, require_admin, get_db
+from app.core.http_cache import RouteCache
 from app.schemas.schemas import PluginInfo, MessageResponse
 from app.services.plugin_service import plugin_service
 from app.api.controllers.plugins_controller import PluginsController
@@ -10,12 +11,15 @@ from sqlalchemy.orm import Session
 router = APIRouter(prefix="/api/plugins", tags=["plugins"])
 plugins_controller = PluginsController()
 
+# Renombrar, subir o borrar un .jar cambia el mtime de plugins/
+plugins_cache = RouteCache(ttl=30, watch=lambda: [plugin_service.plugins_path], model=List[PluginInfo])
+recommended_cache = RouteCache(ttl=300, watch=lambda: [plugin_service.plugins_path])
 
-@router.get("/", response_model=List[PluginInfo])
-async def list_plugins(current_user = Depends(require_any_role)):
+
+@router.get("/", responses={200: {"model": List[PluginInfo]}})
+async def list_plugins(request: Request, current_user = Depends(require_any_role)):
     """Listar plugins instalados"""
-    plugins = await plugin_service.list_plugins()
-    return plugins
+    return await plugins_cache.respond(request, plugin_service.list_plugins)
 
 
 @router.put("/{plugin_name}/toggle", response_model=MessageResponse)
@@ -54,9 +58,9 @@ async def delete_plugin(plugin_name: str, current_user = Depends(require_admin))
 
 # Rutas para plugins recomendados
 @router.get("/recommended")
-async def get_recommended_plugins(current_user = Depends(require_any_role)):
+async def get_recommended_plugins(request: Request, current_user = Depends(require_any_role)):
     """Obtener lista de plugins recomendados con estado de instalación"""
-    return await plugins_controller.get_recommended()
+    return await recommended_cache.respond(request, plugins_controller.get_recommended)
 
 
 @router.post("/recommended/{plugin_id}/install")
@@ -1,7 +1,9 @@
 """Router de información del sistema"""
 from fastapi import APIRouter, Depends
-from app.core.deps import require_any_role
+from app.core.deps import require_admin, require_any_role
+from app.core.user_cache import user_cache
 from app.schemas.schemas import SystemInfo
+from app.services.mojang_service import mojang_service
 from app.services.system_service import system_service
 
 router = APIRouter(prefix="/api/system", tags=["system"])
@@ -14,6 +16,15 @@ async def get_system_info(current_user = Depends(require_any_role)):
     return info
 
 
+@router.get("/cache-stats")
+async def get_cache_stats(current_user = Depends(require_admin)):
+    """Aciertos/fallos de las cachés internas"""
+    return {
+        "auth_users": user_cache.get_stats(),
+        "mojang": mojang_service.get_stats()
+    }
+
+
 @router.get("/health")
 async def health_check():
     """Health check (sin autenticación)"""
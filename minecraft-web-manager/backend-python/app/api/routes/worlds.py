@@ -1,18 +1,33 @@
 """Router de gestión de mundos"""
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from typing import List
 from app.core.deps import require_any_role, require_moderator, require_admin
+from app.core.http_cache import RouteCache
 from app.schemas.schemas import WorldInfo, CreateWorldRequest, MessageResponse
 from app.services.world_service import world_service
 
 router = APIRouter(prefix="/api/worlds", tags=["worlds"])
 
 
-@router.get("/", response_model=List[WorldInfo])
-async def list_worlds(current_user = Depends(require_any_role)):
+def _world_files():
+    """worlds/ (altas, bajas y cambio de symlink activo) y el metadata.json de cada mundo"""
+    worlds_path = world_service.worlds_path
+    if not worlds_path.is_dir():
+        return [worlds_path]
+    return [worlds_path] + sorted(
+        entry / "metadata.json" for entry in worlds_path.iterdir()
+        if entry.name != "active"
+    )
+
+
+# El tamaño (du) no depende de estos mtimes: lo acota el TTL
+worlds_cache = RouteCache(ttl=30, watch=_world_files, model=List[WorldInfo])
+
+
+@router.get("/", responses={200: {"model": List[WorldInfo]}})
+async def list_worlds(request: Request, current_user = Depends(require_any_role)):
     """Listar todos los mundos"""
-    worlds = await world_service.list_worlds()
-    return worlds
+    return await worlds_cache.respond(request, world_service.list_worlds)
 
 
 @router.get("/active")
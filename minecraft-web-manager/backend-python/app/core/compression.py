@@ -0,0 +1,176 @@
+"""Compresión gzip/Brotli de respuestas de texto (JSON, HTML, JS, CSS)"""
+import gzip
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin el paquete brotli solo se usa gzip
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # calidad media: buen ratio sin penalizar respuestas dinámicas
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Mejor codificación aceptada por el cliente: br, gzip o None"""
+    accepted = set()
+    refused = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        # q=0 rechaza la codificación aunque '*' la aceptara
+        (accepted if quality > 0 else refused).add(name.strip())
+
+    def allowed(encoding: str) -> bool:
+        return encoding in accepted or ("*" in accepted and encoding not in refused)
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """
+    Comprimir un cuerpo completo
+
+    Args:
+        data: Contenido
+        encoding: 'br' o 'gzip'
+        best: Máxima compresión (para archivos estáticos que se comprimen una vez)
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    """Compresión incremental para respuestas en streaming (NDJSON, logs)"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Vaciar en cada bloque: el cliente recibe cada línea sin esperar al final
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Comprime las respuestas de texto según Accept-Encoding
+
+    A diferencia de GZipMiddleware de Starlette, solo toca tipos de texto
+    (las descargas .tar.gz o .zip de backups y resource packs pasan tal
+    cual), prefiere Brotli si el paquete está instalado, respeta las
+    respuestas ya comprimidas (archivos estáticos precomprimidos) y
+    convierte el ETag en débil, como corresponde a otra representación.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        started = False
+        active = False
+        compressor: Optional[_StreamCompressor] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start, started, active, compressor
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                active = "content-encoding" not in headers and is_compressible(headers.get("content-type", ""))
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if not started:
+                started = True
+                if not active or (not more_body and len(body) < self.minimum_size):
+                    active = False
+                    await send(start)
+                    await send(message)
+                    return
+
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+
+                if not more_body:
+                    data = compress(body, encoding)
+                    headers["Content-Length"] = str(len(data))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": data})
+                    return
+
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                compressor = _StreamCompressor(encoding)
+                await send(start)
+                await send({"type": "http.response.body", "body": compressor.chunk(body), "more_body": True})
+                return
+
+            if not active:
+                await send(message)
+            elif more_body:
+                await send({"type": "http.response.body", "body": compressor.chunk(body), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_compressed)
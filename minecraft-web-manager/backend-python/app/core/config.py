@@ -1,6 +1,6 @@
 """Configuración de la aplicación usando Pydantic Settings"""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -16,17 +16,105 @@ class Settings(BaseSettings):
     SERVER_PATH: str
     BACKUP_PATH: str = "../backups"
     
+    # Backups programados
+    BACKUP_SCHEDULER_ENABLED: bool = True
+    BACKUP_MISFIRE_POLICY: str = "coalesce"  # coalesce (una ejecución al arrancar) o skip
+    
+    # Retención de backups (abuelo-padre-hijo, por tipo). Opcional: borra archivos
+    BACKUP_RETENTION_ENABLED: bool = False
+    BACKUP_RETENTION_LAST: int = 3
+    BACKUP_RETENTION_DAILY: int = 7
+    BACKUP_RETENTION_WEEKLY: int = 4
+    BACKUP_RETENTION_MONTHLY: int = 6
+    BACKUP_RETENTION_INTERVAL_MINUTES: int = 60
+    BACKUP_SIZE_BUDGET_MB: Dict[str, int] = {}  # {"full": 20480, "world": 10240}; 0 = sin límite
+    BACKUP_CATALOG_POLL_SECONDS: int = 5
+    
+    # Verificación de integridad en segundo plano
+    BACKUP_SCRUB_ENABLED: bool = True
+    BACKUP_SCRUB_RATE_MB: int = 20  # MB/s máximos de lectura
+    BACKUP_SCRUB_INTERVAL_MINUTES: int = 30
+    BACKUP_SCRUB_REVERIFY_DAYS: int = 7
+    
+    # Copia remota de backups: "" (desactivada), local, sftp, s3
+    BACKUP_REMOTE_TARGET: str = ""
+    BACKUP_REMOTE_LOCAL_PATH: str = ""
+    BACKUP_SFTP_HOST: str = ""
+    BACKUP_SFTP_PORT: int = 22
+    BACKUP_SFTP_USER: str = ""
+    BACKUP_SFTP_PASSWORD: str = ""
+    BACKUP_SFTP_KEY_PATH: str = ""
+    BACKUP_SFTP_PATH: str = "backups"
+    BACKUP_S3_ENDPOINT: str = ""  # https://s3.amazonaws.com, http://127.0.0.1:9000 (MinIO)
+    BACKUP_S3_BUCKET: str = ""
+    BACKUP_S3_ACCESS_KEY: str = ""
+    BACKUP_S3_SECRET_KEY: str = ""
+    BACKUP_S3_REGION: str = "us-east-1"
+    BACKUP_S3_PREFIX: str = ""
+    BACKUP_UPLOAD_PART_MB: int = 64
+    BACKUP_UPLOAD_CONCURRENCY: int = 4
+    BACKUP_UPLOAD_RETRIES: int = 5
+    BACKUP_UPLOAD_MAX_MBPS: int = 0  # MB/s, 0 = sin límite
+    
+    # API de Mojang (URLs configurables para apuntar a un servidor de pruebas)
+    MOJANG_API_URL: str = "https://api.mojang.com"
+    MOJANG_SESSION_URL: str = "https://sessionserver.mojang.com"
+    MOJANG_CACHE_SIZE: int = 5000
+    MOJANG_CACHE_TTL_HOURS: int = 24
+    MOJANG_NEGATIVE_TTL_MINUTES: int = 15
+    
+    # Seguimiento de sesiones de jugadores leyendo logs/latest.log
+    PLAYER_TRACKER_ENABLED: bool = True
+    PLAYER_TRACKER_POLL_SECONDS: float = 1.0
+    
+    # Levantar baneos temporales al expirar
+    BAN_SWEEPER_ENABLED: bool = True
+    BAN_SWEEPER_MAX_SLEEP_SECONDS: float = 60.0
+    
+    # Auditoría: inserciones agrupadas en segundo plano
+    AUDIT_BATCH_SIZE: int = 100
+    AUDIT_FLUSH_INTERVAL_MS: int = 250
+    AUDIT_QUEUE_MAX: int = 10000
+    AUDIT_RETENTION_DAYS: int = 365  # 0 = conservar todo en la BD
+    AUDIT_RETENTION_INTERVAL_HOURS: int = 24
+    AUDIT_ARCHIVE_PATH: str = "./data/audit-archive"
+    
+    # Avatares de jugadores renderizados localmente
+    AVATAR_CACHE_PATH: str = "./data/avatars"
+    AVATAR_CACHE_TTL_HOURS: int = 24
+    
     # Seguridad
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_USER_CACHE_SIZE: int = 1024  # 0 = sin caché
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30
+    AUTH_MAX_SESSIONS_PER_USER: int = 10  # 0 = sin límite
+    AUTH_SESSION_PURGE_INTERVAL_MINUTES: int = 60  # 0 = no purgar
+    BCRYPT_ROUNDS: int = 12  # al cambiarlo, los hashes se actualizan en el siguiente login
+    PASSWORD_HASH_WORKERS: int = 2
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 300
+    LOGIN_RATE_LIMIT_PER_IP: int = 30  # intentos por ventana; 0 = sin límite
+    LOGIN_RATE_LIMIT_PER_USER: int = 5  # fallos por usuario e IP por ventana; 0 = sin límite
     
     # RCON
     RCON_PASSWORD: str = ""
     
     # Base de datos
     DATABASE_URL: str = "sqlite:///./data/minecraft-manager.db"
+    ASYNC_DATABASE_URL: str = ""  # vacío = derivada de DATABASE_URL (aiosqlite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    SQLITE_CACHE_SIZE_MB: int = 16
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Compresión de respuestas de texto (0 = desactivada); Brotli si está el paquete brotli
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    
+    # Métricas Prometheus en /metrics
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""  # obligatorio: sin token /metrics no se sirve
     
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:8000"
@@ -35,6 +123,11 @@ class Settings(BaseSettings):
     def allowed_origins_list(self) -> List[str]:
         """Convierte ALLOWED_ORIGINS en lista"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
+
+    @property
+    def metrics_active(self) -> bool:
+        """/metrics solo se sirve si está habilitado y tiene token"""
+        return self.METRICS_ENABLED and bool(self.METRICS_TOKEN)
     
     class Config:
         env_file = ".env"
@@ -1,24 +1,25 @@
 """Dependencies para FastAPI (inyección de dependencias)"""
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Cookie, Request
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 from app.models.session import Session as DBSession
-from app.core.security import decode_token
+from app.core.security import decode_token, token_fingerprint
+from app.core.user_cache import user_cache
 from datetime import datetime
 
 
 async def get_current_user_from_cookie(
     token: Optional[str] = Cookie(None, alias="access_token"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Obtener usuario actual desde cookie HttpOnly
     
     Args:
         token: Token JWT desde cookie
-        db: Sesión de base de datos
+        db: Sesión asíncrona de base de datos
     
     Returns:
         Usuario autenticado
@@ -32,6 +33,12 @@ async def get_current_user_from_cookie(
             detail="No autenticado"
         )
     
+    # Token ya validado hace poco: sin decodificar ni consultar la BD
+    fingerprint = token_fingerprint(token)
+    cached = user_cache.get(fingerprint)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    
     # Decodificar token
     payload = decode_token(token)
     
@@ -56,7 +63,7 @@ async def get_current_user_from_cookie(
             detail="Token inválido"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -64,12 +71,13 @@ async def get_current_user_from_cookie(
             detail="Usuario no encontrado"
         )
     
+    user_cache.put(fingerprint, user, payload.get("exp"))
     return user
 
 
 async def get_current_user_optional(
     token: Optional[str] = Cookie(None, alias="access_token"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[User]:
     """Obtener usuario actual (opcional, no lanza error si no hay)"""
     try:
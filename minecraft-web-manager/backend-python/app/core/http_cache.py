@@ -0,0 +1,142 @@
+"""Caché de respuestas JSON con ETag/Last-Modified para rutas de solo lectura"""
+import hashlib
+import inspect
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+
+# Claves (combinaciones de parámetros) recordadas por ruta
+MAX_ENTRIES = 256
+
+Signature = Tuple[Tuple[str, Optional[int], Optional[int]], ...]
+
+
+def files_signature(paths: Iterable[Path]) -> Signature:
+    """(ruta, mtime_ns, tamaño) de cada ruta; None si no existe"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+class RouteCache:
+    """
+    Respuesta cacheada de una ruta GET
+
+    La entrada se reutiliza mientras no cambie el mtime/tamaño de los
+    archivos que devuelve `watch` y no pase `ttl` (el TTL cubre lo que no
+    está en disco, p. ej. tamaños calculados con `du`). El ETag es el hash
+    del cuerpo y Last-Modified el momento en que el cuerpo cambió por
+    última vez: si el cliente ya lo tiene (If-None-Match o
+    If-Modified-Since) se responde 304 sin cuerpo.
+
+    Como la ruta devuelve un Response, FastAPI no aplica `response_model`:
+    con `model` el contenido se valida (y se filtra) antes de cachearlo.
+
+    Uso en una ruta:
+
+        plugins_cache = RouteCache(ttl=30, watch=lambda: [plugins_path], model=List[PluginInfo])
+
+        @router.get("/", responses={200: {"model": List[PluginInfo]}})
+        async def list_plugins(request: Request):
+            return await plugins_cache.respond(request, plugin_service.list_plugins)
+    """
+
+    def __init__(self, ttl: float, watch: Callable[..., Iterable[Path]], model: Any = None):
+        self.ttl = ttl
+        self.watch = watch
+        self._adapter = TypeAdapter(model) if model is not None else None
+        self._entries: "OrderedDict[Tuple, Tuple[Signature, float, bytes, str, float]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    async def respond(self, request: Request, loader: Callable[[], Any], *key: Any) -> Response:
+        """
+        Servir la respuesta de `loader` desde la caché o recalcularla
+
+        Args:
+            request: Petición (cabeceras condicionales)
+            loader: Función (sync o async) que genera el contenido
+            *key: Parámetros de la ruta; también se pasan a `watch`
+
+        Returns:
+            Response JSON con ETag y Last-Modified, o 304
+        """
+        signature = files_signature(self.watch(*key))
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature and entry[1] > now:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            result = loader()
+            if inspect.isawaitable(result):
+                result = await result
+
+            if self._adapter is not None:
+                result = self._adapter.dump_python(self._adapter.validate_python(result), mode="json")
+
+            body = json.dumps(jsonable_encoder(result), ensure_ascii=False).encode("utf-8")
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if entry is not None and entry[3] == etag:
+                last_modified = entry[4]
+            else:
+                # Segundos enteros y siempre crecientes: la cabecera HTTP no
+                # tiene más resolución y dos cuerpos distintos no pueden
+                # compartir Last-Modified
+                last_modified = float(math.ceil(time.time()))
+                if entry is not None:
+                    last_modified = max(last_modified, entry[4] + 1)
+
+            entry = (signature, now + self.ttl, body, etag, last_modified)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+        _, _, body, etag, last_modified = entry
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Cache-Control": "private, no-cache",
+        }
+
+        if self._not_modified(request, etag, last_modified):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @staticmethod
+    def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110)
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return last_modified <= since
+        return False
+
+    def clear(self):
+        self._entries.clear()
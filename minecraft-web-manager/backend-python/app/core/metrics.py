@@ -0,0 +1,402 @@
+"""Métricas en formato de texto Prometheus (sin dependencias externas)"""
+import abc
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Límites de los histogramas (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BACKUP_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+# Starlette añade "; charset=utf-8" a los tipos text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric(abc.ABC):
+    """Base: una serie por combinación de valores de etiquetas"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[LabelValues, Any] = {}
+        if not self.labelnames:
+            self._series[()] = self._new_series()
+
+    @abc.abstractmethod
+    def _new_series(self) -> Any:
+        """Valor inicial de una serie nueva"""
+
+    def _get(self, labels: LabelValues) -> Any:
+        # Llamar con el lock tomado
+        series = self._series.get(labels)
+        if series is None:
+            if len(labels) != len(self.labelnames):
+                raise ValueError(f"{self.name} espera etiquetas {self.labelnames}, recibió {labels}")
+            series = self._series[labels] = self._new_series()
+        return series
+
+    def _snapshot(self) -> List[Tuple[LabelValues, Any]]:
+        with self._lock:
+            return [(labels, self._copy(series)) for labels, series in self._series.items()]
+
+    @staticmethod
+    def _copy(series: Any) -> Any:
+        return series
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for labels, series in self._snapshot():
+            lines.extend(self._render_series(labels, series))
+        return lines
+
+    def _render_series(self, labels: LabelValues, series: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(series)}"]
+
+
+class Counter(_Metric):
+    """Valor que solo crece (peticiones, errores, bytes)"""
+
+    kind = "counter"
+
+    def _new_series(self) -> float:
+        return 0.0
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._series[labels] = self._get(labels) + amount
+
+
+class Gauge(_Metric):
+    """Valor que sube y baja (clientes conectados, peticiones en curso)"""
+
+    kind = "gauge"
+
+    def _new_series(self) -> float:
+        return 0.0
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._get(labels)
+            self._series[labels] = float(value)
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._series[labels] = self._get(labels) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """
+    Distribución de duraciones en buckets acumulativos
+
+    Cada serie es [conteo por bucket..., conteo +Inf, suma]; observar es
+    una búsqueda binaria y dos sumas, y los acumulados se calculan solo al
+    exportar.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self) -> List[float]:
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    @staticmethod
+    def _copy(series: List[float]) -> List[float]:
+        return list(series)
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._get(labels)
+            series[index] += 1
+            series[-1] += value
+
+    def _render_series(self, labels: LabelValues, series: List[float]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+            cumulative += count
+            bucket_labels = _format_labels(self.labelnames + ("le",), labels + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        label_text = _format_labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{label_text} {_format_value(series[-1])}")
+        lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuestas en /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Todas las métricas en formato de exposición de texto 0.0.4"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Instancia global
+registry = MetricsRegistry()
+
+# ---------- HTTP ----------
+
+http_request_duration = registry.histogram(
+    "panel_http_request_duration_seconds",
+    "Duración de las peticiones HTTP por ruta",
+    ("method", "route")
+)
+http_requests = registry.counter(
+    "panel_http_requests_total",
+    "Peticiones HTTP por ruta y código de estado",
+    ("method", "route", "status")
+)
+http_requests_in_progress = registry.gauge(
+    "panel_http_requests_in_progress",
+    "Peticiones HTTP en curso"
+)
+
+# ---------- RCON ----------
+
+rcon_duration = registry.histogram(
+    "panel_rcon_command_duration_seconds",
+    "Duración de los comandos RCON (single, batch o script rcon-client.sh)",
+    ("mode",)
+)
+rcon_errors = registry.counter(
+    "panel_rcon_command_errors_total",
+    "Comandos RCON fallidos",
+    ("mode",)
+)
+
+# ---------- Subprocesos ----------
+
+subprocess_spawns = registry.counter(
+    "panel_subprocess_spawns_total",
+    "Procesos lanzados por BashService",
+    ("method",)
+)
+subprocess_errors = registry.counter(
+    "panel_subprocess_errors_total",
+    "Excepciones al lanzar o leer procesos de BashService",
+    ("method",)
+)
+
+# ---------- Socket.IO ----------
+
+socketio_clients = registry.gauge(
+    "panel_socketio_connected_clients",
+    "Clientes Socket.IO conectados"
+)
+socketio_emits = registry.counter(
+    "panel_socketio_emits_total",
+    "Eventos Socket.IO emitidos",
+    ("event",)
+)
+
+# ---------- Base de datos ----------
+
+db_query_duration = registry.histogram(
+    "panel_db_query_duration_seconds",
+    "Duración de las consultas SQL por motor y tipo de sentencia",
+    ("engine", "statement"),
+    buckets=DB_BUCKETS
+)
+db_query_errors = registry.counter(
+    "panel_db_query_errors_total",
+    "Consultas SQL fallidas",
+    ("engine",)
+)
+
+# ---------- Backups ----------
+
+backup_duration = registry.histogram(
+    "panel_backup_duration_seconds",
+    "Duración de backup.sh por tipo y resultado",
+    ("type", "status"),
+    buckets=BACKUP_BUCKETS
+)
+backup_bytes = registry.counter(
+    "panel_backup_bytes_total",
+    "Bytes escritos en backups correctos",
+    ("type",)
+)
+backup_throughput = registry.gauge(
+    "panel_backup_last_throughput_bytes_per_second",
+    "Bytes por segundo del último backup correcto",
+    ("type",)
+)
+
+
+# ---------- Instrumentación de SQLAlchemy ----------
+
+STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "BEGIN", "COMMIT", "CREATE", "DROP", "ALTER", "WITH"}
+
+_QUERY_START_KEY = "metrics_query_start"
+
+
+def _statement_kind(statement: str) -> str:
+    kind = statement[:16].lstrip().split(" ", 1)[0].upper()
+    return kind if kind in STATEMENT_KINDS else "OTHER"
+
+
+def instrument_engine(engine: Any, label: str):
+    """
+    Medir las consultas de un motor SQLAlchemy
+
+    Args:
+        engine: Engine síncrono (para el asíncrono, async_engine.sync_engine)
+        label: Valor de la etiqueta engine ('sync', 'async')
+    """
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_QUERY_START_KEY)
+        if starts:
+            db_query_duration.observe(time.perf_counter() - starts.pop(), label, _statement_kind(statement))
+
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get(_QUERY_START_KEY) if conn is not None else None
+        if starts:
+            starts.pop()
+        db_query_errors.inc(label)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+# ---------- Middleware HTTP ----------
+
+class MetricsMiddleware:
+    """
+    Latencia y código de estado de cada petición HTTP
+
+    La etiqueta route es la plantilla de la ruta ('/api/worlds/{world_name}'),
+    no la URL, para que el número de series no crezca con los parámetros.
+    Starlette deja el endpoint resuelto en el scope; la tabla endpoint ->
+    plantilla se construye una vez con las rutas de la app. Las peticiones
+    sin ruta (404) se agrupan en 'unmatched'.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: Optional[Dict[Any, str]] = None
+
+    def _route_templates(self, routes: Sequence[Any], prefix: str = "") -> Dict[Any, str]:
+        templates: Dict[Any, str] = {}
+        for route in routes:
+            path = prefix + getattr(route, "path", "")
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is not None:
+                templates.setdefault(endpoint, path)
+                continue
+            sub_routes = getattr(route, "routes", None)
+            if sub_routes:
+                templates.update(self._route_templates(sub_routes, path))
+            app = getattr(route, "app", None)
+            if app is not None:
+                # Mount (p. ej. /static): el endpoint es la app montada
+                templates.setdefault(app, path + "/{path}")
+        return templates
+
+    def _route_label(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._templates is None:
+            self._templates = self._route_templates(scope["app"].routes)
+        return self._templates.get(endpoint, "unknown")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            http_requests_in_progress.dec()
+            method = scope["method"]
+            route = self._route_label(scope)
+            http_request_duration.observe(duration, method, route)
+            http_requests.inc(method, route, status)
+
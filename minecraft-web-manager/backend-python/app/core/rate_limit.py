@@ -0,0 +1,109 @@
+"""Límite de intentos de login por IP y por usuario"""
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+from app.core.config import settings
+
+
+# Claves (IP o usuario) recordadas como máximo; se olvidan las más antiguas
+MAX_TRACKED_KEYS = 10000
+
+
+class SlidingWindow:
+    """Marcas de tiempo por clave dentro de una ventana deslizante"""
+
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window = window_seconds
+        self._hits: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def _prune(self, key: str, now: float) -> Optional[Deque[float]]:
+        hits = self._hits.get(key)
+        if hits is None:
+            return None
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+        if not hits:
+            del self._hits[key]
+            return None
+        return hits
+
+    def retry_after(self, key: str, now: float) -> float:
+        """Segundos hasta que la clave vuelva a estar bajo el límite (0 = permitido)"""
+        if self.limit <= 0:
+            return 0
+        hits = self._prune(key, now)
+        if hits is None or len(hits) < self.limit:
+            return 0
+        return hits[-self.limit] + self.window - now
+
+    def hit(self, key: str, now: float):
+        if self.limit <= 0:
+            return
+        hits = self._prune(key, now)
+        if hits is None:
+            hits = self._hits[key] = deque(maxlen=self.limit)
+        hits.append(now)
+        self._hits.move_to_end(key)
+        while len(self._hits) > MAX_TRACKED_KEYS:
+            self._hits.popitem(last=False)
+
+    def reset(self, key: str):
+        self._hits.pop(key, None)
+
+
+class LoginRateLimiter:
+    """
+    Frena ataques de fuerza bruta y ráfagas de logins
+
+    Por IP cuenta todos los intentos (cada uno cuesta un bcrypt); por
+    usuario solo los fallidos, y un login correcto los pone a cero. Los
+    fallos se cuentan por (IP, usuario): si no, cualquiera podría dejar
+    fuera al administrador fallando su contraseña desde otra IP. La
+    comprobación es previa a verificar la contraseña, así un cliente
+    bloqueado no consume CPU de bcrypt.
+    """
+
+    def __init__(self):
+        window = settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+        self.per_ip = SlidingWindow(settings.LOGIN_RATE_LIMIT_PER_IP, window)
+        self.per_user = SlidingWindow(settings.LOGIN_RATE_LIMIT_PER_USER, window)
+        self.stats = {"allowed": 0, "blocked": 0}
+
+    def check(self, ip: str, username: str) -> float:
+        """
+        Registrar un intento de login
+
+        Args:
+            ip: IP del cliente
+            username: Usuario con el que se intenta entrar
+
+        Returns:
+            0 si se permite; si no, segundos a esperar (Retry-After)
+        """
+        now = time.monotonic()
+        wait = max(self.per_ip.retry_after(ip, now), self.per_user.retry_after(self._user_key(ip, username), now))
+        if wait > 0:
+            self.stats["blocked"] += 1
+            return wait
+
+        self.per_ip.hit(ip, now)
+        self.stats["allowed"] += 1
+        return 0
+
+    @staticmethod
+    def _user_key(ip: str, username: str) -> str:
+        return f"{ip}|{username.strip().lower()}"
+
+    def failed(self, ip: str, username: str):
+        """Contar un intento fallido para el usuario desde esa IP"""
+        self.per_user.hit(self._user_key(ip, username), time.monotonic())
+
+    def succeeded(self, ip: str, username: str):
+        """Login correcto: olvidar los fallos del usuario desde esa IP"""
+        self.per_user.reset(self._user_key(ip, username))
+
+
+# Instancia global
+login_rate_limiter = LoginRateLimiter()
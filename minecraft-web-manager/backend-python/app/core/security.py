@@ -1,4 +1,8 @@
 """Funciones de seguridad: JWT, bcrypt, etc."""
+import asyncio
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
@@ -6,6 +10,15 @@ import bcrypt
 from app.core.config import settings
 
 
+# bcrypt tarda ~250 ms con 12 rondas: se ejecuta en threads propios (bcrypt
+# libera el GIL) para no bloquear el event loop ni ocupar el executor por
+# defecto, que usan las lecturas de archivos
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+    thread_name_prefix="bcrypt"
+)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar password contra hash"""
     # Asegurar que todo sea bytes
@@ -21,19 +34,48 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def get_password_hash(password: str) -> str:
-    """Generar hash bcrypt de password (12 rounds)"""
+    """Generar hash bcrypt de password (BCRYPT_ROUNDS rounds)"""
     # Convertir a bytes y truncar a 72 bytes (límite de bcrypt)
     if isinstance(password, str):
         password = password.encode('utf-8')
     password = password[:72]
     
-    # Generar hash con bcrypt (12 rounds)
-    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=12))
+    # Generar hash con bcrypt
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
     
     # Retornar como string
     return hashed.decode('utf-8')
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """True si el hash no es bcrypt $2b$ con el coste configurado"""
+    # Formato: $2b$12$<salt+hash>
+    parts = (hashed_password or "").split("$")
+    if len(parts) != 4 or parts[1] != "2b":
+        return True
+    try:
+        return int(parts[2]) != settings.BCRYPT_ROUNDS
+    except ValueError:
+        return True
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password en el pool de bcrypt (para handlers async)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash en el pool de bcrypt (para handlers async)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+
+def token_fingerprint(token: str) -> str:
+    """SHA-256 del token (nunca se guarda el token en claro)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Crear JWT access token
@@ -52,7 +94,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    # jti aleatorio: dos tokens emitidos en el mismo segundo no coinciden
+    to_encode.update({"exp": expire, "type": "access", "jti": secrets.token_hex(16)})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     
     return encoded_jwt
@@ -71,7 +114,8 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # jti aleatorio: la huella del refresh token es única en sessions
+    to_encode.update({"exp": expire, "type": "refresh", "jti": secrets.token_hex(16)})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     
     return encoded_jwt
@@ -0,0 +1,168 @@
+"""Archivos estáticos con URLs versionadas y variantes precomprimidas"""
+import asyncio
+import hashlib
+import mimetypes
+import os
+import stat
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from app.core.compression import brotli, choose_encoding, compress, is_compressible
+
+
+# Archivos más grandes no se comprimen en memoria (se sirven tal cual)
+MAX_PRECOMPRESS_BYTES = 2 * 1024 * 1024
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# (mtime_ns, tamaño) identifica una versión del archivo
+FileVersion = Tuple[int, int]
+
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles para /static con caché de navegador y compresión
+
+    asset_url('js/api.js') devuelve '/static/js/api.js?v=<hash del
+    contenido>'. Las peticiones con el hash vigente se sirven con
+    Cache-Control immutable (un año); al cambiar el archivo cambia la URL.
+    Sin hash (o con uno antiguo) se usa no-cache y el navegador revalida
+    con ETag.
+
+    Los JS/CSS se comprimen (Brotli o gzip, nivel máximo) y la variante
+    queda en memoria hasta que cambia el archivo. Hashes y variantes se
+    calculan fuera del event loop: al arrancar (warm) y, para archivos
+    cambiados después, en lookup_path, que Starlette ejecuta en un thread.
+    Mientras tanto file_response y asset_url solo leen la caché.
+    """
+
+    def __init__(self, directory: str, url_prefix: str = "/static"):
+        super().__init__(directory=directory)
+        self.url_prefix = url_prefix.rstrip("/")
+        self._hashes: Dict[str, Tuple[FileVersion, str]] = {}
+        self._variants: Dict[Tuple[str, str], Tuple[FileVersion, bytes]] = {}
+
+    @staticmethod
+    def _version(stat_result: os.stat_result) -> FileVersion:
+        return (stat_result.st_mtime_ns, stat_result.st_size)
+
+    def _cached_hash(self, full_path: str, stat_result: os.stat_result) -> Optional[str]:
+        cached = self._hashes.get(full_path)
+        return cached[1] if cached and cached[0] == self._version(stat_result) else None
+
+    def _cached_variant(self, full_path: str, stat_result: os.stat_result, encoding: str) -> Optional[bytes]:
+        cached = self._variants.get((full_path, encoding))
+        return cached[1] if cached and cached[0] == self._version(stat_result) else None
+
+    def _prepare(self, full_path: str, stat_result: os.stat_result):
+        """Calcular hash y variantes comprimidas que falten (en un thread)"""
+        version = self._version(stat_result)
+        encodings = []
+        if (
+            is_compressible(mimetypes.guess_type(full_path)[0] or "")
+            and stat_result.st_size <= MAX_PRECOMPRESS_BYTES
+        ):
+            encodings = [e for e in ("br", "gzip") if e != "br" or brotli is not None]
+        missing = [e for e in encodings if self._cached_variant(full_path, stat_result, e) is None]
+        if not missing and self._cached_hash(full_path, stat_result) is not None:
+            return
+
+        digest = hashlib.sha256()
+        data = bytearray() if missing else None
+        try:
+            with open(full_path, "rb") as f:
+                for block in iter(lambda: f.read(65536), b""):
+                    digest.update(block)
+                    if data is not None:
+                        data += block
+        except OSError:
+            return
+        self._hashes[full_path] = (version, digest.hexdigest()[:12])
+        for encoding in missing:
+            self._variants[(full_path, encoding)] = (version, compress(bytes(data), encoding, best=True))
+
+    def lookup_path(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            self._prepare(full_path, stat_result)
+        return full_path, stat_result
+
+    def _warm_sync(self) -> int:
+        count = 0
+        for directory in self.all_directories:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    self.lookup_path(os.path.relpath(os.path.join(root, name), directory))
+                    count += 1
+        return count
+
+    async def warm(self) -> int:
+        """
+        Precalcular hashes y variantes de todos los archivos (en un thread)
+
+        Returns:
+            Número de archivos revisados
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._warm_sync)
+
+    def asset_url(self, path: str) -> str:
+        """
+        URL versionada de un archivo estático (para los templates)
+
+        Args:
+            path: Ruta relativa a static/ (p. ej. 'css/custom.css')
+
+        Returns:
+            URL con ?v=<hash>, o sin versión si el archivo no existe o aún
+            no se ha calculado su hash (la primera petición lo calcula)
+        """
+        path = path.lstrip("/")
+        # Solo stat: leer el archivo aquí bloquearía el render del template
+        full_path, stat_result = super().lookup_path(path)
+        content_hash = self._cached_hash(full_path, stat_result) if stat_result else None
+        if content_hash is None:
+            return f"{self.url_prefix}/{path}"
+        return f"{self.url_prefix}/{path}?v={content_hash}"
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+
+        version = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [None])[0]
+        versioned = version is not None and version == self._cached_hash(full_path, stat_result)
+        response.headers["Cache-Control"] = IMMUTABLE if versioned else "no-cache"
+
+        content_type = mimetypes.guess_type(full_path)[0] or ""
+        if not is_compressible(content_type):
+            return response
+        response.headers["Vary"] = "Accept-Encoding"
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        variant = self._cached_variant(full_path, stat_result, encoding) if encoding else None
+        if response.status_code != 200 or variant is None:
+            return response
+
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key not in ("content-length", "content-type", "etag")
+        }
+        headers["Content-Encoding"] = encoding
+        # Misma versión del archivo, otra representación: ETag débil. Starlette
+        # quita el W/ al comparar If-None-Match, así que la revalidación sigue
+        # dando 304.
+        headers["ETag"] = f"W/{response.headers['etag']}"
+        return Response(
+            content=variant,
+            status_code=status_code,
+            headers=headers,
+            media_type=response.media_type
+        )
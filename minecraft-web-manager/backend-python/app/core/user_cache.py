@@ -0,0 +1,162 @@
+"""Caché de usuarios autenticados por huella del token"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, make_transient_to_detached, object_session
+from app.core.config import settings
+from app.core.security import token_fingerprint
+from app.models.user import User
+
+
+class UserCache:
+    """
+    LRU con TTL de usuarios autenticados
+
+    Evita la consulta a SQLite en cada petición autenticada. La entrada
+    caduca a los AUTH_USER_CACHE_TTL_SECONDS o cuando expira el token, lo
+    que ocurra antes, y se invalida al modificar o borrar el usuario
+    (eventos del ORM). Se guarda una copia desconectada de la sesión; cada
+    petición recibe su propia instancia con Session.merge(load=False), sin
+    SQL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, fingerprint: str) -> Optional[User]:
+        """Usuario cacheado para un token, o None (cuenta acierto/fallo)"""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None:
+                expires_at, user = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(fingerprint)
+                    self.stats["hits"] += 1
+                    return user
+                self._drop(fingerprint)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, fingerprint: str, user: User, token_exp: Optional[float] = None):
+        """Guardar una copia del usuario hasta el TTL o la expiración del token"""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp:
+            expires_at = min(expires_at, float(token_exp))
+
+        snapshot = User(
+            id=user.id,
+            username=user.username,
+            password_hash=user.password_hash,
+            role=user.role,
+            created_at=user.created_at,
+            last_login=user.last_login
+        )
+        make_transient_to_detached(snapshot)
+
+        with self._lock:
+            self._drop(fingerprint)
+            self._entries[fingerprint] = (expires_at, snapshot)
+            self._by_user.setdefault(user.id, set()).add(fingerprint)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def _drop(self, fingerprint: str):
+        entry = self._entries.pop(fingerprint, None)
+        if entry is None:
+            return
+        user_id = entry[1].id
+        fingerprints = self._by_user.get(user_id)
+        if fingerprints is not None:
+            fingerprints.discard(fingerprint)
+            if not fingerprints:
+                del self._by_user[user_id]
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            self._drop(token_fingerprint(token))
+
+    def invalidate_user(self, user_id: int):
+        """Olvidar todas las entradas de un usuario (cambio de rol, borrado...)"""
+        with self._lock:
+            fingerprints = self._by_user.pop(user_id, set())
+            for fingerprint in fingerprints:
+                self._entries.pop(fingerprint, None)
+            if fingerprints:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Contadores de la caché"""
+        return {**self.stats, "entries": len(self._entries)}
+
+
+# Instancia global
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+
+# Clave de Session.info con los usuarios a invalidar en el commit
+# (ALL_USERS si hubo un UPDATE/DELETE masivo)
+_PENDING_KEY = "user_cache_pending"
+ALL_USERS = "*"
+
+
+def _mark_pending(session: Session, user_id):
+    pending = session.info.get(_PENDING_KEY)
+    if pending == ALL_USERS:
+        return
+    if user_id == ALL_USERS:
+        session.info[_PENDING_KEY] = ALL_USERS
+    else:
+        session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_flushed(mapper, connection, target: User):
+    """
+    Anotar el usuario; se invalida en el commit
+
+    En el flush la transacción sigue abierta: otra petición podría volver a
+    cachear la fila anterior antes de que el cambio sea visible.
+    """
+    session = object_session(target)
+    if session is None:
+        user_cache.invalidate_user(target.id)
+    else:
+        _mark_pending(session, target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_statement(orm_execute_state: ORMExecuteState):
+    """query(User).update()/.delete() no emiten eventos por fila"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ is User for mapper in orm_execute_state.all_mappers):
+        _mark_pending(orm_execute_state.session, ALL_USERS)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    # Tras un rollback lo anotado se conserva: invalidar de más solo cuesta
+    # una consulta, y un savepoint deshecho no anula lo del resto
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending == ALL_USERS:
+        user_cache.clear()
+    elif pending:
+        for user_id in pending:
+            user_cache.invalidate_user(user_id)
@@ -8,3 +8,5 @@ from app.models.audit_log import AuditLog
 from app.models.backup_history import BackupHistory
 from app.models.scheduled_backup import ScheduledBackup
 from app.models.app_settings import AppSettings
+from app.models.mojang_cache import MojangCache
+from app.models.player_session import PlayerSession
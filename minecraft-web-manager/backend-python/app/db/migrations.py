@@ -1,14 +1,75 @@
-"""Script para crear tablas de base de datos"""
+"""Script para crear tablas de base de datos y actualizar las existentes"""
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateColumn
 from app.db.session import engine
 from app.db.base import Base
 
 
 def init_db():
-    """Crear todas las tablas en la base de datos"""
+    """Crear todas las tablas en la base de datos y migrar las existentes"""
     print("Creando tablas de base de datos...")
+    drop_legacy_tables()
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
     print("✅ Tablas creadas exitosamente")
 
 
+def drop_legacy_tables():
+    """
+    Eliminar tablas con un esquema anterior incompatible
+
+    Solo para datos desechables: sessions guardaba los JWT en claro
+    (token/refresh_token) y ahora guarda su hash; se recrea vacía y los
+    usuarios vuelven a iniciar sesión.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("sessions"):
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("sessions")}
+    if "token" in columns:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE sessions"))
+        print("Tabla sessions recreada (tokens guardados como hash)")
+
+
+def upgrade_schema():
+    """
+    Actualizar tablas existentes al esquema de los modelos
+
+    create_all() solo crea tablas nuevas: las columnas y los índices
+    agregados después a un modelo se crean aquí. Una columna NOT NULL solo
+    se puede agregar si tiene server_default (las filas existentes toman
+    ese valor); si no, se avisa y el esquema queda sin ella.
+    """
+    inspector = inspect(engine)
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                print(f"⚠️  {table.name}.{column.name} es NOT NULL sin server_default: no se agrega")
+                continue
+
+            # Tipo, DEFAULT y NOT NULL tal como los define el modelo
+            column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+            except DBAPIError as e:
+                # p. ej. SQLite no admite DEFAULT no constante en ADD COLUMN
+                print(f"⚠️  No se pudo agregar {table.name}.{column.name}: {e.orig}")
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 if __name__ == "__main__":
     init_db()
@@ -1,18 +1,78 @@
 """Configuración de la base de datos SQLAlchemy"""
-from sqlalchemy import create_engine
+from typing import AsyncIterator
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
-# Motor de base de datos
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+
+def _async_url(url: str) -> str:
+    """URL equivalente con driver asíncrono (aiosqlite para SQLite)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Pragmas de cada conexión SQLite
+
+    WAL permite lecturas mientras hay una escritura en curso y, con WAL,
+    synchronous=NORMAL sigue siendo seguro ante caídas de la aplicación.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+_pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_pre_ping": not IS_SQLITE
+}
+
+# Motor síncrono (servicios en threads, tareas en segundo plano, init_db)
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **_pool_options
 )
 
+# Motor asíncrono para los endpoints: las consultas no bloquean el event loop.
+# aiosqlite usa NullPool por defecto (una conexión nueva por sesión); se
+# fuerza el pool para reutilizar conexiones y sus pragmas.
+async_engine = create_async_engine(
+    _async_url(settings.DATABASE_URL),
+    poolclass=AsyncAdaptedQueuePool,
+    **_pool_options
+)
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+if settings.metrics_active:
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+
 # SessionLocal para crear sesiones de BD
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sesiones asíncronas; sin expirar al hacer commit para poder leer
+# atributos después sin otra consulta implícita
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 # Base para modelos
 Base = declarative_base()
 
@@ -31,18 +91,26 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency para obtener una sesión asíncrona de base de datos
+    
+    Yields:
+        AsyncSession: Sesión asíncrona
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def close_db():
+    """Cerrar las conexiones del pool (al apagar)"""
+    await async_engine.dispose()
+    engine.dispose()
+
+
 def init_db():
     """
-    Inicializar base de datos: crear todas las tablas
+    Inicializar base de datos: crear tablas y aplicar migraciones
     """
-    # Importar todos los modelos para que SQLAlchemy los registre
-    from app.models.user import User
-    from app.models.session import Session
-    from app.models.audit_log import AuditLog
-    from app.models.backup_history import BackupHistory
-    from app.models.scheduled_backup import ScheduledBackup
-    from app.models.app_settings import AppSettings
-    
-    # Crear todas las tablas
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tablas de base de datos creadas/verificadas")
+    from app.db.migrations import init_db as run_migrations
+    run_migrations()
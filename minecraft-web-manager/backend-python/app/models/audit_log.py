@@ -1,5 +1,5 @@
 """Modelo de Registro de Auditoría"""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -8,6 +8,12 @@ class AuditLog(Base):
     """Modelo de log de auditoría"""
     
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Filtros de la consulta paginada por id (cursor)
+        Index("ix_audit_logs_user_cursor", "user_id", "id"),
+        Index("ix_audit_logs_action_cursor", "action", "id"),
+        Index("ix_audit_logs_resource_cursor", "resource_type", "resource_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
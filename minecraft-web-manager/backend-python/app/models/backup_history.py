@@ -1,5 +1,5 @@
 """Modelo de Historial de Backups"""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, Text, Float
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -10,11 +10,17 @@ class BackupHistory(Base):
     __tablename__ = "backup_history"
     
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String(255), nullable=False)
-    type = Column(String(20), nullable=False)  # full, world, plugins, config
-    size_bytes = Column(BigInteger, nullable=True)
+    filename = Column(String(255), nullable=False, index=True)
+    type = Column(String(20), nullable=False, index=True)  # full, world, plugins, config, pre-restore
+    size_bytes = Column(BigInteger, nullable=True, index=True)
+    duration_seconds = Column(Float, nullable=True)
     path = Column(String(500), nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    status = Column(String(20), nullable=False, default="completed")  # completed, failed, in_progress
+    description = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="completed", index=True)  # completed, verified, corrupt, failed, in_progress, pruned, deleted
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, server_default=func.now(), index=True)
+    checksum = Column(String(64), nullable=True)  # SHA-256 del archivo
+    verified_at = Column(DateTime, nullable=True, index=True)
+    remote_uri = Column(String(500), nullable=True)  # Copia fuera del servidor (s3://, sftp://, ruta)
+    uploaded_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)  # UTC (CURRENT_TIMESTAMP)
@@ -0,0 +1,13 @@
+"""Modelo de Caché de la API de Mojang"""
+from sqlalchemy import Column, String, Text, DateTime
+from app.db.session import Base
+
+
+class MojangCache(Base):
+    """Respuestas cacheadas de Mojang (nombre → UUID, perfiles)"""
+    
+    __tablename__ = "mojang_cache"
+    
+    key = Column(String(100), primary_key=True)  # name:<nombre>, profile:<uuid>
+    value = Column(Text, nullable=True)  # JSON; NULL = no existe (caché negativa)
+    expires_at = Column(DateTime, nullable=False, index=True)
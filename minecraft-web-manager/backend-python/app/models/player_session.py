@@ -0,0 +1,23 @@
+"""Modelo de Sesiones de Jugadores"""
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.db.session import Base
+
+
+class PlayerSession(Base):
+    """Conexión de un jugador al servidor (derivada de latest.log)"""
+    
+    __tablename__ = "player_sessions"
+    __table_args__ = (
+        Index("ix_player_sessions_name_joined", "name", "joined_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(32), nullable=False)
+    uuid = Column(String(36), nullable=True, index=True)
+    ip_address = Column(String(45), nullable=True)
+    joined_at = Column(DateTime, nullable=False, index=True)
+    left_at = Column(DateTime, nullable=True, index=True)  # NULL = conectado
+    duration_seconds = Column(Integer, nullable=True)
+    leave_reason = Column(String(20), nullable=True)  # quit, kick, shutdown, crash
+    leave_message = Column(String(255), nullable=True)
+    chat_messages = Column(Integer, nullable=False, default=0)
@@ -5,7 +5,7 @@ from app.db.session import Base
 
 
 class ScheduledBackup(Base):
-    """Modelo de backups programados (futuro)"""
+    """Modelo de backups programados (ejecutados por BackupScheduler)"""
     
     __tablename__ = "scheduled_backups"
     
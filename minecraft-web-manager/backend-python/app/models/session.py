@@ -1,19 +1,29 @@
 """Modelo de Sesión JWT"""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
 
 class Session(Base):
-    """Modelo de sesión JWT"""
+    """
+    Modelo de sesión JWT
+
+    Los tokens no se guardan en claro: solo su SHA-256 (64 caracteres
+    hexadecimales, ver token_fingerprint), que es lo que se busca al
+    renovar o cerrar sesión.
+    """
     
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Límite de sesiones por usuario: las más antiguas primero
+        Index("ix_sessions_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    token = Column(String(500), nullable=False, index=True)
-    refresh_token = Column(String(500), nullable=False, index=True)
-    expires_at = Column(DateTime, nullable=False)
+    token_hash = Column(String(64), nullable=False, index=True)
+    refresh_token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(255), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
@@ -73,9 +73,15 @@ class PluginInfo(BaseModel):
 
 # Backup schemas
 class BackupInfo(BaseModel):
+    id: Optional[int] = None
     filename: str
     path: str
+    type: Optional[str] = None
+    status: Optional[str] = None
+    remote_uri: Optional[str] = None
     size_mb: float
+    created_by: Optional[int] = None
+    description: Optional[str] = None
     created_at: str
 
 
@@ -84,6 +90,26 @@ class CreateBackupRequest(BaseModel):
     description: str = ""
 
 
+class ScheduledBackupRequest(BaseModel):
+    name: str
+    type: str = Field(..., pattern="^(full|world|plugins|config)$")
+    cron_expression: str
+    enabled: bool = True
+
+
+class ScheduledBackupInfo(BaseModel):
+    id: int
+    name: str
+    type: str
+    cron_expression: str
+    enabled: bool
+    last_run: Optional[datetime] = None
+    next_run: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 # Config schemas
 class UpdatePropertiesRequest(BaseModel):
     properties: Dict[str, str]
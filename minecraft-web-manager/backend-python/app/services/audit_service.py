@@ -0,0 +1,439 @@
+"""Registro de auditoría: escritura agrupada, consulta paginada y archivado"""
+import asyncio
+import gzip
+import json
+import os
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+from sqlalchemy import delete, insert, select
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.audit_log import AuditLog
+from app.models.user import User
+
+
+# Filas por consulta al exportar y por archivo al archivar
+EXPORT_CHUNK_ROWS = 1000
+ARCHIVE_CHUNK_ROWS = 5000
+
+# Intentos de un lote antes de insertarlo fila a fila y apartar las que fallan
+MAX_BATCH_ATTEMPTS = 3
+
+
+class AuditWriter:
+    """
+    Cola de eventos de auditoría que se insertan por lotes
+
+    record() solo encola (no toca la BD), así los endpoints auditados no
+    esperan un commit. Una tarea inserta la cola en una sola transacción
+    cada AUDIT_FLUSH_INTERVAL_MS o en cuanto hay AUDIT_BATCH_SIZE eventos.
+    La cola está limitada a AUDIT_QUEUE_MAX eventos: si la BD no da abasto
+    se descartan los nuevos y se cuentan en stats['dropped']. Al apagar se
+    escribe lo pendiente.
+
+    Un lote que falla MAX_BATCH_ATTEMPTS veces seguidas se inserta fila a
+    fila; las filas que siguen fallando se guardan en un audit-rejected-*.ndjson
+    de AUDIT_ARCHIVE_PATH (stats['rejected']) para que no bloqueen la cola.
+    """
+
+    def __init__(self):
+        self.batch_size = settings.AUDIT_BATCH_SIZE
+        self.interval = settings.AUDIT_FLUSH_INTERVAL_MS / 1000
+        self.max_queue = settings.AUDIT_QUEUE_MAX
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+        self._failures = 0
+        self.quarantine_path = Path(settings.AUDIT_ARCHIVE_PATH)
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0, "rejected": 0}
+
+    def record(
+        self,
+        action: str,
+        user_id: Optional[int] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        details: Any = None,
+        ip_address: Optional[str] = None
+    ) -> bool:
+        """
+        Encolar un evento de auditoría
+
+        Args:
+            action: Acción (login, create_world, update_ops...)
+            user_id: Usuario que la ejecuta
+            resource_type: Tipo de recurso (server, world, plugin, backup, config)
+            resource_id: Identificador del recurso
+            details: Detalles (dict o texto; los dict se guardan como JSON)
+            ip_address: IP del cliente
+
+        Returns:
+            False si la cola está llena y el evento se descartó
+        """
+        if len(self._queue) >= self.max_queue:
+            self.stats["dropped"] += 1
+            if self.stats["dropped"] == 1 or self.stats["dropped"] % 1000 == 0:
+                print(f"⚠️  Cola de auditoría llena: {self.stats['dropped']} eventos descartados")
+            return False
+
+        if details is not None and not isinstance(details, str):
+            details = json.dumps(details, default=str, ensure_ascii=False)
+
+        self._queue.append({
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": details,
+            "ip_address": ip_address,
+            # Hora del evento (UTC, como CURRENT_TIMESTAMP), no la de la escritura
+            "created_at": datetime.utcnow()
+        })
+        self.stats["recorded"] += 1
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+            if len(self._queue) >= self.batch_size:
+                self._full.set()
+        return True
+
+    async def start(self):
+        """Iniciar la tarea de escritura"""
+        if self._task:
+            return
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        if self._queue:
+            self._wakeup.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detener la tarea y escribir los eventos pendientes"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Cada fallo acerca el lote a su límite de intentos: el bucle termina
+        while self._queue:
+            try:
+                await self.flush()
+            except Exception:
+                pass  # El error ya se informó en flush()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+
+            # Ventana de agrupación: esperar más eventos salvo que el lote esté lleno
+            try:
+                await asyncio.wait_for(self._full.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self._full.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                # Reintentar en la siguiente ventana (los eventos siguen en la cola)
+                self._wakeup.set()
+                await asyncio.sleep(self.interval)
+
+    async def flush(self):
+        """Insertar todos los eventos encolados, un lote por transacción"""
+        async with self._flush_lock:
+            while self._queue:
+                count = min(len(self._queue), self.batch_size)
+                rows: List[Dict[str, Any]] = [self._queue[i] for i in range(count)]
+                rejected: List[Dict[str, Any]] = []
+                try:
+                    await self._insert(rows)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    self._failures += 1
+                    print(f"Error escribiendo auditoría ({count} eventos): {e}")
+                    if self._failures < MAX_BATCH_ATTEMPTS:
+                        raise
+                    rejected = await self._insert_each(rows)
+
+                self._failures = 0
+                for _ in range(count):
+                    self._queue.popleft()
+                self.stats["written"] += count - len(rejected)
+                self.stats["batches"] += 1
+
+    @staticmethod
+    async def _insert(rows: List[Dict[str, Any]]):
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(AuditLog), rows)
+            await db.commit()
+
+    async def _insert_each(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insertar un lote que no entra entero, fila a fila; devuelve las rechazadas"""
+        rejected = []
+        for row in rows:
+            try:
+                await self._insert([row])
+            except Exception:
+                rejected.append(row)
+        if not rejected:
+            return rejected
+
+        self.stats["rejected"] += len(rejected)
+        loop = asyncio.get_running_loop()
+        try:
+            path = await loop.run_in_executor(None, self._write_rejected, rejected)
+            print(f"⚠️  {len(rejected)} eventos de auditoría rechazados por la BD guardados en {path}")
+        except OSError as e:
+            print(f"⚠️  {len(rejected)} eventos de auditoría rechazados y descartados: {e}")
+        return rejected
+
+    def _write_rejected(self, rows: List[Dict[str, Any]]) -> Path:
+        """Guardar filas rechazadas como NDJSON (en un thread)"""
+        self.quarantine_path.mkdir(parents=True, exist_ok=True)
+        path = self.quarantine_path / f"audit-rejected-{datetime.utcnow():%Y%m%d%H%M%S%f}.ndjson"
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+        return path
+
+    def get_stats(self) -> Dict[str, int]:
+        """Contadores de la cola"""
+        return {**self.stats, "queued": len(self._queue)}
+
+
+def _serialize(log: AuditLog, username: Optional[str] = None) -> Dict[str, Any]:
+    details = log.details
+    if details and details[:1] in ("{", "["):
+        try:
+            details = json.loads(details)
+        except ValueError:
+            pass
+    return {
+        "id": log.id,
+        "user_id": log.user_id,
+        "username": username,
+        "action": log.action,
+        "resource_type": log.resource_type,
+        "resource_id": log.resource_id,
+        "details": details,
+        "ip_address": log.ip_address,
+        "created_at": log.created_at.isoformat() if log.created_at else None
+    }
+
+
+class AuditService:
+    """
+    Consulta, exportación y retención de audit_logs
+
+    La paginación es por cursor (id del último evento) en vez de OFFSET:
+    cada página es una búsqueda en el índice compuesto del filtro, cueste
+    lo mismo la primera página que la número mil. Los ids siguen el orden
+    de los eventos porque AuditWriter los inserta en el orden de record().
+
+    Las filas con más de AUDIT_RETENTION_DAYS días se mueven a archivos
+    NDJSON comprimidos en AUDIT_ARCHIVE_PATH para que la tabla no crezca
+    indefinidamente.
+    """
+
+    def __init__(self):
+        self.archive_path = Path(settings.AUDIT_ARCHIVE_PATH)
+        self._archive_lock = asyncio.Lock()
+        self._retention_task: Optional[asyncio.Task] = None
+
+    # ---------- Consulta ----------
+
+    @staticmethod
+    def _select(
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        cursor: Optional[int] = None,
+        ascending: bool = False
+    ):
+        stmt = select(AuditLog, User.username).outerjoin(User, User.id == AuditLog.user_id)
+
+        if user_id is not None:
+            stmt = stmt.where(AuditLog.user_id == user_id)
+        if action:
+            stmt = stmt.where(AuditLog.action == action)
+        if resource_type:
+            stmt = stmt.where(AuditLog.resource_type == resource_type)
+        if resource_id:
+            stmt = stmt.where(AuditLog.resource_id == resource_id)
+        if date_from:
+            stmt = stmt.where(AuditLog.created_at >= date_from)
+        if date_to:
+            stmt = stmt.where(AuditLog.created_at <= date_to)
+
+        if cursor is not None:
+            stmt = stmt.where(AuditLog.id > cursor if ascending else AuditLog.id < cursor)
+
+        return stmt.order_by(AuditLog.id.asc() if ascending else AuditLog.id.desc())
+
+    async def query(self, limit: int = 100, cursor: Optional[int] = None, **filters) -> Dict[str, Any]:
+        """
+        Página de eventos, del más reciente al más antiguo
+
+        Args:
+            limit: Máximo de eventos por página
+            cursor: next_cursor de la página anterior (None = primera)
+            **filters: user_id, action, resource_type, resource_id, date_from, date_to
+
+        Returns:
+            Dict con items y next_cursor (None si no hay más)
+        """
+        stmt = self._select(cursor=cursor, **filters).limit(limit + 1)
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(stmt)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [_serialize(log, username) for log, username in rows],
+            "next_cursor": rows[-1][0].id if has_more else None
+        }
+
+    async def export_ndjson(self, **filters) -> AsyncIterator[str]:
+        """
+        Exportar eventos como NDJSON, del más antiguo al más reciente
+
+        Recorre la tabla por cursor en bloques de EXPORT_CHUNK_ROWS, cada uno
+        con su propia sesión, así la respuesta puede ser de cualquier tamaño
+        sin cargarla entera en memoria ni retener una conexión.
+        """
+        cursor = None
+        while True:
+            stmt = self._select(cursor=cursor, ascending=True, **filters).limit(EXPORT_CHUNK_ROWS)
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(stmt)).all()
+            if not rows:
+                return
+
+            yield "".join(
+                json.dumps(_serialize(log, username), ensure_ascii=False) + "\n"
+                for log, username in rows
+            )
+
+            if len(rows) < EXPORT_CHUNK_ROWS:
+                return
+            cursor = rows[-1][0].id
+
+    # ---------- Retención ----------
+
+    def _write_archive(self, records: List[Dict[str, Any]]) -> Path:
+        """Escribir un bloque como .ndjson.gz de forma atómica (en un thread)"""
+        self.archive_path.mkdir(parents=True, exist_ok=True)
+        first, last = records[0], records[-1]
+        day = (first["created_at"] or "")[:10].replace("-", "") or "undated"
+        path = self.archive_path / f"audit-{day}-{first['id']}-{last['id']}.ndjson.gz"
+        temp = path.with_name(f".{path.name}.tmp")
+
+        with open(temp, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                for record in records:
+                    f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(temp, path)
+        return path
+
+    async def archive_old(self, older_than_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Mover a archivos comprimidos los eventos más antiguos que N días
+
+        Cada bloque se escribe (y sincroniza) antes de borrarse de la tabla:
+        si el proceso se corta a mitad, como mucho se repiten filas en el
+        archivo, nunca se pierden.
+
+        Args:
+            older_than_days: Antigüedad mínima (None = AUDIT_RETENTION_DAYS)
+
+        Returns:
+            Dict con success, archived (filas) y files
+        """
+        days = settings.AUDIT_RETENTION_DAYS if older_than_days is None else older_than_days
+        if days <= 0:
+            return {"success": True, "archived": 0, "files": []}
+
+        # created_at se guarda en UTC
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        loop = asyncio.get_running_loop()
+        archived = 0
+        files = []
+
+        async with self._archive_lock:
+            try:
+                while True:
+                    async with AsyncSessionLocal() as db:
+                        stmt = (
+                            select(AuditLog)
+                            .where(AuditLog.created_at < cutoff)
+                            .order_by(AuditLog.id)
+                            .limit(ARCHIVE_CHUNK_ROWS)
+                        )
+                        logs = (await db.execute(stmt)).scalars().all()
+                        if not logs:
+                            break
+
+                        records = [_serialize(log) for log in logs]
+                        path = await loop.run_in_executor(None, self._write_archive, records)
+
+                        # Todas las filas antiguas del rango de ids están en el bloque
+                        await db.execute(
+                            delete(AuditLog).where(
+                                AuditLog.id >= logs[0].id,
+                                AuditLog.id <= logs[-1].id,
+                                AuditLog.created_at < cutoff
+                            )
+                        )
+                        await db.commit()
+
+                    archived += len(records)
+                    files.append(path.name)
+            except Exception as e:
+                return {
+                    "success": False,
+                    "message": f"Error archivando auditoría: {e}",
+                    "archived": archived,
+                    "files": files
+                }
+
+        return {"success": True, "archived": archived, "files": files}
+
+    async def start_retention(self):
+        """Iniciar el archivado periódico en segundo plano"""
+        if self._retention_task or settings.AUDIT_RETENTION_DAYS <= 0:
+            return
+
+        async def retention_loop():
+            while True:
+                result = await self.archive_old()
+                if not result["success"]:
+                    print(result["message"])
+                elif result["archived"]:
+                    print(f"Auditoría: {result['archived']} eventos archivados en {len(result['files'])} archivo(s)")
+                await asyncio.sleep(settings.AUDIT_RETENTION_INTERVAL_HOURS * 3600)
+
+        self._retention_task = asyncio.create_task(retention_loop())
+
+    async def stop_retention(self):
+        """Detener el archivado periódico"""
+        if self._retention_task:
+            self._retention_task.cancel()
+            self._retention_task = None
+
+
+# Instancias globales
+audit_writer = AuditWriter()
+audit_service = AuditService()
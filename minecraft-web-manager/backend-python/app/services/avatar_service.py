@@ -0,0 +1,330 @@
+"""Avatares de jugadores renderizados localmente a partir de su skin"""
+import asyncio
+import base64
+import json
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.mojang_service import mojang_service
+from app.services.player_registry import UUID_PATTERN, normalize_uuid, player_registry
+
+
+# Tamaños servidos (múltiplos de la cara de 8x8 de la skin)
+AVATAR_SIZES = (16, 32, 64, 128)
+
+# Vigencia (segundos) de la cara genérica servida cuando Mojang no responde
+AVATAR_RETRY_SECONDS = 300
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Cara genérica (8x8) para jugadores sin skin o sin conexión a Mojang
+_H, _S, _E, _W, _M = (
+    (59, 40, 24, 255),     # pelo
+    (188, 137, 108, 255),  # piel
+    (73, 54, 160, 255),    # ojo
+    (255, 255, 255, 255),  # blanco
+    (110, 62, 46, 255),    # boca
+)
+DEFAULT_FACE = [
+    [_H, _H, _H, _H, _H, _H, _H, _H],
+    [_H, _H, _H, _H, _H, _H, _H, _H],
+    [_H, _S, _S, _S, _S, _S, _S, _H],
+    [_S, _S, _S, _S, _S, _S, _S, _S],
+    [_S, _W, _E, _S, _S, _E, _W, _S],
+    [_S, _S, _S, _M, _M, _S, _S, _S],
+    [_S, _S, _M, _S, _S, _M, _S, _S],
+    [_S, _S, _M, _M, _M, _M, _S, _S],
+]
+
+Pixel = Tuple[int, int, int, int]
+
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def decode_png(data: bytes) -> List[List[Pixel]]:
+    """
+    Decodificar un PNG de 8 bits (RGB, RGBA o paleta) sin entrelazado
+
+    Suficiente para las texturas de skins; no depende de Pillow.
+
+    Returns:
+        Matriz [fila][columna] de píxeles RGBA
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("No es un PNG")
+
+    offset = len(PNG_SIGNATURE)
+    idat = bytearray()
+    palette: List[Pixel] = []
+    transparency = b""
+    width = height = color_type = 0
+
+    while offset < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[offset:offset + 8])
+        chunk = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+
+        if chunk_type == b"IHDR":
+            width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+            if bit_depth != 8 or interlace or color_type not in (2, 3, 6):
+                raise ValueError("Formato PNG no soportado")
+        elif chunk_type == b"PLTE":
+            palette = [(chunk[i], chunk[i + 1], chunk[i + 2], 255) for i in range(0, len(chunk), 3)]
+        elif chunk_type == b"tRNS":
+            transparency = chunk
+        elif chunk_type == b"IDAT":
+            idat += chunk
+        elif chunk_type == b"IEND":
+            break
+
+    if color_type == 3:
+        palette = [
+            (r, g, b, transparency[i] if i < len(transparency) else 255)
+            for i, (r, g, b, _) in enumerate(palette)
+        ]
+
+    channels = {2: 3, 3: 1, 6: 4}[color_type]
+    stride = width * channels
+    raw = zlib.decompress(bytes(idat))
+    previous = bytearray(stride)
+    rows = []
+
+    for y in range(height):
+        start = y * (stride + 1)
+        filter_type = raw[start]
+        line = bytearray(raw[start + 1:start + 1 + stride])
+
+        for x in range(stride):
+            left = line[x - channels] if x >= channels else 0
+            up = previous[x]
+            up_left = previous[x - channels] if x >= channels else 0
+            if filter_type == 1:
+                line[x] = (line[x] + left) & 0xFF
+            elif filter_type == 2:
+                line[x] = (line[x] + up) & 0xFF
+            elif filter_type == 3:
+                line[x] = (line[x] + ((left + up) >> 1)) & 0xFF
+            elif filter_type == 4:
+                line[x] = (line[x] + _paeth(left, up, up_left)) & 0xFF
+
+        if color_type == 6:
+            row = [tuple(line[i:i + 4]) for i in range(0, stride, 4)]
+        elif color_type == 2:
+            row = [(line[i], line[i + 1], line[i + 2], 255) for i in range(0, stride, 3)]
+        else:
+            row = [palette[index] for index in line]
+        rows.append(row)
+        previous = line
+
+    return rows
+
+
+def encode_png(pixels: List[List[Pixel]]) -> bytes:
+    """Codificar una matriz RGBA como PNG"""
+    height = len(pixels)
+    width = len(pixels[0]) if height else 0
+    raw = b"".join(b"\x00" + bytes(v for pixel in row for v in pixel) for row in pixels)
+
+    def chunk(chunk_type: bytes, body: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(body)) + chunk_type + body
+            + struct.pack(">I", zlib.crc32(chunk_type + body) & 0xFFFFFFFF)
+        )
+
+    return (
+        PNG_SIGNATURE
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+def render_head(skin: Optional[List[List[Pixel]]]) -> List[List[Pixel]]:
+    """Cara de la skin (8x8) con la capa exterior (sombrero) encima"""
+    if skin is None or len(skin) < 16 or len(skin[0]) < 48:
+        return [list(row) for row in DEFAULT_FACE]
+
+    face = []
+    for y in range(8, 16):
+        row = []
+        for x in range(8, 16):
+            r, g, b, _ = skin[y][x]
+            hr, hg, hb, ha = skin[y][x + 32]
+            if ha:
+                # Mezcla alfa de la capa exterior sobre la cara opaca
+                alpha = ha / 255
+                r = round(hr * alpha + r * (1 - alpha))
+                g = round(hg * alpha + g * (1 - alpha))
+                b = round(hb * alpha + b * (1 - alpha))
+            row.append((r, g, b, 255))
+        face.append(row)
+    return face
+
+
+def scale(pixels: List[List[Pixel]], size: int) -> List[List[Pixel]]:
+    """Escalado por vecino más cercano (mantiene los píxeles nítidos)"""
+    factor = size // len(pixels)
+    return [
+        [pixel for pixel in row for _ in range(factor)]
+        for row in pixels
+        for _ in range(factor)
+    ]
+
+
+class AvatarService:
+    """
+    Sirve avatares (cabeza + capa exterior) desde una caché en disco
+
+    La skin se descarga una vez por jugador, se renderiza a todos los
+    tamaños de AVATAR_SIZES y se guarda en AVATAR_CACHE_PATH. Los archivos
+    se renuevan pasadas AVATAR_CACHE_TTL_HOURS; si Mojang no responde se
+    sigue sirviendo la copia existente y, si no la hay, la cara genérica
+    sin guardarla como la del jugador (se reintenta en la siguiente
+    petición).
+    """
+
+    def __init__(self):
+        self.cache_dir = Path(settings.AVATAR_CACHE_PATH)
+        self.ttl_seconds = settings.AVATAR_CACHE_TTL_HOURS * 3600
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _path(self, key: str, size: int) -> Path:
+        return self.cache_dir / f"{key}_{size}.png"
+
+    async def _resolve_uuid(self, player: str) -> Optional[str]:
+        """Aceptar UUID (con o sin guiones) o nombre de jugador"""
+        uuid = normalize_uuid(player)
+        if UUID_PATTERN.match(uuid):
+            return uuid
+
+        cached = await player_registry.get_by_name(player)
+        if cached and cached.get("uuid"):
+            return normalize_uuid(cached["uuid"])
+
+        data = await mojang_service.lookup_name(player)
+        return normalize_uuid(data["uuid"]) if data else None
+
+    @staticmethod
+    def _skin_url(profile: Dict) -> Optional[str]:
+        """URL de la skin en la propiedad textures (base64 + JSON) del perfil"""
+        for prop in profile.get("properties", []):
+            if prop.get("name") != "textures":
+                continue
+            textures = json.loads(base64.b64decode(prop["value"]))
+            url = textures.get("textures", {}).get("SKIN", {}).get("url")
+            if url:
+                return url
+        return None
+
+    async def _fetch_skin(self, uuid: str) -> Tuple[bool, Optional[bytes]]:
+        """
+        Descargar la textura de skin del perfil del jugador
+
+        Returns:
+            Tupla (ok, png). ok=False si Mojang no respondió (nada que
+            guardar); png=None con ok=True si el jugador no tiene skin propia
+        """
+        profile = await mojang_service.get_profile(uuid)
+        if not profile:
+            return False, None
+
+        try:
+            url = self._skin_url(profile)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # JSONDecodeError y binascii.Error son ValueError
+            print(f"Propiedad textures no válida para {uuid}: {e}")
+            return True, None
+
+        if not url:
+            return True, None
+        skin_png = await mojang_service.download(url)
+        return skin_png is not None, skin_png
+
+    def _render_to_disk(self, key: str, skin_png: Optional[bytes]):
+        """Renderizar todos los tamaños y escribirlos de forma atómica"""
+        skin = None
+        if skin_png:
+            try:
+                skin = decode_png(skin_png)
+            except (ValueError, zlib.error, struct.error, IndexError) as e:
+                print(f"Skin no válida para {key}: {e}")
+
+        head = render_head(skin)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for size in AVATAR_SIZES:
+            path = self._path(key, size)
+            temp = path.with_name(path.name + ".tmp")
+            temp.write_bytes(encode_png(scale(head, size)))
+            os.replace(temp, path)
+
+    def _is_fresh(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime < self.ttl_seconds
+        except OSError:
+            return False
+
+    async def _refresh(self, key: str, uuid: Optional[str]):
+        """Descargar y renderizar (una sola vez aunque haya peticiones simultáneas)"""
+        if key in self._inflight:
+            await asyncio.shield(self._inflight[key])
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            ok, skin_png = await self._fetch_skin(uuid) if uuid else (True, None)
+            if not ok:
+                # Sin respuesta de Mojang: mantener la copia anterior otro
+                # periodo; sin copia no se guarda nada
+                for size in AVATAR_SIZES:
+                    if self._path(key, size).exists():
+                        os.utime(self._path(key, size))
+                return
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._render_to_disk, key, skin_png)
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(None)
+
+    async def get_avatar(self, player: str, size: int) -> Tuple[bytes, str, int]:
+        """
+        Obtener el PNG del avatar de un jugador
+
+        Args:
+            player: UUID o nombre del jugador
+            size: Tamaño en píxeles (uno de AVATAR_SIZES)
+
+        Returns:
+            Tupla (contenido PNG, ETag, segundos de caché para el cliente)
+        """
+        uuid = await self._resolve_uuid(player)
+        key = uuid or "default"
+        path = self._path(key, size)
+        max_age = self.ttl_seconds
+
+        if not self._is_fresh(path):
+            await self._refresh(key, uuid)
+
+        if not path.exists():
+            # Mojang no respondió y no hay copia: cara genérica por poco tiempo
+            key, path, max_age = "default", self._path("default", size), AVATAR_RETRY_SECONDS
+            if not self._is_fresh(path):
+                await self._refresh(key, None)
+
+        stat = path.stat()
+        etag = f'"{key}-{size}-{stat.st_mtime_ns:x}"'
+        return path.read_bytes(), etag, max_age
+
+
+# Instancia global
+avatar_service = AvatarService()
@@ -0,0 +1,366 @@
+"""Programador de backups basado en la tabla scheduled_backups"""
+import asyncio
+import heapq
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.backup_history import BackupHistory
+from app.models.scheduled_backup import ScheduledBackup
+from app.services.backup_service import backup_service
+
+
+CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# Máximo que duerme el loop antes de revisar la cola (cubre cambios de hora del sistema)
+MAX_SLEEP_SECONDS = 60
+
+
+class CronExpression:
+    """
+    Expresión cron de 5 campos: minuto hora día-mes mes día-semana
+
+    Soporta *, listas (1,2), rangos (1-5), pasos (*/15, 1-30/5) y los alias
+    @hourly, @daily, @weekly, @monthly, @yearly. Las horas son locales.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Expresión cron inválida: '{expression}'")
+
+        self.minutes = sorted(self._parse_field(fields[0], 0, 59))
+        self.hours = sorted(self._parse_field(fields[1], 0, 23))
+        self.days = self._parse_field(fields[2], 1, 31)
+        self.months = sorted(self._parse_field(fields[3], 1, 12))
+        # 0 y 7 son domingo; se normaliza a weekday() de Python (lunes=0)
+        self.weekdays = {(d - 1) % 7 for d in self._parse_field(fields[4], 0, 7)}
+
+        # Semántica de cron (Vixie): si día-mes y día-semana están restringidos
+        # basta con uno; si alguno empieza por '*' (también */N) se exigen ambos
+        self._day_or = not fields[2].startswith("*") and not fields[4].startswith("*")
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        """Convertir un campo cron en el conjunto de valores permitidos"""
+        values = set()
+
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+                if step < 1:
+                    raise ValueError(f"Paso inválido en campo cron: '{field}'")
+
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+
+            if start < low or end > high or start > end:
+                raise ValueError(f"Valor fuera de rango en campo cron: '{field}'")
+
+            values.update(range(start, end + 1, step))
+
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        """Verificar día del mes y día de la semana"""
+        day_ok = dt.day in self.days
+        weekday_ok = dt.weekday() in self.weekdays
+
+        if self._day_or:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Calcular la próxima ejecución estrictamente posterior a una fecha
+
+        Salta campo por campo (mes, día, hora, minuto) en vez de recorrer
+        minuto a minuto.
+
+        Args:
+            after: Fecha de referencia (naive, hora local)
+
+        Returns:
+            Próxima fecha de ejecución
+        """
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt.year + 5
+
+        while dt.year <= limit:
+            if dt.month not in self.months:
+                i = bisect_left(self.months, dt.month)
+                if i < len(self.months):
+                    dt = dt.replace(month=self.months[i], day=1, hour=0, minute=0)
+                else:
+                    dt = dt.replace(year=dt.year + 1, month=self.months[0], day=1, hour=0, minute=0)
+                continue
+
+            if not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+
+            if dt.hour not in self.hours:
+                i = bisect_left(self.hours, dt.hour)
+                if i < len(self.hours):
+                    dt = dt.replace(hour=self.hours[i], minute=0)
+                else:
+                    dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+
+            i = bisect_left(self.minutes, dt.minute)
+            if i < len(self.minutes):
+                return dt.replace(minute=self.minutes[i])
+            dt = (dt + timedelta(hours=1)).replace(minute=0)
+
+        raise ValueError(f"La expresión cron '{self.expression}' nunca se ejecuta")
+
+
+class BackupScheduler:
+    """
+    Ejecuta los backups programados dentro del proceso (asyncio)
+
+    Mantiene un heap ordenado por próxima ejecución y duerme hasta la más
+    cercana. Nunca corre dos backups del mismo tipo a la vez: si un disparo
+    encuentra su tipo ocupado, se omite (se fusiona con el que está en curso).
+    La comprobación y la toma del lock del tipo las hace create_backup sin
+    ceder el event loop entre ambas.
+    """
+
+    def __init__(self):
+        self.misfire_policy = settings.BACKUP_MISFIRE_POLICY
+        self._heap: List[Tuple[datetime, int]] = []
+        self._schedules: Dict[int, Tuple[str, str, CronExpression]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def start(self):
+        """Cargar programaciones e iniciar el loop"""
+        if self._task:
+            return
+
+        await self._load()
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """Detener el loop y esperar backups en curso"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def reload(self):
+        """Recargar programaciones desde la DB (tras crear/editar/eliminar)"""
+        await self._load()
+        self._wakeup.set()
+
+    async def _load(self):
+        """Leer programaciones habilitadas (en un thread) y reconstruir el heap"""
+        loop = asyncio.get_running_loop()
+        schedules, heap = await loop.run_in_executor(None, self._read_schedules)
+        self._schedules = schedules
+        self._heap = heap
+
+    def _read_schedules(self) -> Tuple[Dict[int, Tuple[str, str, CronExpression]], List[Tuple[datetime, int]]]:
+        """Programaciones habilitadas y su heap, con next_run al día en la DB"""
+        now = datetime.now()
+        schedules = {}
+        heap = []
+
+        db = SessionLocal()
+        try:
+            rows = db.query(ScheduledBackup).filter(ScheduledBackup.enabled == True).all()
+
+            for row in rows:
+                try:
+                    cron = CronExpression(row.cron_expression)
+                except ValueError as e:
+                    print(f"Backup programado '{row.name}' ignorado: {e}")
+                    continue
+
+                next_run = row.next_run
+                if next_run is None:
+                    next_run = cron.next_after(now)
+                elif next_run <= now:
+                    # Ejecuciones perdidas mientras el panel estaba detenido
+                    if self.misfire_policy == "coalesce":
+                        next_run = now
+                    else:
+                        next_run = cron.next_after(now)
+
+                row.next_run = next_run
+                schedules[row.id] = (row.type, row.name, cron)
+                heap.append((next_run, row.id))
+
+            db.commit()
+        finally:
+            db.close()
+
+        heapq.heapify(heap)
+        return schedules, heap
+
+    async def _run_loop(self):
+        """Dormir hasta la próxima ejecución y dispararla"""
+        while True:
+            try:
+                timeout = MAX_SLEEP_SECONDS
+                if self._heap:
+                    next_run, schedule_id = self._heap[0]
+                    delay = (next_run - datetime.now()).total_seconds()
+
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        self._fire(schedule_id, next_run)
+                        continue
+
+                    timeout = min(delay, MAX_SLEEP_SECONDS)
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error en programador de backups: {e}")
+                await asyncio.sleep(MAX_SLEEP_SECONDS)
+
+    def _fire(self, schedule_id: int, scheduled_for: datetime):
+        """Lanzar un backup programado y encolar su siguiente ejecución"""
+        entry = self._schedules.get(schedule_id)
+        if not entry:
+            return
+
+        backup_type, name, cron = entry
+        next_run = cron.next_after(max(scheduled_for, datetime.now()))
+        heapq.heappush(self._heap, (next_run, schedule_id))
+
+        if backup_service.is_running(backup_type):
+            print(f"Backup programado '{name}' omitido: ya hay un backup '{backup_type}' en curso")
+            self._spawn(self._skip(schedule_id, next_run))
+            return
+
+        self._spawn(self._execute(schedule_id, backup_type, next_run))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _skip(self, schedule_id: int, next_run: datetime):
+        """Guardar el próximo disparo de una ejecución omitida"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._update_schedule, schedule_id, None, next_run)
+        except Exception as e:
+            print(f"Error actualizando backup programado {schedule_id}: {e}")
+
+    async def _execute(self, schedule_id: int, backup_type: str, next_run: datetime):
+        """
+        Ejecutar el backup y registrar el resultado en backup_history
+
+        Las escrituras en la DB corren en un thread y ninguna sesión queda
+        abierta mientras dura el backup.
+        """
+        loop = asyncio.get_running_loop()
+        started_at = datetime.now()
+        try:
+            await loop.run_in_executor(None, self._update_schedule, schedule_id, started_at, next_run)
+            record_id = await loop.run_in_executor(None, self._start_record, backup_type)
+
+            result = await backup_service.create_backup(backup_type, skip_if_running=True)
+
+            if result.get("skipped"):
+                print(f"Backup programado {schedule_id} omitido: {result['message']}")
+            await loop.run_in_executor(None, self._finish_record, record_id, result)
+        except Exception as e:
+            print(f"Error ejecutando backup programado {schedule_id}: {e}")
+
+    @staticmethod
+    def _start_record(backup_type: str) -> int:
+        """Fila in_progress de backup_history; devuelve su id"""
+        db = SessionLocal()
+        try:
+            record = BackupHistory(
+                filename="",
+                type=backup_type,
+                path="",
+                status="in_progress"
+            )
+            db.add(record)
+            db.commit()
+            return record.id
+        finally:
+            db.close()
+
+    @staticmethod
+    def _finish_record(record_id: int, result: Dict[str, Any]):
+        """Completar la fila con el resultado (o borrarla si se omitió)"""
+        db = SessionLocal()
+        try:
+            record = db.get(BackupHistory, record_id)
+            if record is None:
+                return
+            if result.get("skipped"):
+                db.delete(record)
+                db.commit()
+                return
+
+            record.duration_seconds = result.get("duration_seconds")
+            if result.get("success"):
+                record.status = "completed"
+                record.filename = result.get("filename") or ""
+                record.path = result.get("path") or ""
+                record.size_bytes = result.get("size_bytes")
+            else:
+                record.status = "failed"
+                record.error_message = result.get("message")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _update_schedule(
+        self,
+        schedule_id: int,
+        last_run: Optional[datetime],
+        next_run: datetime
+    ):
+        """Persistir last_run/next_run de una programación"""
+        db = SessionLocal()
+        try:
+            row = db.query(ScheduledBackup).filter(ScheduledBackup.id == schedule_id).first()
+            if row:
+                if last_run:
+                    row.last_run = last_run
+                row.next_run = next_run
+                db.commit()
+        finally:
+            db.close()
+
+
+# Instancia global
+backup_scheduler = BackupScheduler()
@@ -1,9 +1,50 @@
 """Servicio para sistema de backups"""
+import asyncio
+import os
+import re
+import time
 from pathlib import Path
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence, Set
+from datetime import datetime, timezone
 from app.core.config import settings
+from app.core.metrics import backup_bytes, backup_duration, backup_throughput
+from app.db.session import SessionLocal
+from app.models.backup_history import BackupHistory
 from app.services.bash_service import bash_service
+from app.services.backup_verifier import backup_verifier, CATALOG_STATUSES
+from app.services.storage_targets import get_storage_target
+
+
+BACKUP_TYPES = ["full", "world", "plugins", "config"]
+
+# Códigos de color ANSI que imprime backup.sh
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Copias de seguridad automáticas previas a una restauración: tipo propio,
+# fuera de los niveles diario/semanal/mensual (solo cuentan los últimos N)
+PRE_RESTORE_TYPE = "pre-restore"
+
+# Prefijo de archivo generado por backup.sh -> tipo de backup
+FILENAME_PREFIXES = {
+    "backup-": "full",
+    "pre-restore-": PRE_RESTORE_TYPE,
+    "world-": "world",
+    "plugins-": "plugins",
+    "config-": "config",
+}
+
+# Fecha incluida en el nombre por backup.sh (YYYYmmdd-HHMMSS)
+FILENAME_DATE = re.compile(r"(\d{8}-\d{6})")
+
+
+def to_utc(value: datetime) -> datetime:
+    """
+    Fecha en UTC sin zona, como guarda backup_history.created_at
+
+    Args:
+        value: Fecha con zona, o sin zona en hora local
+    """
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class BackupService:
@@ -12,75 +53,284 @@ class BackupService:
     def __init__(self):
         self.backup_path = Path(settings.BACKUP_PATH)
         self.scripts_path = Path(settings.SERVER_PATH).parent
+        # Un solo backup en curso por tipo
+        self._type_locks = {backup_type: asyncio.Lock() for backup_type in BACKUP_TYPES}
+        self._retention_task: Optional[asyncio.Task] = None
+        self._retention_lock = asyncio.Lock()
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._catalog_task: Optional[asyncio.Task] = None
+        self._catalog_signature = None
+        # Una sola subida remota a la vez (comparten ancho de banda)
+        self._upload_lock = asyncio.Lock()
+    
+    def is_running(self, backup_type: str) -> bool:
+        """Verificar si hay un backup de este tipo en curso"""
+        lock = self._type_locks.get(backup_type)
+        return lock is not None and lock.locked()
     
-    async def list_backups(self) -> List[Dict[str, Any]]:
+    async def list_backups(
+        self,
+        backup_type: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        min_size_mb: Optional[float] = None,
+        max_size_mb: Optional[float] = None,
+        limit: int = 100,
+        offset: int = 0,
+        statuses: Optional[Sequence[str]] = CATALOG_STATUSES
+    ) -> Dict[str, Any]:
         """
-        Listar backups disponibles
+        Listar backups desde el catálogo (backup_history)
+        
+        El catálogo se mantiene sincronizado con el disco por el watcher, así
+        que listar no recorre el directorio. La consulta corre en un thread.
+        
+        Args:
+            backup_type: Filtrar por tipo
+            date_from: Creados desde esta fecha (sin zona = hora local)
+            date_to: Creados hasta esta fecha (sin zona = hora local)
+            min_size_mb: Tamaño mínimo
+            max_size_mb: Tamaño máximo
+            limit: Máximo de resultados
+            offset: Desplazamiento para paginar
+            statuses: Estados a incluir; None = todo el historial (también
+                fallidos, en curso y eliminados)
         
         Returns:
-            Lista de backups con info
+            Dict con backups (más recientes primero) y total. created_at se
+            devuelve en ISO 8601 con zona (UTC).
         """
-        backups = []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._list_backups_sync,
+            backup_type, date_from, date_to, min_size_mb, max_size_mb, limit, offset, statuses
+        )
+    
+    def _list_backups_sync(
+        self,
+        backup_type: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        min_size_mb: Optional[float],
+        max_size_mb: Optional[float],
+        limit: int,
+        offset: int,
+        statuses: Optional[Sequence[str]]
+    ) -> Dict[str, Any]:
+        """Consulta del catálogo para list_backups (en un thread)"""
+        db = SessionLocal()
+        try:
+            query = db.query(BackupHistory)
+            
+            if statuses is not None:
+                query = query.filter(BackupHistory.status.in_(statuses))
+            if backup_type:
+                query = query.filter(BackupHistory.type == backup_type)
+            if date_from:
+                query = query.filter(BackupHistory.created_at >= to_utc(date_from))
+            if date_to:
+                query = query.filter(BackupHistory.created_at <= to_utc(date_to))
+            if min_size_mb is not None:
+                query = query.filter(BackupHistory.size_bytes >= int(min_size_mb * 1024 * 1024))
+            if max_size_mb is not None:
+                query = query.filter(BackupHistory.size_bytes <= int(max_size_mb * 1024 * 1024))
+            
+            total = query.count()
+            rows = query.order_by(
+                BackupHistory.created_at.desc(),
+                BackupHistory.id.desc()
+            ).offset(offset).limit(limit).all()
+            
+            backups = [
+                {
+                    "id": row.id,
+                    "filename": row.filename,
+                    "path": row.path,
+                    "type": row.type,
+                    "status": row.status,
+                    "remote_uri": row.remote_uri,
+                    "size_bytes": row.size_bytes,
+                    "size_mb": (row.size_bytes or 0) / (1024 * 1024),
+                    "duration_seconds": row.duration_seconds,
+                    "created_by": row.created_by,
+                    "description": row.description,
+                    "error_message": row.error_message,
+                    "created_at": (
+                        row.created_at.replace(tzinfo=timezone.utc).isoformat()
+                        if row.created_at else ""
+                    )
+                }
+                for row in rows
+            ]
+            
+            return {"backups": backups, "total": total}
+        finally:
+            db.close()
+    
+    def _scan_archives(self) -> List[Dict[str, Any]]:
+        """
+        Recorrer el directorio de backups (un solo stat por archivo)
+        
+        Returns:
+            Lista de archivos .tar.gz con filename, path, type, size_bytes, created_at
+        """
+        archives = []
         
         if not self.backup_path.exists():
-            return backups
-        
-        for file in self.backup_path.iterdir():
-            if file.is_file() and file.suffix == ".gz":
-                backups.append({
-                    "filename": file.name,
-                    "path": str(file),
-                    "size_mb": file.stat().st_size / (1024 * 1024),
-                    "created_at": datetime.fromtimestamp(file.stat().st_mtime).isoformat()
+            return archives
+        
+        with os.scandir(self.backup_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".gz") or not entry.is_file():
+                    continue
+                
+                stat = entry.stat()
+                archives.append({
+                    "filename": entry.name,
+                    "path": entry.path,
+                    "type": self._type_from_filename(entry.name),
+                    "size_bytes": stat.st_size,
+                    "created_at": self._date_from_filename(entry.name, stat.st_mtime)
                 })
         
-        # Ordenar por fecha (más recientes primero)
-        backups.sort(key=lambda x: x["created_at"], reverse=True)
+        return archives
+    
+    @staticmethod
+    def _type_from_filename(filename: str) -> Optional[str]:
+        """Deducir el tipo de backup por el prefijo del archivo"""
+        for prefix, backup_type in FILENAME_PREFIXES.items():
+            if filename.startswith(prefix):
+                return backup_type
+        return None
+    
+    @staticmethod
+    def _date_from_filename(filename: str, mtime: float) -> datetime:
+        """
+        Fecha del backup según su nombre, o mtime si no la incluye
         
-        return backups
+        Hora local sin zona (backup.sh usa `date` local): los niveles de
+        retención cuentan días locales. Para el catálogo se pasa a UTC.
+        """
+        match = FILENAME_DATE.search(filename)
+        if match:
+            try:
+                return datetime.strptime(match.group(1), "%Y%m%d-%H%M%S")
+            except ValueError:
+                pass
+        return datetime.fromtimestamp(mtime)
     
-    async def create_backup(self, backup_type: str, description: str = "") -> Dict[str, Any]:
+    async def create_backup(
+        self,
+        backup_type: str,
+        description: str = "",
+        skip_if_running: bool = False
+    ) -> Dict[str, Any]:
         """
         Crear backup
         
         Args:
             backup_type: full, world, plugins, config
             description: Descripción del backup
+            skip_if_running: Si ya hay un backup de ese tipo en curso, no
+                esperar a que termine y devolver skipped=True
         
         Returns:
-            Dict con success, filename, path
+            Dict con success, filename, path, size_bytes, duration_seconds
         """
-        if backup_type not in ["full", "world", "plugins", "config"]:
+        if backup_type not in BACKUP_TYPES:
             return {"success": False, "message": "Tipo de backup inválido"}
         
+        lock = self._type_locks[backup_type]
+        # Sin await entre locked() y la toma del lock: nadie puede colarse
+        if skip_if_running and lock.locked():
+            return {
+                "success": False,
+                "skipped": True,
+                "message": f"Ya hay un backup '{backup_type}' en curso"
+            }
+        
+        async with lock:
+            result = await self._run_backup_script(backup_type)
+        
+        if result["success"]:
+            task = asyncio.create_task(self._after_backup(result.get("filename"), description))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        
+        return result
+    
+    async def _after_backup(self, filename: Optional[str], description: str = ""):
+        """Catalogar, aplicar retención y calcular checksum de un backup nuevo"""
+        if settings.BACKUP_RETENTION_ENABLED:
+            await self.apply_retention()
+        else:
+            await self.refresh_catalog()
+        
+        if not filename:
+            return
+        
+        if description:
+            self._describe(filename, description)
+        
+        result = await backup_verifier.verify_filename(filename)
+        if result.get("status") == "corrupt":
+            print(f"⚠ Backup recién creado corrupto: {filename} ({result['error']})")
+            return
+        
+        if result.get("success") and settings.BACKUP_REMOTE_TARGET:
+            upload = await self.upload_backup(result["id"])
+            if not upload["success"]:
+                print(f"Error subiendo backup {filename}: {upload['message']}")
+    
+    async def _run_backup_script(self, backup_type: str) -> Dict[str, Any]:
+        """Ejecutar backup.sh y medir duración y tamaño del archivo generado"""
+        started = time.monotonic()
+        
         try:
-            backup_script = self.scripts_path / "backup.sh"
+            # Con retención activa, backup.sh no borra por antigüedad
+            env = {"BACKUP_RETENTION_MANAGED": "1"} if settings.BACKUP_RETENTION_ENABLED else None
             result = await bash_service.execute_script(
                 "backup.sh",
-                [backup_type]
+                [backup_type],
+                env=env
             )
+            duration = time.monotonic() - started
             
             if result["success"]:
                 # Obtener nombre del archivo del stdout
                 filename = None
-                for line in result["stdout"].split("\n"):
+                for line in ANSI_ESCAPE.sub("", result["stdout"]).split("\n"):
                     if ".tar.gz" in line:
-                        filename = line.split()[-1]
+                        filename = Path(line.split()[-1]).name
                         break
                 
+                path = self.backup_path / filename if filename else None
+                size_bytes = path.stat().st_size if path and path.exists() else None
+                
+                backup_duration.observe(duration, backup_type, "success")
+                if size_bytes:
+                    backup_bytes.inc(backup_type, amount=size_bytes)
+                    backup_throughput.set(size_bytes / max(duration, 0.001), backup_type)
+                
                 return {
                     "success": True,
                     "message": "Backup creado exitosamente",
                     "filename": filename,
+                    "path": str(path) if path else None,
+                    "size_bytes": size_bytes,
+                    "duration_seconds": round(duration, 3),
                     "type": backup_type
                 }
             else:
+                backup_duration.observe(duration, backup_type, "failed")
                 return {
                     "success": False,
-                    "message": result["stderr"]
+                    "message": result["stderr"],
+                    "duration_seconds": round(duration, 3)
                 }
                 
         except Exception as e:
+            backup_duration.observe(time.monotonic() - started, backup_type, "failed")
             return {"success": False, "message": f"Error al crear backup: {str(e)}"}
     
     async def delete_backup(self, filename: str) -> Dict[str, Any]:
@@ -93,11 +343,13 @@ class BackupService:
         Returns:
             Dict con success y mensaje
         """
+        filename = Path(filename).name
         backup_file = self.backup_path / filename
         
         try:
             if backup_file.exists():
                 backup_file.unlink()
+                self._forget(filename)
                 return {
                     "success": True,
                     "message": f"Backup '{filename}' eliminado"
@@ -108,6 +360,342 @@ class BackupService:
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
 
+    
+    async def upload_backup(self, backup_id: int) -> Dict[str, Any]:
+        """
+        Copiar un backup del catálogo al destino remoto configurado
+        
+        Args:
+            backup_id: ID en backup_history
+        
+        Returns:
+            Dict con success, uri, bytes, duration_seconds
+        """
+        target = get_storage_target()
+        if target is None:
+            return {"success": False, "message": "No hay destino remoto configurado"}
+        
+        # No mantener la sesión abierta durante una subida que puede durar horas
+        db = SessionLocal()
+        try:
+            row = db.query(BackupHistory).filter(BackupHistory.id == backup_id).first()
+            path = Path(row.path) if row and row.path else None
+            filename = row.filename if row else None
+        finally:
+            db.close()
+        
+        if path is None or not path.exists():
+            return {"success": False, "message": "Backup no encontrado"}
+        
+        async with self._upload_lock:
+            try:
+                result = await target.upload(path, filename)
+            except Exception as e:
+                return {"success": False, "message": f"Error en subida {target.name}: {str(e)}"}
+        
+        db = SessionLocal()
+        try:
+            db.query(BackupHistory).filter(BackupHistory.id == backup_id).update(
+                {
+                    BackupHistory.remote_uri: result["uri"],
+                    BackupHistory.uploaded_at: to_utc(datetime.now())
+                },
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+        
+        return result
+    
+    def _describe(self, filename: str, description: str):
+        """Guardar la descripción indicada al crear el backup en su fila del catálogo"""
+        db = SessionLocal()
+        try:
+            db.query(BackupHistory).filter(
+                BackupHistory.filename == filename,
+                BackupHistory.status.in_(CATALOG_STATUSES)
+            ).update({BackupHistory.description: description[:255]}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+    
+    def _forget(self, filename: str):
+        """Sacar del catálogo un archivo borrado (la fila queda como historial)"""
+        db = SessionLocal()
+        try:
+            db.query(BackupHistory).filter(
+                BackupHistory.filename == filename,
+                BackupHistory.status.in_(CATALOG_STATUSES)
+            ).update({BackupHistory.status: "deleted"}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+    
+    # ========== Retención ==========
+    
+    def plan_retention(self, archives: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Calcular qué archivos conservar con política abuelo-padre-hijo (GFS)
+        
+        Por tipo se conservan los BACKUP_RETENTION_LAST más recientes, el más
+        reciente de cada uno de los últimos N días, semanas ISO y meses, y
+        luego se aplica el presupuesto de tamaño del tipo (el más reciente
+        siempre se conserva). Las copias pre-restore solo cuentan para los
+        últimos N: no ocupan niveles.
+        
+        Args:
+            archives: Resultado de _scan_archives()
+        
+        Returns:
+            Dict con keep y prune
+        """
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        keep: List[Dict[str, Any]] = []
+        
+        for archive in archives:
+            if archive["type"] is None:
+                # Archivo desconocido: nunca se elimina
+                keep.append(archive)
+                continue
+            by_type.setdefault(archive["type"], []).append(archive)
+        
+        tiers = [
+            (settings.BACKUP_RETENTION_DAILY, lambda d: d.date()),
+            (settings.BACKUP_RETENTION_WEEKLY, lambda d: d.isocalendar()[:2]),
+            (settings.BACKUP_RETENTION_MONTHLY, lambda d: (d.year, d.month)),
+        ]
+        prune: List[Dict[str, Any]] = []
+        
+        for backup_type, items in by_type.items():
+            items.sort(key=lambda a: a["created_at"], reverse=True)
+            kept: Set[str] = {a["path"] for a in items[:max(settings.BACKUP_RETENTION_LAST, 1)]}
+            
+            for limit, bucket_of in ([] if backup_type == PRE_RESTORE_TYPE else tiers):
+                buckets = set()
+                for archive in items:
+                    if len(buckets) >= limit:
+                        break
+                    bucket = bucket_of(archive["created_at"])
+                    if bucket not in buckets:
+                        buckets.add(bucket)
+                        kept.add(archive["path"])
+            
+            budget_mb = settings.BACKUP_SIZE_BUDGET_MB.get(backup_type, 0)
+            used = 0
+            for index, archive in enumerate(items):
+                if archive["path"] not in kept:
+                    prune.append(archive)
+                    continue
+                used += archive["size_bytes"]
+                if budget_mb and index > 0 and used > budget_mb * 1024 * 1024:
+                    prune.append(archive)
+                    used -= archive["size_bytes"]
+                    continue
+                keep.append(archive)
+        
+        return {"keep": keep, "prune": prune}
+    
+    async def apply_retention(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Aplicar la política de retención y reconciliar backup_history
+        
+        El trabajo de disco y DB corre en un thread para no bloquear el loop.
+        
+        Args:
+            dry_run: Solo calcular, sin borrar
+        
+        Returns:
+            Dict con success, kept, pruned, freed_bytes
+        """
+        async with self._retention_lock:
+            busy = {t for t in BACKUP_TYPES if self.is_running(t)}
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(None, self._apply_retention_sync, dry_run, busy)
+            except Exception as e:
+                return {"success": False, "message": f"Error aplicando retención: {str(e)}"}
+    
+    def _apply_retention_sync(self, dry_run: bool, busy_types: Set[str]) -> Dict[str, Any]:
+        """Parte bloqueante de apply_retention"""
+        archives = self._scan_archives()
+        plan = self.plan_retention(archives)
+        
+        # No tocar tipos con un backup escribiéndose ahora mismo
+        prune = [a for a in plan["prune"] if a["type"] not in busy_types]
+        pruned = []
+        
+        if not dry_run:
+            for archive in prune:
+                try:
+                    os.unlink(archive["path"])
+                    pruned.append(archive)
+                except FileNotFoundError:
+                    pruned.append(archive)
+                except OSError as e:
+                    print(f"No se pudo eliminar {archive['filename']}: {e}")
+            
+            pruned_paths = {a["path"] for a in pruned}
+            self.reconcile_history(
+                [a for a in archives if a["path"] not in pruned_paths],
+                busy_types
+            )
+        
+        return {
+            "success": True,
+            "dry_run": dry_run,
+            "kept": [a["filename"] for a in plan["keep"]],
+            "pruned": [a["filename"] for a in (prune if dry_run else pruned)],
+            "freed_bytes": sum(a["size_bytes"] for a in (prune if dry_run else pruned))
+        }
+    
+    def reconcile_history(
+        self,
+        archives: List[Dict[str, Any]],
+        busy_types: Optional[Set[str]] = None
+    ):
+        """
+        Sincronizar backup_history con los archivos presentes en disco
+        
+        Agrega filas para archivos sin registro (created_at en UTC) y
+        actualiza tamaños. Las filas
+        cuyo archivo ya no existe pasan a 'pruned' (se conservan duración y
+        tamaño como historial); las duplicadas se fusionan en la primera.
+        
+        Args:
+            archives: Archivos actualmente en disco
+            busy_types: Tipos con un backup escribiéndose (no se registran aún)
+        """
+        busy_types = busy_types or set()
+        on_disk = {a["filename"]: a for a in archives}
+        
+        db = SessionLocal()
+        try:
+            rows = db.query(BackupHistory).filter(
+                BackupHistory.status.in_(CATALOG_STATUSES)
+            ).order_by(BackupHistory.id).all()
+            recorded: Dict[str, BackupHistory] = {}
+            
+            for row in rows:
+                archive = on_disk.get(row.filename)
+                if archive is None:
+                    row.status = "pruned"
+                    continue
+                first = recorded.get(row.filename)
+                if first is not None:
+                    # Mismo archivo registrado dos veces (watcher y programador)
+                    first.duration_seconds = first.duration_seconds or row.duration_seconds
+                    first.created_by = first.created_by or row.created_by
+                    db.delete(row)
+                    continue
+                recorded[row.filename] = row
+                if row.size_bytes != archive["size_bytes"]:
+                    # El archivo cambió: hay que volver a verificarlo
+                    row.size_bytes = archive["size_bytes"]
+                    row.checksum = None
+                    row.verified_at = None
+                    row.status = "completed"
+                if row.path != archive["path"]:
+                    row.path = archive["path"]
+                if row.created_at == archive["created_at"]:
+                    # Fila registrada con la hora local del nombre del archivo
+                    row.created_at = to_utc(archive["created_at"])
+            
+            for filename, archive in on_disk.items():
+                if filename in recorded or archive["type"] in (None, *busy_types):
+                    continue
+                db.add(BackupHistory(
+                    filename=filename,
+                    type=archive["type"],
+                    size_bytes=archive["size_bytes"],
+                    path=archive["path"],
+                    status="completed",
+                    created_at=to_utc(archive["created_at"])
+                ))
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    # ========== Catálogo ==========
+    
+    async def refresh_catalog(self) -> Dict[str, Any]:
+        """
+        Reescanear el directorio y reconciliar el catálogo (en un thread)
+        
+        Returns:
+            Dict con success y count
+        """
+        busy = {t for t in BACKUP_TYPES if self.is_running(t)}
+        
+        def refresh():
+            archives = self._scan_archives()
+            self.reconcile_history(archives, busy)
+            return len(archives)
+        
+        try:
+            count = await asyncio.get_running_loop().run_in_executor(None, refresh)
+            return {"success": True, "count": count}
+        except Exception as e:
+            return {"success": False, "message": f"Error reconciliando catálogo: {str(e)}"}
+    
+    def _directory_signature(self):
+        """mtime/inode del directorio: cambia al crear, borrar o renombrar archivos"""
+        try:
+            stat = os.stat(self.backup_path)
+            return (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+    
+    async def start_catalog_watcher(self):
+        """Vigilar el directorio de backups y reconciliar cuando cambia"""
+        if self._catalog_task:
+            return
+        
+        async def watch():
+            while True:
+                signature = self._directory_signature()
+                if signature != self._catalog_signature:
+                    result = await self.refresh_catalog()
+                    if result["success"]:
+                        self._catalog_signature = signature
+                    else:
+                        print(result["message"])
+                await asyncio.sleep(settings.BACKUP_CATALOG_POLL_SECONDS)
+        
+        self._catalog_task = asyncio.create_task(watch())
+    
+    async def stop_catalog_watcher(self):
+        """Detener el watcher del catálogo"""
+        if self._catalog_task:
+            self._catalog_task.cancel()
+            self._catalog_task = None
+    
+    async def start_retention(self):
+        """Iniciar la retención periódica en segundo plano"""
+        if self._retention_task or not settings.BACKUP_RETENTION_ENABLED:
+            return
+        
+        async def retention_loop():
+            while True:
+                result = await self.apply_retention()
+                if not result["success"]:
+                    print(result["message"])
+                elif result["pruned"]:
+                    print(f"Retención de backups: {len(result['pruned'])} archivo(s) eliminados")
+                await asyncio.sleep(settings.BACKUP_RETENTION_INTERVAL_MINUTES * 60)
+        
+        self._retention_task = asyncio.create_task(retention_loop())
+    
+    async def stop_retention(self):
+        """Detener la retención periódica"""
+        if self._retention_task:
+            self._retention_task.cancel()
+            self._retention_task = None
+
 
 # Instancia global
 backup_service = BackupService()
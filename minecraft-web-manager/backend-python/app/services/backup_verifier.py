@@ -0,0 +1,285 @@
+"""Verificación de integridad de backups (checksum + lectura completa)"""
+import asyncio
+import gzip
+import hashlib
+import os
+import sys
+import tarfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+from sqlalchemy import or_
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.backup_history import BackupHistory
+
+
+CHUNK_SIZE = 1024 * 1024
+
+# Estados del catálogo: completed (sin verificar), verified, corrupt. Fuera
+# del catálogo quedan como historial: failed, in_progress, pruned (borrado
+# por retención o desaparecido del disco) y deleted (borrado a mano)
+CATALOG_STATUSES = ("completed", "verified", "corrupt")
+
+
+class ThrottledHashingReader:
+    """
+    Lector de archivo que calcula SHA-256 de lo leído y limita el caudal
+
+    Args:
+        fileobj: Archivo abierto en modo binario
+        rate_bytes: Bytes por segundo máximos (0 = sin límite)
+    """
+
+    def __init__(self, fileobj, rate_bytes: int = 0):
+        self.fileobj = fileobj
+        self.rate_bytes = rate_bytes
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+        self._started = time.monotonic()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.sha256.update(data)
+        self.bytes_read += len(data)
+
+        if self.rate_bytes and data:
+            # Dormir lo necesario para no superar rate_bytes de media
+            expected = self.bytes_read / self.rate_bytes
+            elapsed = time.monotonic() - self._started
+            if expected > elapsed:
+                time.sleep(expected - elapsed)
+
+        return data
+
+    def drain(self):
+        """Leer lo que quede del archivo (para completar el hash)"""
+        while self.read(CHUNK_SIZE):
+            pass
+
+
+class BackupVerifier:
+    """
+    Calcula checksums y recorre periódicamente los backups del catálogo
+
+    Cada archivo se lee una sola vez por verificación: el mismo flujo
+    alimenta el SHA-256, la descompresión gzip (que valida CRC y tamaño)
+    y el recorrido de cabeceras tar. El scrubber corre en su propio thread
+    de baja prioridad con el caudal limitado por BACKUP_SCRUB_RATE_MB; las
+    verificaciones a pedido y las de backups recién creados usan otro
+    executor a velocidad normal y no esperan detrás de él.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="backup-verify")
+        self._scrub_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="backup-scrub",
+            initializer=self._lower_thread_priority
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _lower_thread_priority():
+        """Bajar la prioridad de CPU del thread actual (solo Linux)"""
+        if sys.platform.startswith("linux"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+            except (AttributeError, OSError):
+                pass
+
+    def check_archive(self, path: Path, rate_bytes: int = 0) -> Dict[str, Any]:
+        """
+        Leer un .tar.gz completo validando compresión y estructura tar
+
+        Args:
+            path: Ruta del archivo
+            rate_bytes: Límite de lectura en bytes/s (0 = sin límite)
+
+        Returns:
+            Dict con ok, checksum, members, error
+        """
+        members = 0
+        with open(path, "rb") as raw:
+            reader = ThrottledHashingReader(raw, rate_bytes)
+            try:
+                with gzip.GzipFile(fileobj=reader, mode="rb") as gz:
+                    with tarfile.open(fileobj=gz, mode="r|") as tar:
+                        for member in tar:
+                            if member.name.startswith("/") or ".." in Path(member.name).parts:
+                                raise tarfile.TarError(f"Ruta insegura en el archivo: {member.name}")
+                            members += 1
+                    # tarfile se detiene en el marcador final; gzip valida CRC al llegar a EOF
+                    while gz.read(CHUNK_SIZE):
+                        pass
+                reader.drain()
+            except (OSError, EOFError, zlib.error, tarfile.TarError, gzip.BadGzipFile) as e:
+                reader.drain()
+                return {
+                    "ok": False,
+                    "checksum": reader.sha256.hexdigest(),
+                    "members": members,
+                    "error": str(e) or e.__class__.__name__
+                }
+
+        if members == 0:
+            return {"ok": False, "checksum": reader.sha256.hexdigest(), "members": 0, "error": "Archivo tar vacío"}
+
+        return {"ok": True, "checksum": reader.sha256.hexdigest(), "members": members, "error": None}
+
+    def _verify_row_sync(self, backup_id: int, throttle: bool) -> Dict[str, Any]:
+        """
+        Verificar una fila de backup_history y guardar el resultado
+
+        La lectura del archivo (minutos a BACKUP_SCRUB_RATE_MB en backups
+        grandes) se hace sin sesión: una transacción de lectura abierta
+        bloquearía los checkpoints del WAL y ocuparía un hueco del pool.
+        """
+        db = SessionLocal()
+        try:
+            row = db.query(BackupHistory).filter(BackupHistory.id == backup_id).first()
+            if not row or not row.path:
+                return {"success": False, "message": "Backup no encontrado"}
+            path, filename, expected = Path(row.path), row.filename, row.checksum
+        finally:
+            db.close()
+
+        if not path.exists():
+            return {"success": False, "message": "Archivo de backup no encontrado"}
+
+        rate = settings.BACKUP_SCRUB_RATE_MB * 1024 * 1024 if throttle else 0
+        result = self.check_archive(path, rate)
+
+        error = result["error"]
+        checksum = expected
+        if expected is None:
+            # Primera lectura: el checksum queda como referencia
+            checksum = result["checksum"]
+        elif expected != result["checksum"]:
+            error = error or "El checksum no coincide con el registrado al crear el backup"
+        status = "corrupt" if error else "verified"
+
+        values = {
+            BackupHistory.status: status,
+            BackupHistory.error_message: error,
+            BackupHistory.verified_at: datetime.now(),
+            BackupHistory.checksum: checksum,
+        }
+        db = SessionLocal()
+        try:
+            # Si entretanto se podó o eliminó, no se resucita la fila
+            updated = db.query(BackupHistory).filter(
+                BackupHistory.id == backup_id,
+                BackupHistory.status.in_(CATALOG_STATUSES)
+            ).update(values, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if not updated:
+            return {"success": False, "message": "Backup no encontrado"}
+
+        return {
+            "success": True,
+            "id": backup_id,
+            "filename": filename,
+            "status": status,
+            "checksum": checksum,
+            "members": result["members"],
+            "error": error
+        }
+
+    async def verify(self, backup_id: int, throttle: bool = False) -> Dict[str, Any]:
+        """
+        Verificar un backup del catálogo
+
+        Args:
+            backup_id: ID en backup_history
+            throttle: Aplicar límite de caudal y baja prioridad (scrubber)
+
+        Returns:
+            Dict con success, status, checksum, error
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._scrub_executor if throttle else self._executor
+        try:
+            return await loop.run_in_executor(executor, self._verify_row_sync, backup_id, throttle)
+        except Exception as e:
+            return {"success": False, "message": f"Error verificando backup: {str(e)}"}
+
+    async def verify_filename(self, filename: str) -> Dict[str, Any]:
+        """Verificar (y registrar checksum de) un backup recién creado"""
+        db = SessionLocal()
+        try:
+            row = db.query(BackupHistory).filter(
+                BackupHistory.filename == filename,
+                BackupHistory.status.in_(CATALOG_STATUSES)
+            ).order_by(BackupHistory.id).first()
+            backup_id = row.id if row else None
+        finally:
+            db.close()
+
+        if backup_id is None:
+            return {"success": False, "message": "Backup no encontrado en el catálogo"}
+        return await self.verify(backup_id)
+
+    def _next_due(self) -> Optional[int]:
+        """Backup sin verificar o con la verificación más antigua vencida"""
+        due_before = datetime.now() - timedelta(days=settings.BACKUP_SCRUB_REVERIFY_DAYS)
+
+        db = SessionLocal()
+        try:
+            row = db.query(BackupHistory).filter(
+                BackupHistory.status.in_(CATALOG_STATUSES),
+                or_(BackupHistory.verified_at == None, BackupHistory.verified_at < due_before)
+            ).order_by(
+                BackupHistory.verified_at.isnot(None),
+                BackupHistory.verified_at
+            ).first()
+            return row.id if row else None
+        finally:
+            db.close()
+
+    async def start(self):
+        """Iniciar el scrubber en segundo plano"""
+        if self._task or not settings.BACKUP_SCRUB_ENABLED:
+            return
+
+        async def scrub():
+            while True:
+                try:
+                    backup_id = self._next_due()
+                    if backup_id is None:
+                        await asyncio.sleep(settings.BACKUP_SCRUB_INTERVAL_MINUTES * 60)
+                        continue
+
+                    result = await self.verify(backup_id, throttle=True)
+                    if result.get("status") == "corrupt":
+                        print(f"⚠ Backup corrupto: {result['filename']} ({result['error']})")
+                    elif not result["success"]:
+                        # Archivo desaparecido: el catálogo lo reconciliará
+                        await asyncio.sleep(settings.BACKUP_SCRUB_INTERVAL_MINUTES * 60)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Error en verificación de backups: {e}")
+                    await asyncio.sleep(settings.BACKUP_SCRUB_INTERVAL_MINUTES * 60)
+
+        self._task = asyncio.create_task(scrub())
+
+    async def stop(self):
+        """Detener el scrubber"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+# Instancia global
+backup_verifier = BackupVerifier()
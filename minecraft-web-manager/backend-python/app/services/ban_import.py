@@ -0,0 +1,125 @@
+"""Lectura y validación de listas de baneos para importación masiva"""
+import csv
+import io
+import ipaddress
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from app.services.ban_store import parse_ban_date
+from app.services.player_registry import NAME_PATTERN, UUID_PATTERN, dashed_uuid, normalize_uuid
+
+
+IMPORT_FORMATS = ("csv", "json", "ndjson")
+
+# Errores detallados que se guardan por importación
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(content: str, content_type: Optional[str] = None) -> str:
+    """Deducir el formato por Content-Type o por el contenido"""
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+
+    stripped = content.lstrip()
+    if stripped.startswith("["):
+        return "json"
+    if stripped.startswith("{"):
+        try:
+            # Un único objeto: {"bans": [...]} o NDJSON de una sola línea
+            data = json.loads(stripped)
+            return "json" if isinstance(data, dict) and "bans" in data else "ndjson"
+        except ValueError:
+            return "ndjson"
+    return "csv"
+
+
+def parse_entries(content: str, fmt: str) -> List[Tuple[int, Any]]:
+    """
+    Convertir el contenido en una lista de (línea/posición, entrada)
+
+    Acepta el formato de banned-players.json/banned-ips.json de vanilla,
+    un objeto {"bans": [...]}, NDJSON o CSV con cabecera
+    (uuid,name,ip,reason,source,expires,created).
+    """
+    if fmt == "json":
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get("bans", [])
+        if not isinstance(data, list):
+            raise ValueError("Se esperaba una lista de baneos")
+        return list(enumerate(data, start=1))
+
+    if fmt == "ndjson":
+        entries = []
+        for number, line in enumerate(content.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append((number, json.loads(line)))
+            except ValueError:
+                entries.append((number, None))
+        return entries
+
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames:
+            raise ValueError("CSV sin cabecera")
+        reader.fieldnames = [f.strip().lower() for f in reader.fieldnames]
+        # La línea 1 es la cabecera
+        return [
+            (number, {k: (v or "").strip() for k, v in row.items() if k})
+            for number, row in enumerate(reader, start=2)
+        ]
+
+    raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def _common_fields(raw: Dict, moderator: str, created: str) -> Dict:
+    expires = (raw.get("expires") or "forever").strip()
+    if expires != "forever" and parse_ban_date(expires) is None:
+        raise ValueError(f"Fecha de expiración inválida: {expires}")
+
+    return {
+        "created": raw.get("created") or created,
+        "source": raw.get("source") or moderator,
+        "expires": expires,
+        "reason": raw.get("reason") or "Violación de las reglas"
+    }
+
+
+def validate_player(raw: Any, moderator: str, created: str) -> Dict:
+    """Normalizar una entrada de jugador (uuid con guiones, nombre válido)"""
+    if not isinstance(raw, dict):
+        raise ValueError("Entrada no válida")
+
+    uuid = (raw.get("uuid") or "").strip()
+    name = (raw.get("name") or "").strip()
+
+    if uuid:
+        if not UUID_PATTERN.match(normalize_uuid(uuid)):
+            raise ValueError(f"UUID inválido: {uuid}")
+        uuid = dashed_uuid(uuid)
+    if name and not NAME_PATTERN.match(name):
+        raise ValueError(f"Nombre inválido: {name}")
+    if not uuid and not name:
+        raise ValueError("Se requiere uuid o name")
+
+    return {"uuid": uuid, "name": name, **_common_fields(raw, moderator, created)}
+
+
+def validate_ip(raw: Any, moderator: str, created: str) -> Dict:
+    """Normalizar una entrada de IP (dirección o rango CIDR)"""
+    if not isinstance(raw, dict):
+        raise ValueError("Entrada no válida")
+
+    value = (raw.get("ip") or "").strip()
+    try:
+        network = ipaddress.ip_network(value, strict=False)
+    except ValueError:
+        raise ValueError(f"IP inválida: {value or '(vacía)'}")
+
+    ip = str(network.network_address) if network.num_addresses == 1 else str(network)
+    return {"ip": ip, **_common_fields(raw, moderator, created)}
@@ -1,10 +1,28 @@
 """Servicio para gestión de baneos del servidor"""
-import json
+import asyncio
+import secrets
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Any, List, Dict, Optional
+from datetime import datetime, timezone
 from app.core.config import settings
+from app.services.ban_import import (
+    IMPORT_FORMATS, MAX_REPORTED_ERRORS, detect_format, parse_entries, validate_ip, validate_player
+)
+from app.services.ban_store import BanList, IPBanList, format_ban_date
+from app.services.json_list_store import get_store
+from app.services.player_registry import dashed_uuid, normalize_uuid, player_registry
+from app.services.player_service import player_service
 from app.services.rcon_service import rcon_service
+from app.services.server_service import server_service
+
+
+# Importaciones recientes que se conservan para consultar su progreso
+MAX_IMPORT_JOBS = 20
+
+# RCON solo sabe banear para siempre: un ban temporal enviado con el servidor
+# en marcha quedaría permanente en su lista aunque el panel lo levante
+TEMPORARY_BAN_WHILE_RUNNING = "Los baneos temporales solo se aplican con el servidor detenido"
 
 
 class BanService:
@@ -14,6 +32,12 @@ class BanService:
         self.server_path = Path(settings.SERVER_PATH)
         self.banned_players_file = self.server_path / "banned-players.json"
         self.banned_ips_file = self.server_path / "banned-ips.json"
+        self.player_bans: BanList = get_store(self.banned_players_file, BanList)
+        self.ip_bans: IPBanList = get_store(self.banned_ips_file, IPBanList)
+        self._imports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._import_tasks = set()
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self._sweeper_wakeup: Optional[asyncio.Event] = None
     
     # ========== Baneos de Jugadores ==========
     
@@ -25,13 +49,7 @@ class BanService:
             Lista con uuid, name, created, source, expires, reason
         """
         try:
-            if not self.banned_players_file.exists():
-                return []
-            
-            with open(self.banned_players_file, 'r') as f:
-                bans = json.load(f)
-            
-            return bans
+            return self.player_bans.all()
         except Exception:
             return []
     
@@ -55,44 +73,49 @@ class BanService:
             
         Returns:
             True si fue exitoso
+            
+        Raises:
+            ValueError: Si el ban es temporal y el servidor está en marcha
         """
         try:
-            bans = await self.get_banned_players()
-            
-            # Verificar si ya está baneado
-            existing = next((b for b in bans if b.get('uuid') == uuid), None)
-            if existing:
-                # Actualizar ban existente
-                existing['reason'] = reason
-                existing['source'] = moderator
-                existing['created'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S +0000')
-                if expires:
-                    existing['expires'] = expires
-            else:
-                # Crear nuevo ban
-                ban_entry = {
-                    "uuid": uuid,
-                    "name": username,
-                    "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S +0000'),
-                    "source": moderator,
-                    "reason": reason
-                }
-                
-                if expires:
-                    ban_entry["expires"] = expires
+            async with self.player_bans.lock:
+                existing = self.player_bans.get(uuid)
+                if existing:
+                    # Actualizar ban existente
+                    ban_entry = {
+                        **existing,
+                        "reason": reason,
+                        "source": moderator,
+                        "created": format_ban_date()
+                    }
+                    if expires:
+                        ban_entry['expires'] = expires
                 else:
-                    ban_entry["expires"] = "forever"
-                
-                bans.append(ban_entry)
-            
-            # Guardar archivo
-            with open(self.banned_players_file, 'w') as f:
-                json.dump(bans, f, indent=2)
-            
-            # Ejecutar comando RCON
-            await rcon_service.ban_player(username, reason)
+                    # Crear nuevo ban
+                    ban_entry = {
+                        "uuid": uuid,
+                        "name": username,
+                        "created": format_ban_date(),
+                        "source": moderator,
+                        "reason": reason,
+                        "expires": expires or "forever"
+                    }
+            
+                running = server_service.is_running()
+                if running and ban_entry.get("expires", "forever") != "forever":
+                    raise ValueError(TEMPORARY_BAN_WHILE_RUNNING)
+            
+                # Índice en memoria; el archivo se escribe en diferido
+                self.player_bans.put(ban_entry)
+                self._wake_sweeper()
+            
+                # Ejecutar comando RCON
+                if running:
+                    await rcon_service.ban_player(username, reason)
             
             return True
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error baneando jugador: {e}")
             return False
@@ -108,22 +131,13 @@ class BanService:
             True si fue exitoso
         """
         try:
-            bans = await self.get_banned_players()
-            
-            # Buscar jugador para obtener nombre
-            player = next((b for b in bans if b.get('uuid') == uuid), None)
-            if not player:
-                return False
-            
-            # Remover del listado
-            bans = [b for b in bans if b.get('uuid') != uuid]
+            async with self.player_bans.lock:
+                player = self.player_bans.remove(uuid)
+                if not player:
+                    return False
             
-            # Guardar archivo
-            with open(self.banned_players_file, 'w') as f:
-                json.dump(bans, f, indent=2)
-            
-            # Ejecutar comando RCON
-            await rcon_service.pardon_player(player.get('name'))
+                # Ejecutar comando RCON
+                await rcon_service.pardon_player(player.get('name'))
             
             return True
         except Exception:
@@ -139,8 +153,7 @@ class BanService:
         Returns:
             True si está baneado
         """
-        bans = await self.get_banned_players()
-        return any(ban.get('uuid') == uuid for ban in bans)
+        return self.player_bans.contains(uuid)
     
     # ========== Baneos de IP ==========
     
@@ -152,13 +165,7 @@ class BanService:
             Lista con ip, created, source, expires, reason
         """
         try:
-            if not self.banned_ips_file.exists():
-                return []
-            
-            with open(self.banned_ips_file, 'r') as f:
-                bans = json.load(f)
-            
-            return bans
+            return self.ip_bans.all()
         except Exception:
             return []
     
@@ -173,50 +180,55 @@ class BanService:
         Banear una dirección IP
         
         Args:
-            ip: Dirección IP
+            ip: Dirección IP o rango CIDR (p. ej. 203.0.113.0/24)
             reason: Razón del ban
             moderator: Quien ejecuta el ban
             expires: Fecha de expiración o None para permanente
             
         Returns:
             True si fue exitoso
+            
+        Raises:
+            ValueError: Si el ban es temporal y el servidor está en marcha
         """
         try:
-            bans = await self.get_banned_ips()
-            
-            # Verificar si ya está baneada
-            existing = next((b for b in bans if b.get('ip') == ip), None)
-            if existing:
-                # Actualizar ban existente
-                existing['reason'] = reason
-                existing['source'] = moderator
-                existing['created'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S +0000')
-                if expires:
-                    existing['expires'] = expires
-            else:
-                # Crear nuevo ban
-                ban_entry = {
-                    "ip": ip,
-                    "created": datetime.now().strftime('%Y-%m-%d %H:%M:%S +0000'),
-                    "source": moderator,
-                    "reason": reason
-                }
-                
-                if expires:
-                    ban_entry["expires"] = expires
+            async with self.ip_bans.lock:
+                existing = self.ip_bans.get(ip)
+                if existing:
+                    # Actualizar ban existente
+                    ban_entry = {
+                        **existing,
+                        "reason": reason,
+                        "source": moderator,
+                        "created": format_ban_date()
+                    }
+                    if expires:
+                        ban_entry['expires'] = expires
                 else:
-                    ban_entry["expires"] = "forever"
-                
-                bans.append(ban_entry)
-            
-            # Guardar archivo
-            with open(self.banned_ips_file, 'w') as f:
-                json.dump(bans, f, indent=2)
-            
-            # Ejecutar comando RCON
-            await rcon_service.ban_ip(ip, reason)
+                    # Crear nuevo ban (IP exacta o rango CIDR)
+                    ban_entry = {
+                        "ip": self.ip_bans.make_key(ip),
+                        "created": format_ban_date(),
+                        "source": moderator,
+                        "reason": reason,
+                        "expires": expires or "forever"
+                    }
+            
+                # Los rangos solo los aplica el panel: ban-ip no acepta CIDR
+                running = server_service.is_running() and "/" not in ban_entry["ip"]
+                if running and ban_entry.get("expires", "forever") != "forever":
+                    raise ValueError(TEMPORARY_BAN_WHILE_RUNNING)
+            
+                self.ip_bans.put(ban_entry)
+                self._wake_sweeper()
+            
+                # Ejecutar comando RCON
+                if running:
+                    await rcon_service.ban_ip(ip, reason)
             
             return True
+        except ValueError:
+            raise
         except Exception:
             return False
     
@@ -231,21 +243,16 @@ class BanService:
             True si fue exitoso
         """
         try:
-            bans = await self.get_banned_ips()
-            
-            # Verificar que existe
-            if not any(b.get('ip') == ip for b in bans):
-                return False
-            
-            # Remover del listado
-            bans = [b for b in bans if b.get('ip') != ip]
+            async with self.ip_bans.lock:
+                entry = self.ip_bans.remove(ip)
+                if not entry:
+                    return False
             
-            # Guardar archivo
-            with open(self.banned_ips_file, 'w') as f:
-                json.dump(bans, f, indent=2)
+                if "/" in entry.get("ip", ""):
+                    return True
             
-            # Ejecutar comando RCON
-            await rcon_service.pardon_ip(ip)
+                # Ejecutar comando RCON
+                await rcon_service.pardon_ip(entry["ip"])
             
             return True
         except Exception:
@@ -253,7 +260,7 @@ class BanService:
     
     async def is_ip_banned(self, ip: str) -> bool:
         """
-        Verificar si una IP está baneada
+        Verificar si una IP está baneada (directamente o por un rango CIDR)
         
         Args:
             ip: Dirección IP
@@ -261,59 +268,333 @@ class BanService:
         Returns:
             True si está baneada
         """
-        bans = await self.get_banned_ips()
-        return any(ban.get('ip') == ip for ban in bans)
+        return self.ip_bans.contains(ip)
     
-    # ========== Estadísticas ==========
+    # ========== Importación masiva ==========
     
-    async def get_ban_stats(self) -> Dict:
+    def start_import(
+        self,
+        content: str,
+        kind: str = "players",
+        action: str = "ban",
+        fmt: Optional[str] = None,
+        content_type: Optional[str] = None,
+        moderator: str = "Import"
+    ) -> Dict[str, Any]:
         """
-        Obtener estadísticas de baneos
+        Iniciar una importación masiva de baneos o perdones en segundo plano
         
+        Args:
+            content: Lista en CSV, JSON o NDJSON
+            kind: players o ips
+            action: ban o pardon
+            fmt: Formato (None = detectar)
+            content_type: Content-Type de la petición (para detectar formato)
+            moderator: Valor de 'source' para entradas sin él
+            
         Returns:
-            Dict con total_players, total_ips, recent_players, recent_ips
+            Estado inicial de la importación (consultar con get_import)
         """
+        fmt = fmt or detect_format(content, content_type)
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+        if kind not in ("players", "ips"):
+            raise ValueError("kind debe ser 'players' o 'ips'")
+        if action not in ("ban", "pardon"):
+            raise ValueError("action debe ser 'ban' o 'pardon'")
+        
+        job = {
+            "id": secrets.token_hex(8),
+            "kind": kind,
+            "action": action,
+            "format": fmt,
+            "status": "running",
+            "stage": "parsing",
+            "total": 0,
+            "valid": 0,
+            "invalid": 0,
+            "duplicates": 0,
+            "applied": 0,
+            "rcon_total": 0,
+            "rcon_sent": 0,
+            "errors": [],
+            "message": None,
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None
+        }
+        self._imports[job["id"]] = job
+        while len(self._imports) > MAX_IMPORT_JOBS:
+            self._imports.popitem(last=False)
+        
+        task = asyncio.create_task(self._run_import(job, content, moderator))
+        self._import_tasks.add(task)
+        task.add_done_callback(self._import_tasks.discard)
+        return job
+    
+    def get_import(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado/progreso de una importación"""
+        return self._imports.get(job_id)
+    
+    def _import_error(self, job: Dict, line: int, message: str):
+        job["invalid"] += 1
+        if len(job["errors"]) < MAX_REPORTED_ERRORS:
+            job["errors"].append({"line": line, "error": message})
+    
+    async def _run_import(self, job: Dict[str, Any], content: str, moderator: str):
+        """Validar, deduplicar, aplicar en una escritura y sincronizar por RCON"""
         try:
-            players = await self.get_banned_players()
-            ips = await self.get_banned_ips()
-            
-            # Calcular baneos recientes (última semana)
-            now = datetime.now()
-            week_ago = now.timestamp() - (7 * 24 * 60 * 60)
-            
-            recent_players = 0
-            recent_ips = 0
-            
-            for ban in players:
+            loop = asyncio.get_running_loop()
+            raw_entries = await loop.run_in_executor(None, parse_entries, content, job["format"])
+            job["total"] = len(raw_entries)
+            job["stage"] = "validating"
+            
+            created = format_ban_date()
+            validate = validate_player if job["kind"] == "players" else validate_ip
+            entries: Dict[str, Dict] = {}
+            lines: Dict[str, int] = {}
+            unresolved: Dict[str, int] = {}
+            
+            for line, raw in raw_entries:
                 try:
-                    created = ban.get('created', '')
-                    ban_date = datetime.strptime(created.split('+')[0].strip(), '%Y-%m-%d %H:%M:%S')
-                    if ban_date.timestamp() >= week_ago:
-                        recent_players += 1
-                except:
-                    pass
-            
-            for ban in ips:
+                    entry = validate(raw, moderator, created)
+                except ValueError as e:
+                    self._import_error(job, line, str(e))
+                    continue
+                
+                if job["kind"] == "players":
+                    key = normalize_uuid(entry["uuid"]) if entry["uuid"] else f"name:{entry['name'].lower()}"
+                    if not entry["uuid"]:
+                        unresolved[key] = line
+                    elif not entry["name"]:
+                        # El servidor necesita el nombre (y RCON solo acepta nombres)
+                        known = await player_registry.get_by_uuid(entry["uuid"])
+                        entry["name"] = known["name"] if known else ""
+                else:
+                    key = entry["ip"]
+                
+                if key in entries:
+                    job["duplicates"] += 1
+                entries[key] = entry
+                lines[key] = line
+            
+            if unresolved:
+                # Nombres sin UUID: historial local y Mojang en lotes
+                job["stage"] = "resolving"
+                names = [entries[key]["name"] for key in unresolved]
+                resolved = await player_service.resolve_uuids(names)
+                for key, line in unresolved.items():
+                    entry = entries.pop(key)
+                    lines.pop(key)
+                    data = resolved.get(entry["name"].lower())
+                    if not data or not data.get("uuid"):
+                        self._import_error(job, line, f"No se encontró el UUID de {entry['name']}")
+                        continue
+                    entry["uuid"] = dashed_uuid(data["uuid"])
+                    entry["name"] = data.get("name") or entry["name"]
+                    h = normalize_uuid(data["uuid"])
+                    if h in entries:
+                        job["duplicates"] += 1
+                    entries[h] = entry
+                    lines[h] = line
+            
+            store = self.player_bans if job["kind"] == "players" else self.ip_bans
+            
+            # Con el servidor en marcha su copia en memoria manda: la reescribe
+            # en el archivo en el siguiente cambio. Solo se aplica lo que se
+            # puede replicar por RCON; el resto se importa con el servidor parado.
+            live = server_service.is_running()
+            if live:
+                for key in list(entries):
+                    problem = self._rcon_problem(job, entries[key], store)
+                    if problem:
+                        entries.pop(key)
+                        self._import_error(job, lines[key], problem)
+            
+            job["valid"] = len(entries)
+            
+            # Una sola escritura atómica del JSON
+            job["stage"] = "applying"
+            applied = []
+            async with store.lock:
+                for entry in entries.values():
+                    if job["action"] == "ban":
+                        store.put(entry)
+                        applied.append(entry)
+                    else:
+                        removed = store.remove(entry["uuid"] if job["kind"] == "players" else entry["ip"])
+                        if removed:
+                            applied.append(removed)
+                await store.flush()
+            job["applied"] = len(applied)
+            self._wake_sweeper()
+            
+            if live:
+                await self._sync_import_rcon(job, applied)
+            
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["message"] = str(e)
+        finally:
+            job["stage"] = "done"
+            job["finished_at"] = datetime.now().isoformat()
+    
+    @staticmethod
+    def _rcon_problem(job: Dict[str, Any], entry: Dict, store: BanList) -> Optional[str]:
+        """Motivo por el que una entrada no se puede aplicar por RCON (None si se puede)"""
+        if job["action"] == "ban" and entry.get("expires", "forever") != "forever":
+            return "Los baneos temporales solo se importan con el servidor detenido"
+        
+        if job["kind"] == "players":
+            existing = store.get(entry["uuid"]) if job["action"] == "pardon" else None
+            if not (existing or entry).get("name"):
+                return f"Sin nombre para {entry['uuid']}: importar con el servidor detenido"
+        return None
+    
+    async def _sync_import_rcon(self, job: Dict[str, Any], entries: List[Dict]):
+        """Aplicar los cambios al servidor en marcha por una sola conexión RCON"""
+        commands = []
+        for entry in entries:
+            if job["kind"] == "players":
+                target = entry["name"]
+                base = "ban" if job["action"] == "ban" else "pardon"
+            else:
+                if "/" in entry["ip"]:
+                    continue  # Los rangos CIDR solo los aplica el panel
+                target = entry["ip"]
+                base = "ban-ip" if job["action"] == "ban" else "pardon-ip"
+            
+            command = f"{base} {target}"
+            if job["action"] == "ban" and entry.get("reason"):
+                command += f" {entry['reason']}"
+            commands.append(command)
+        
+        job["stage"] = "rcon"
+        job["rcon_total"] = len(commands)
+        
+        def progress(sent: int):
+            job["rcon_sent"] = sent
+        
+        await rcon_service.execute_batch(commands, progress)
+    
+    # ========== Expiración ==========
+    
+    async def start_sweeper(self):
+        """Iniciar la tarea que levanta los baneos temporales al expirar"""
+        if not settings.BAN_SWEEPER_ENABLED or self._sweeper_task:
+            return
+        self._sweeper_wakeup = asyncio.Event()
+        self._sweeper_task = asyncio.create_task(self._sweeper_loop())
+    
+    async def stop_sweeper(self):
+        """Detener la tarea de expiración"""
+        if self._sweeper_task:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+    
+    def _wake_sweeper(self):
+        """Recalcular la próxima expiración (nuevo baneo temporal o cambios)"""
+        if self._sweeper_wakeup is not None:
+            self._sweeper_wakeup.set()
+    
+    def _next_expiry(self) -> Optional[datetime]:
+        candidates = [
+            expires for expires in (self.player_bans.next_expiry(), self.ip_bans.next_expiry())
+            if expires is not None
+        ]
+        return min(candidates) if candidates else None
+    
+    async def _sweeper_loop(self):
+        """Dormir hasta la próxima expiración (heap) y levantar los baneos vencidos"""
+        max_sleep = settings.BAN_SWEEPER_MAX_SLEEP_SECONDS
+        while True:
+            try:
+                await self.lift_expired()
+                
+                # El tope de espera recoge baneos temporales añadidos desde el juego
+                next_expiry = self._next_expiry()
+                timeout = max_sleep
+                if next_expiry is not None:
+                    timeout = min(max_sleep, max(0.0, (next_expiry - datetime.now(timezone.utc)).total_seconds()))
+                
                 try:
-                    created = ban.get('created', '')
-                    ban_date = datetime.strptime(created.split('+')[0].strip(), '%Y-%m-%d %H:%M:%S')
-                    if ban_date.timestamp() >= week_ago:
-                        recent_ips += 1
-                except:
+                    await asyncio.wait_for(self._sweeper_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
                     pass
+                self._sweeper_wakeup.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error levantando baneos expirados: {e}")
+                await asyncio.sleep(max_sleep)
+    
+    async def lift_expired(self) -> int:
+        """
+        Quitar los baneos temporales ya vencidos de ambas listas
+        
+        Returns:
+            Número de baneos levantados
+        """
+        # Con los locks tomados un baneo nuevo no puede cruzarse con el pardon
+        async with self.player_bans.lock, self.ip_bans.lock:
+            now = datetime.now(timezone.utc)
+            players = self.player_bans.pop_expired(now)
+            ips = self.ip_bans.pop_expired(now)
+        
+            if (players or ips) and server_service.is_running():
+                # El servidor mantiene su propia copia: sincronizarla por RCON
+                commands = [f"pardon {entry['name']}" for entry in players if entry.get("name")]
+                commands += [f"pardon-ip {entry['ip']}" for entry in ips if "/" not in entry["ip"]]
+                if commands:
+                    try:
+                        await rcon_service.execute_batch(commands)
+                    except Exception as e:
+                        # Los JSON ya están actualizados; el servidor los relee al reiniciar
+                        print(f"Error sincronizando baneos expirados por RCON: {e}")
+        
+        return len(players) + len(ips)
+    
+    # ========== Estadísticas ==========
+    
+    async def get_ban_stats(self) -> Dict:
+        """
+        Obtener estadísticas de baneos
+        
+        Los contadores por día se mantienen al modificar las listas, así que
+        no se recorren ni se parsean las fechas en cada consulta.
+        
+        Returns:
+            Dict con total_players, total_ips, recent_players, recent_ips,
+            temporary_players, temporary_ips y next_expiry
+        """
+        try:
+            # Baneos recientes (última semana)
+            recent_players = self.player_bans.count_created_since(7)
+            recent_ips = self.ip_bans.count_created_since(7)
+            next_expiry = self._next_expiry()
             
             return {
-                "total_players": len(players),
-                "total_ips": len(ips),
+                "total_players": len(self.player_bans.entries),
+                "total_ips": len(self.ip_bans.entries),
                 "recent_players": recent_players,
-                "recent_ips": recent_ips
+                "recent_ips": recent_ips,
+                "temporary_players": self.player_bans.temporary_count,
+                "temporary_ips": self.ip_bans.temporary_count,
+                "next_expiry": next_expiry.isoformat() if next_expiry else None
             }
         except Exception:
             return {
                 "total_players": 0,
                 "total_ips": 0,
                 "recent_players": 0,
-                "recent_ips": 0
+                "recent_ips": 0,
+                "temporary_players": 0,
+                "temporary_ips": 0,
+                "next_expiry": None
             }
 
 
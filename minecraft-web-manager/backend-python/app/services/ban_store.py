@@ -0,0 +1,239 @@
+"""Índices en memoria de banned-players.json y banned-ips.json"""
+import heapq
+import ipaddress
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.services.json_list_store import JsonListStore
+
+
+# Formato de vanilla: "2026-12-31 23:59:59 +0000" (el desfase puede ser cualquiera)
+BAN_DATE_FORMAT = "%Y-%m-%d %H:%M:%S %z"
+BAN_DATE_FORMAT_NAIVE = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_ban_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Convertir una fecha de las listas de baneos en datetime con zona horaria
+
+    Args:
+        value: '2026-12-31 23:59:59 -0500'; sin desfase se toma la hora local
+
+    Returns:
+        datetime con zona o None si es 'forever' o no es válida
+    """
+    if not value or value == "forever":
+        return None
+    value = value.strip()
+    try:
+        return datetime.strptime(value, BAN_DATE_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, BAN_DATE_FORMAT_NAIVE).astimezone()
+    except ValueError:
+        return None
+
+
+def format_ban_date(value: Optional[datetime] = None) -> str:
+    """Fecha (por defecto ahora) en el formato de las listas de baneos, en UTC"""
+    value = value or datetime.now(timezone.utc)
+    return value.astimezone(timezone.utc).strftime(BAN_DATE_FORMAT)
+
+
+def is_expired(entry: Dict, now: Optional[datetime] = None) -> bool:
+    expires = parse_ban_date(entry.get("expires"))
+    return expires is not None and expires <= (now or datetime.now(timezone.utc))
+
+
+class BanList(JsonListStore):
+    """
+    Lista de baneos (banned-players.json) sobre JsonListStore
+
+    Además del índice por clave se mantienen un heap por fecha de expiración
+    (para levantar los baneos temporales a tiempo) y contadores de baneos
+    por día de creación, de modo que las estadísticas no recorren la lista.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._expiry_of: Dict[str, datetime] = {}
+        self._created_by_day: Dict[date, int] = {}
+
+    def _rebuild(self, entries: Dict[str, Dict]):
+        self.entries = entries
+        self._expiry_heap = []
+        self._expiry_of = {}
+        self._created_by_day = {}
+        for key, entry in entries.items():
+            self._index(key, entry, push=False)
+        heapq.heapify(self._expiry_heap)
+
+    def _index(self, key: str, entry: Dict, push: bool = True):
+        """Registrar una entrada en el heap de expiración y los contadores"""
+        created = parse_ban_date(entry.get("created"))
+        if created:
+            day = created.astimezone().date()
+            self._created_by_day[day] = self._created_by_day.get(day, 0) + 1
+
+        expires = parse_ban_date(entry.get("expires"))
+        if expires:
+            self._expiry_of[key] = expires
+            if push:
+                heapq.heappush(self._expiry_heap, (expires, key))
+            else:
+                self._expiry_heap.append((expires, key))
+
+    def _unindex(self, key: str, entry: Dict):
+        """Quitar una entrada de los contadores (el heap se limpia al consultarlo)"""
+        created = parse_ban_date(entry.get("created"))
+        if created:
+            day = created.astimezone().date()
+            remaining = self._created_by_day.get(day, 0) - 1
+            if remaining > 0:
+                self._created_by_day[day] = remaining
+            else:
+                self._created_by_day.pop(day, None)
+        self._expiry_of.pop(key, None)
+
+    def contains(self, value: str) -> bool:
+        """Ban vigente (existe y no ha expirado)"""
+        entry = self.get(value)
+        return entry is not None and not is_expired(entry)
+
+    def _set(self, key: str, entry: Dict):
+        previous = self.entries.get(key)
+        if previous is not None:
+            self._unindex(key, previous)
+        self.entries[key] = entry
+        self._index(key, entry)
+
+    def _unset(self, key: str) -> Optional[Dict]:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._unindex(key, entry)
+        return entry
+
+    # ---------- Expiración y estadísticas ----------
+
+    def next_expiry(self) -> Optional[datetime]:
+        """Próxima fecha de expiración de un baneo temporal vigente"""
+        self.refresh()
+        heap = self._expiry_heap
+        # Descartar entradas obsoletas (perdonadas o con otra expiración)
+        while heap and self._expiry_of.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_expired(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Quitar los baneos ya expirados; devuelve las entradas quitadas"""
+        now = now or datetime.now(timezone.utc)
+        expired = []
+
+        while True:
+            expires = self.next_expiry()
+            if expires is None or expires > now:
+                break
+            _, key = heapq.heappop(self._expiry_heap)
+            entry = self._unset(key)
+            if entry is not None:
+                self._pending[key] = None
+                expired.append(entry)
+
+        if expired:
+            self._schedule_flush()
+        return expired
+
+    @property
+    def temporary_count(self) -> int:
+        """Baneos con fecha de expiración"""
+        return len(self._expiry_of)
+
+    def count_created_since(self, days: int) -> int:
+        """Baneos creados en los últimos N días (resolución diaria, hora local)"""
+        self.refresh()
+        today = date.today()
+        return sum(
+            self._created_by_day.get(today - timedelta(days=offset), 0)
+            for offset in range(days + 1)
+        )
+
+
+class IPBanList(BanList):
+    """
+    Baneos de IP: direcciones exactas y rangos CIDR
+
+    Las direcciones exactas se resuelven con un dict. Los rangos se agrupan
+    por longitud de prefijo ({prefijo: {red: entrada}}), así una consulta
+    cuesta una búsqueda por cada longitud de prefijo en uso. El servidor
+    vanilla solo aplica direcciones exactas; los rangos los aplica el panel.
+    """
+
+    key_field = "ip"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._networks: Dict[Tuple[int, int], Dict[int, Dict]] = {}
+
+    def make_key(self, value: str) -> str:
+        try:
+            network = ipaddress.ip_network(value.strip(), strict=False)
+        except ValueError:
+            return value.strip()
+        if network.num_addresses == 1:
+            return str(network.network_address)
+        return str(network)
+
+    def _add_network(self, key: str, entry: Dict):
+        if "/" not in key:
+            return
+        network = ipaddress.ip_network(key, strict=False)
+        table = self._networks.setdefault((network.version, network.prefixlen), {})
+        table[int(network.network_address)] = entry
+
+    def _rebuild(self, entries: Dict[str, Dict]):
+        super()._rebuild(entries)
+        self._networks = {}
+        for key, entry in entries.items():
+            self._add_network(key, entry)
+
+    def _set(self, key: str, entry: Dict):
+        super()._set(key, entry)
+        self._add_network(key, entry)
+
+    def _unset(self, key: str) -> Optional[Dict]:
+        entry = super()._unset(key)
+        if entry is not None and "/" in key:
+            network = ipaddress.ip_network(key, strict=False)
+            table = self._networks.get((network.version, network.prefixlen), {})
+            table.pop(int(network.network_address), None)
+        return entry
+
+    def match(self, ip: str) -> Optional[Dict]:
+        """Entrada vigente que cubre una IP (exacta o por rango), o None"""
+        self.refresh()
+        try:
+            address = ipaddress.ip_address(ip.strip())
+        except ValueError:
+            entry = self.entries.get(ip.strip())
+            return entry if entry is not None and not is_expired(entry) else None
+
+        # Una entrada exacta vencida no oculta un rango vigente que también la cubra
+        entry = self.entries.get(str(address))
+        if entry is not None and not is_expired(entry):
+            return entry
+
+        value = int(address)
+        bits = address.max_prefixlen
+        for (version, prefixlen), table in self._networks.items():
+            if version != address.version:
+                continue
+            mask = ((1 << prefixlen) - 1) << (bits - prefixlen)
+            entry = table.get(value & mask)
+            if entry is not None and not is_expired(entry):
+                return entry
+        return None
+
+    def contains(self, value: str) -> bool:
+        return self.match(value) is not None
@@ -1,8 +1,11 @@
 """Servicio para ejecutar scripts bash de forma asíncrona"""
 import asyncio
+import os
+import time
 from typing import Optional, Dict, Any, Callable
 from pathlib import Path
 from app.core.config import settings
+from app.core.metrics import rcon_duration, rcon_errors, subprocess_errors, subprocess_spawns
 
 
 class BashService:
@@ -18,7 +21,8 @@ class BashService:
         args: list = None,
         cwd: Optional[Path] = None,
         on_data: Optional[Callable] = None,
-        on_error: Optional[Callable] = None
+        on_error: Optional[Callable] = None,
+        env: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Ejecutar script bash y retornar resultado
@@ -29,6 +33,7 @@ class BashService:
             cwd: Directorio de trabajo
             on_data: Callback para stdout
             on_error: Callback para stderr
+            env: Variables de entorno adicionales
         
         Returns:
             Dict con success, stdout, stderr, code
@@ -40,12 +45,14 @@ class BashService:
         cwd = cwd or self.scripts_path
         
         try:
+            subprocess_spawns.inc("execute_script")
             process = await asyncio.create_subprocess_exec(
                 str(script_path),
                 *args,
                 cwd=str(cwd),
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, **env} if env else None
             )
             
             stdout_data = []
@@ -75,6 +82,7 @@ class BashService:
             }
             
         except Exception as e:
+            subprocess_errors.inc("execute_script")
             return {
                 "success": False,
                 "stdout": "",
@@ -96,6 +104,7 @@ class BashService:
         script_path = self.server_path / "manage-control.sh"
         
         try:
+            subprocess_spawns.inc("server_command")
             process = await asyncio.create_subprocess_exec(
                 str(script_path),
                 command,
@@ -115,6 +124,7 @@ class BashService:
             }
             
         except Exception as e:
+            subprocess_errors.inc("server_command")
             return {
                 "success": False,
                 "stdout": "",
@@ -136,6 +146,7 @@ class BashService:
         cwd = cwd or self.scripts_path
         
         try:
+            subprocess_spawns.inc("exec_command")
             process = await asyncio.create_subprocess_shell(
                 command,
                 cwd=str(cwd),
@@ -153,6 +164,7 @@ class BashService:
             }
             
         except Exception as e:
+            subprocess_errors.inc("exec_command")
             return {
                 "success": False,
                 "stdout": "",
@@ -171,8 +183,10 @@ class BashService:
             Dict con resultado
         """
         rcon_script = self.scripts_path / "rcon-client.sh"
+        started = time.perf_counter()
         
         try:
+            subprocess_spawns.inc("rcon_command")
             process = await asyncio.create_subprocess_exec(
                 str(rcon_script),
                 command,
@@ -181,6 +195,9 @@ class BashService:
             )
             
             stdout, stderr = await process.communicate()
+            rcon_duration.observe(time.perf_counter() - started, "script")
+            if process.returncode != 0:
+                rcon_errors.inc("script")
             
             return {
                 "success": process.returncode == 0,
@@ -190,6 +207,8 @@ class BashService:
             }
             
         except Exception as e:
+            subprocess_errors.inc("rcon_command")
+            rcon_errors.inc("script")
             return {
                 "success": False,
                 "stdout": "",
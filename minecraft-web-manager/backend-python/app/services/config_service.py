@@ -4,6 +4,7 @@ import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.services.json_list_store import get_store
 
 
 class ConfigService:
@@ -109,33 +110,31 @@ class ConfigService:
     
     async def get_whitelist(self) -> list:
         """Obtener whitelist.json"""
-        return self.read_json(self.server_path / "whitelist.json") or []
+        return get_store(self.server_path / "whitelist.json").all()
     
     async def update_whitelist(self, whitelist: list) -> Dict[str, Any]:
         """Actualizar whitelist.json"""
-        success = self.write_json(
-            self.server_path / "whitelist.json",
-            whitelist
-        )
-        return {
-            "success": success,
-            "message": "Whitelist actualizada" if success else "Error al actualizar"
-        }
+        return await self._replace_list(self.server_path / "whitelist.json", whitelist, "Whitelist actualizada")
     
     async def get_ops(self) -> list:
         """Obtener ops.json"""
-        return self.read_json(self.server_path / "ops.json") or []
+        return get_store(self.server_path / "ops.json").all()
     
     async def update_ops(self, ops: list) -> Dict[str, Any]:
         """Actualizar ops.json"""
-        success = self.write_json(
-            self.server_path / "ops.json",
-            ops
-        )
-        return {
-            "success": success,
-            "message": "Ops actualizado" if success else "Error al actualizar"
-        }
+        return await self._replace_list(self.server_path / "ops.json", ops, "Ops actualizado")
+    
+    async def _replace_list(self, file_path: Path, entries: list, message: str) -> Dict[str, Any]:
+        """Sustituir una lista compartida con WhitelistService/OpService"""
+        store = get_store(file_path)
+        try:
+            async with store.lock:
+                store.replace(entries)
+                await store.flush()
+            return {"success": True, "message": message}
+        except ValueError as e:
+            # Entradas sin UUID: no se escribe nada
+            return {"success": False, "message": str(e)}
 
 
 # Instancia global
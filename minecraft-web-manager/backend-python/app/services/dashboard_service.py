@@ -0,0 +1,137 @@
+"""Resumen del dashboard en una sola respuesta"""
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from app.services.backup_service import backup_service
+from app.services.plugin_service import plugin_service
+from app.services.server_service import server_service
+from app.services.system_service import system_service
+from app.services.world_service import world_service
+
+
+# Vigencia de cada sección (segundos): lo barato y cambiante se refresca antes
+SNAPSHOT_TTL = {
+    "server": 2,
+    "system": 5,
+    "backups": 10,
+    "plugins": 10,
+    "worlds": 30,  # un `du` por mundo
+}
+
+# Backups recientes incluidos en el resumen
+RECENT_BACKUPS = 5
+
+
+class DashboardService:
+    """
+    Fan-out concurrente a los servicios que muestra el dashboard
+
+    Cada sección se guarda como snapshot con su propio TTL (SNAPSHOT_TTL) y
+    las peticiones simultáneas comparten el mismo cálculo en curso, así
+    varios navegadores abiertos no multiplican los `du`, escaneos de
+    plugins ni consultas al catálogo. Una sección que falla devuelve None
+    y su error, sin tumbar el resto del resumen.
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def _snapshot(self, section: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._snapshots.get(section)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        future = self._inflight.get(section)
+        if future is None:
+            future = asyncio.ensure_future(self._load(section, loader))
+            self._inflight[section] = future
+        # shield: si un cliente se desconecta, el cálculo sigue para los demás
+        return await asyncio.shield(future)
+
+    async def _load(self, section: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+            self._snapshots[section] = (time.monotonic() + SNAPSHOT_TTL[section], value)
+            return value
+        finally:
+            self._inflight.pop(section, None)
+
+    # ---------- Secciones ----------
+
+    async def _load_worlds(self) -> Dict[str, Any]:
+        worlds = await world_service.list_worlds()
+        active = next((world for world in worlds if world["is_active"]), None)
+        return {
+            "total": len(worlds),
+            "total_size_mb": sum(world["size_mb"] for world in worlds),
+            "active": active
+        }
+
+    async def _load_backups(self) -> Dict[str, Any]:
+        result = await backup_service.list_backups(limit=RECENT_BACKUPS)
+        return {"total": result["total"], "recent": result["backups"]}
+
+    async def _load_plugins(self) -> Dict[str, Any]:
+        plugins = await plugin_service.list_plugins()
+        return {
+            "total": len(plugins),
+            "enabled": sum(1 for plugin in plugins if plugin["enabled"])
+        }
+
+    # ---------- Resumen ----------
+
+    async def get_summary(self, sections: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Any], str]:
+        """
+        Estado del servidor, sistema, mundos, backups y plugins
+
+        Args:
+            sections: Secciones a incluir (None = todas); las demás no se calculan
+
+        Returns:
+            Tupla (payload, etag). El ETag depende solo del contenido, no de
+            generated_at, así un GET condicional puede responder 304.
+
+        Raises:
+            ValueError: Si se pide una sección desconocida
+        """
+        loaders = {
+            "server": server_service.get_status,
+            "system": system_service.get_system_info,
+            "worlds": self._load_worlds,
+            "backups": self._load_backups,
+            "plugins": self._load_plugins,
+        }
+        if sections is not None:
+            sections = list(dict.fromkeys(sections))
+            unknown = [section for section in sections if section not in loaders]
+            if unknown:
+                raise ValueError(f"Secciones desconocidas: {', '.join(unknown)}")
+            loaders = {section: loaders[section] for section in sections}
+
+        results = await asyncio.gather(
+            *(self._snapshot(section, loader) for section, loader in loaders.items()),
+            return_exceptions=True
+        )
+
+        payload: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for section, result in zip(loaders, results):
+            if isinstance(result, Exception):
+                payload[section] = None
+                errors[section] = str(result)
+            else:
+                payload[section] = result
+        payload["errors"] = errors
+
+        body = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        payload["generated_at"] = datetime.now().isoformat()
+        return payload, etag
+
+
+# Instancia global
+dashboard_service = DashboardService()
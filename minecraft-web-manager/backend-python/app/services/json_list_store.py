@@ -0,0 +1,244 @@
+"""Listas JSON del servidor (whitelist, ops, baneos) en memoria con escritura atómica"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type
+from app.services.player_registry import normalize_uuid
+
+
+# Espera antes de escribir: agrupa ráfagas de cambios en una sola escritura
+FLUSH_DELAY_SECONDS = 0.5
+
+
+class JsonListStore:
+    """
+    Lista JSON de vanilla en memoria con escritura diferida
+
+    Las entradas se indexan por clave (UUID, IP...) en un dict. Los cambios
+    se aplican en memoria al instante y se escriben agrupados tras
+    FLUSH_DELAY_SECONDS, con archivo temporal + fsync + rename. Si el
+    servidor modifica el archivo (p. ej. /whitelist add en el juego) se
+    recarga y se vuelven a aplicar los cambios aún no escritos.
+
+    `lock` serializa las operaciones de varios pasos sobre el archivo
+    (leer, modificar y enviar el comando RCON) para que no se pisen. Las
+    escrituras (diferidas o explícitas) se serializan aparte con
+    `_flush_lock`.
+    """
+
+    key_field = "uuid"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.lock = asyncio.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._pending: Dict[str, Optional[Dict]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._force_write = False
+
+    def make_key(self, value: str) -> str:
+        return normalize_uuid(value)
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def refresh(self):
+        """Recargar si el archivo cambió fuera del panel"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+
+        entries = {}
+        if signature is not None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                # Escritura del servidor a medias: reintentar en la próxima consulta
+                return
+            for entry in data:
+                if isinstance(entry, dict) and entry.get(self.key_field):
+                    entries[self.make_key(entry[self.key_field])] = entry
+
+        # Cambios del panel todavía no escritos
+        for key, entry in self._pending.items():
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry
+
+        self._rebuild(entries)
+        self._signature = signature
+
+    def _rebuild(self, entries: Dict[str, Dict]):
+        self.entries = entries
+
+    # ---------- Consultas ----------
+
+    def all(self) -> List[Dict]:
+        self.refresh()
+        return list(self.entries.values())
+
+    def get(self, value: str) -> Optional[Dict]:
+        self.refresh()
+        return self.entries.get(self.make_key(value))
+
+    def contains(self, value: str) -> bool:
+        return self.get(value) is not None
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self.entries)
+
+    # ---------- Cambios ----------
+
+    def put(self, entry: Dict):
+        """Agregar o reemplazar una entrada"""
+        self.refresh()
+        key = self.make_key(entry[self.key_field])
+        self._set(key, entry)
+        self._pending[key] = entry
+        self._schedule_flush()
+
+    def remove(self, value: str) -> Optional[Dict]:
+        """Quitar una entrada; devuelve la eliminada o None"""
+        self.refresh()
+        key = self.make_key(value)
+        entry = self._unset(key)
+        if entry is not None:
+            self._pending[key] = None
+            self._schedule_flush()
+        return entry
+
+    def clear(self) -> int:
+        """Vaciar la lista; devuelve cuántas entradas se quitaron"""
+        self.refresh()
+        keys = list(self.entries)
+        for key in keys:
+            self._unset(key)
+            self._pending[key] = None
+        # Escribir aunque ya estuviera vacía (p. ej. archivo inexistente)
+        self._schedule_flush(force=True)
+        return len(keys)
+
+    def replace(self, entries: List[Dict]) -> int:
+        """
+        Sustituir la lista completa; devuelve cuántas entradas quedan
+
+        Raises:
+            ValueError: Si alguna entrada no es un objeto con el campo clave
+                (no se modifica nada)
+        """
+        invalid = [
+            position for position, entry in enumerate(entries, start=1)
+            if not isinstance(entry, dict) or not entry.get(self.key_field)
+        ]
+        if invalid:
+            positions = ", ".join(str(p) for p in invalid[:10])
+            raise ValueError(f"Entradas sin '{self.key_field}' en las posiciones: {positions}")
+
+        self.clear()
+        for entry in entries:
+            key = self.make_key(entry[self.key_field])
+            self._set(key, entry)
+            self._pending[key] = entry
+        return len(self.entries)
+
+    def _set(self, key: str, entry: Dict):
+        self.entries[key] = entry
+
+    def _unset(self, key: str) -> Optional[Dict]:
+        return self.entries.pop(key, None)
+
+    # ---------- Escritura ----------
+
+    def _schedule_flush(self, force: bool = False):
+        if force:
+            self._force_write = True
+        if self._flush_handle is None and self._flush_task is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(FLUSH_DELAY_SECONDS, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        self._flush_task = asyncio.create_task(self.flush())
+
+    def _write(self, data: List[Dict]) -> Optional[Tuple[int, int]]:
+        """Escribir de forma atómica (en un thread)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(temp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+        return self._file_signature()
+
+    async def flush(self):
+        """Escribir los cambios pendientes (también se llama al apagar)"""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        try:
+            # Una escritura diferida en curso y una explícita no se cruzan:
+            # la segunda espera y escribe lo que quede pendiente
+            async with self._flush_lock:
+                while self._pending or self._force_write:
+                    self.refresh()
+                    snapshot = list(self.entries.values())
+                    written = self._pending
+                    self._pending = {}
+                    self._force_write = False
+
+                    loop = asyncio.get_running_loop()
+                    try:
+                        signature = await loop.run_in_executor(None, self._write, snapshot)
+                    except Exception as e:
+                        # Conservar los cambios para el próximo intento
+                        self._pending = {**written, **self._pending}
+                        self._force_write = True
+                        print(f"Error escribiendo {self.path.name}: {e}")
+                        raise
+
+                    if not self._pending:
+                        self._signature = signature
+        finally:
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
+            if (self._pending or self._force_write) and self._flush_handle is None and self._flush_task is None:
+                self._schedule_flush()
+
+
+_stores: Dict[Path, JsonListStore] = {}
+
+
+def get_store(path: Path, store_class: Type[JsonListStore] = JsonListStore) -> JsonListStore:
+    """
+    Instancia compartida por archivo
+
+    Así todos los servicios que tocan el mismo JSON usan el mismo índice,
+    la misma cola de escritura y el mismo lock.
+    """
+    key = Path(os.path.abspath(path))
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = store_class(key)
+    return store
+
+
+async def flush_all():
+    """Escribir los cambios pendientes de todas las listas (al apagar)"""
+    for store in list(_stores.values()):
+        try:
+            await store.flush()
+        except Exception as e:
+            print(f"Error escribiendo {store.path.name} al apagar: {e}")
@@ -0,0 +1,369 @@
+"""Cliente de la API de Mojang con caché persistente y consultas agrupadas"""
+import asyncio
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.mojang_cache import MojangCache
+from app.services.player_registry import NAME_PATTERN, normalize_uuid
+
+
+# El endpoint de perfiles en bloque acepta hasta 10 nombres por petición
+BULK_MAX_NAMES = 10
+
+# Tiempo que se esperan más nombres antes de enviar un lote
+BATCH_WINDOW_SECONDS = 0.05
+
+PURGE_INTERVAL = timedelta(hours=1)
+
+# Claves por consulta IN (...) a mojang_cache (límite de variables de SQLite)
+DB_IN_CHUNK = 500
+
+
+class MojangService:
+    """
+    Consultas a Mojang con un único cliente HTTP y caché TTL+LRU
+
+    La caché vive en memoria (LRU de MOJANG_CACHE_SIZE entradas) y en la
+    tabla mojang_cache, así sobrevive a reinicios. Los nombres que no
+    existen también se cachean (MOJANG_NEGATIVE_TTL_MINUTES). Las consultas
+    de nombres se agrupan en lotes para el endpoint de perfiles en bloque y
+    las consultas simultáneas de la misma clave comparten una sola petición.
+    """
+
+    def __init__(self):
+        self.api_url = settings.MOJANG_API_URL.rstrip("/")
+        self.session_url = settings.MOJANG_SESSION_URL.rstrip("/")
+        self.max_entries = settings.MOJANG_CACHE_SIZE
+        self.ttl = timedelta(hours=settings.MOJANG_CACHE_TTL_HOURS)
+        self.negative_ttl = timedelta(minutes=settings.MOJANG_NEGATIVE_TTL_MINUTES)
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: "OrderedDict[str, Tuple[datetime, Optional[Dict]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: set = set()
+        self._writes: set = set()
+        self._last_purge = datetime.min
+        self.stats = {"hits": 0, "misses": 0, "requests": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(5.0, connect=3.0),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                headers={"User-Agent": "minecraft-web-manager"}
+            )
+        return self._client
+
+    async def close(self):
+        """Cerrar el cliente HTTP (al apagar la aplicación)"""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for task in list(self._batches):
+            task.cancel()
+        # Los nombres que no llegaron a enviarse se resuelven sin respuesta
+        self._resolve_futures(self._pending, {})
+        self._pending = []
+        # Las escrituras en SQLite ya encoladas terminan
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------- Caché ----------
+
+    async def _cache_get_many(self, keys: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Buscar en memoria y luego en SQLite
+
+        Las claves que no están en memoria se leen con una sola consulta
+        IN (...) en un thread, no una por clave en el event loop.
+
+        Returns:
+            Dict clave → valor solo con las claves encontradas
+        """
+        now = datetime.now()
+        found: Dict[str, Optional[Dict]] = {}
+        missing: List[str] = []
+
+        for key in keys:
+            entry = self._cache.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._cache.move_to_end(key)
+                    found[key] = value
+                    continue
+                del self._cache[key]
+            missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            rows = await loop.run_in_executor(None, self._db_get_many, missing, now)
+            for key, (expires_at, value) in rows.items():
+                self._remember(key, expires_at, value)
+                found[key] = value
+
+        return found
+
+    async def _cache_get(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        """Buscar una clave; devuelve (encontrado, valor)"""
+        found = await self._cache_get_many([key])
+        return key in found, found.get(key)
+
+    @staticmethod
+    def _db_get_many(keys: List[str], now: datetime) -> Dict[str, Tuple[datetime, Optional[Dict]]]:
+        """Filas vigentes de mojang_cache para las claves (en un thread)"""
+        rows: Dict[str, Tuple[datetime, Optional[Dict]]] = {}
+        db = SessionLocal()
+        try:
+            for i in range(0, len(keys), DB_IN_CHUNK):
+                for row in db.query(MojangCache).filter(
+                    MojangCache.key.in_(keys[i:i + DB_IN_CHUNK]),
+                    MojangCache.expires_at > now
+                ):
+                    rows[row.key] = (
+                        row.expires_at,
+                        json.loads(row.value) if row.value is not None else None
+                    )
+            return rows
+        finally:
+            db.close()
+
+    def _remember(self, key: str, expires_at: datetime, value: Optional[Dict]):
+        self._cache[key] = (expires_at, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _cache_put(self, entries: List[Tuple[str, Optional[Dict]]]):
+        """Guardar resultados en memoria y en SQLite (una transacción en un thread)"""
+        now = datetime.now()
+        rows = []
+        for key, value in entries:
+            expires_at = now + (self.ttl if value is not None else self.negative_ttl)
+            self._remember(key, expires_at, value)
+            rows.append((key, json.dumps(value) if value is not None else None, expires_at))
+
+        purge = now - self._last_purge > PURGE_INTERVAL
+        if purge:
+            self._last_purge = now
+
+        loop = asyncio.get_running_loop()
+        write = loop.run_in_executor(None, self._db_put, rows, now if purge else None)
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+        # shield: cancelar el lote (close) no descarta la escritura encolada
+        await asyncio.shield(write)
+
+    @staticmethod
+    def _db_put(rows: List[Tuple[str, Optional[str], datetime]], purge_before: Optional[datetime]):
+        """Escribir filas de mojang_cache y purgar las caducadas (en un thread)"""
+        db = SessionLocal()
+        try:
+            for key, value, expires_at in rows:
+                db.merge(MojangCache(key=key, value=value, expires_at=expires_at))
+            if purge_before is not None:
+                db.query(MojangCache).filter(MojangCache.expires_at <= purge_before).delete()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error guardando caché de Mojang: {e}")
+        finally:
+            db.close()
+
+    # ---------- Nombres → UUID ----------
+
+    async def lookup_name(self, username: str) -> Optional[Dict]:
+        """
+        Obtener UUID de un jugador por nombre
+
+        Args:
+            username: Nombre del jugador
+
+        Returns:
+            Dict con 'name' y 'uuid' (sin guiones) o None
+        """
+        results = await self.lookup_names([username])
+        return results.get(username.strip().lower())
+
+    async def lookup_names(self, usernames: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Resolver varios nombres usando caché y lotes de hasta 10 nombres
+
+        Args:
+            usernames: Nombres de jugadores
+
+        Returns:
+            Dict nombre en minúsculas → {'name', 'uuid'} o None
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        valid: List[str] = []
+
+        for username in usernames:
+            name = username.strip().lower()
+            # Un nombre inválido haría fallar el lote entero
+            if not NAME_PATTERN.match(name):
+                results[name] = None
+            elif name not in valid:
+                valid.append(name)
+
+        cached = await self._cache_get_many([f"name:{name}" for name in valid])
+
+        # Sin awaits desde aquí hasta _enqueue: las consultas simultáneas
+        # del mismo nombre comparten el future en curso
+        for name in valid:
+            key = f"name:{name}"
+            if key in cached:
+                self.stats["hits"] += 1
+                results[name] = cached[key]
+                continue
+
+            self.stats["misses"] += 1
+            waiting[name] = self._inflight.get(key) or self._enqueue(name)
+
+        if waiting:
+            values = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            results.update(zip(waiting.keys(), values))
+
+        return results
+
+    def _enqueue(self, name: str) -> asyncio.Future:
+        """Agregar un nombre al próximo lote"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[f"name:{name}"] = future
+        self._pending.append(name)
+
+        if len(self._pending) >= BULK_MAX_NAMES:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(BATCH_WINDOW_SECONDS, self._flush)
+
+        return future
+
+    def _flush(self):
+        """Enviar los nombres pendientes en lotes"""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[:BULK_MAX_NAMES]
+            self._pending = self._pending[BULK_MAX_NAMES:]
+            task = asyncio.create_task(self._resolve_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _resolve_batch(self, names: List[str]):
+        """Consultar un lote en /profiles/minecraft y resolver sus futures"""
+        results: Dict[str, Optional[Dict]] = {}
+        entries: List[Tuple[str, Optional[Dict]]] = []
+
+        try:
+            self.stats["requests"] += 1
+            response = await self._get_client().post(
+                f"{self.api_url}/profiles/minecraft",
+                json=names
+            )
+            if response.status_code == 200:
+                for profile in response.json():
+                    results[profile["name"].lower()] = {
+                        "name": profile["name"],
+                        "uuid": profile["id"]
+                    }
+                # Los nombres ausentes de la respuesta no existen: caché negativa
+                entries = [(f"name:{name}", results.get(name)) for name in names]
+            else:
+                print(f"Mojang respondió {response.status_code} a un lote de {len(names)} nombres")
+        except Exception as e:
+            print(f"Error consultando Mojang: {e}")
+        finally:
+            # También si el lote se cancela: ningún future queda en _inflight
+            self._resolve_futures(names, results)
+
+        # Quien espera ya tiene su resultado; la escritura en SQLite va después
+        if entries:
+            await self._cache_put(entries)
+
+    def _resolve_futures(self, names: List[str], results: Dict[str, Optional[Dict]]):
+        """Entregar el resultado de cada nombre a quienes lo esperan"""
+        for name in names:
+            future = self._inflight.pop(f"name:{name}", None)
+            if future and not future.done():
+                future.set_result(results.get(name))
+
+    # ---------- Perfiles ----------
+
+    async def get_profile(self, uuid: str) -> Optional[Dict]:
+        """
+        Obtener perfil completo (skin, capa) desde el servidor de sesiones
+
+        Args:
+            uuid: UUID del jugador (con o sin guiones)
+
+        Returns:
+            Perfil del jugador o None
+        """
+        uuid_clean = normalize_uuid(uuid)
+        key = f"profile:{uuid_clean}"
+
+        found, value = await self._cache_get(key)
+        if found:
+            self.stats["hits"] += 1
+            return value
+        self.stats["misses"] += 1
+
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        profile = None
+        known = False
+        try:
+            self.stats["requests"] += 1
+            response = await self._get_client().get(
+                f"{self.session_url}/session/minecraft/profile/{uuid_clean}"
+            )
+            if response.status_code == 200:
+                profile = response.json()
+                known = True
+            elif response.status_code in (204, 404):
+                known = True
+        except Exception as e:
+            print(f"Error consultando perfil en Mojang: {e}")
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(profile)
+
+        if known:
+            await self._cache_put([(key, profile)])
+        return profile
+
+    async def download(self, url: str) -> Optional[bytes]:
+        """Descargar un recurso (p. ej. textura de skin) con el cliente compartido"""
+        try:
+            self.stats["requests"] += 1
+            response = await self._get_client().get(url.replace("http://", "https://", 1))
+            if response.status_code == 200:
+                return response.content
+        except Exception as e:
+            print(f"Error descargando {url}: {e}")
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de la caché"""
+        return {**self.stats, "entries": len(self._cache)}
+
+
+# Instancia global
+mojang_service = MojangService()
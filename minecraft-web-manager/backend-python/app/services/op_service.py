@@ -1,9 +1,9 @@
 """Servicio para gestión de operadores (OPs) del servidor"""
-import json
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 from app.core.config import settings
+from app.services.json_list_store import get_store
 from app.services.rcon_service import rcon_service
 
 
@@ -14,6 +14,7 @@ class OpService:
         self.server_path = Path(settings.SERVER_PATH)
         self.ops_file = self.server_path / "ops.json"
         self.properties_file = self.server_path / "server.properties"
+        self.ops = get_store(self.ops_file)
     
     async def get_operators(self) -> List[Dict]:
         """
@@ -23,13 +24,7 @@ class OpService:
             Lista de operadores con uuid, name, level, bypassesPlayerLimit
         """
         try:
-            if not self.ops_file.exists():
-                return []
-            
-            with open(self.ops_file, 'r') as f:
-                ops = json.load(f)
-            
-            return ops
+            return self.ops.all()
         except Exception:
             return []
     
@@ -53,29 +48,25 @@ class OpService:
             True si fue exitoso
         """
         try:
-            ops = await self.get_operators()
-            
-            # Verificar si ya es OP
-            existing = next((op for op in ops if op.get('uuid') == uuid), None)
-            if existing:
-                # Actualizar nivel
-                existing['level'] = level
-                existing['bypassesPlayerLimit'] = bypass_limit
-            else:
-                # Agregar nuevo OP
-                ops.append({
-                    "uuid": uuid,
-                    "name": username,
-                    "level": level,
-                    "bypassesPlayerLimit": bypass_limit
-                })
-            
-            # Guardar archivo
-            with open(self.ops_file, 'w') as f:
-                json.dump(ops, f, indent=2)
-            
-            # Ejecutar comando RCON para aplicar cambios
-            await rcon_service.op_player(username)
+            async with self.ops.lock:
+                existing = self.ops.get(uuid)
+                if existing:
+                    # Actualizar nivel
+                    entry = {**existing, "level": level, "bypassesPlayerLimit": bypass_limit}
+                else:
+                    # Agregar nuevo OP
+                    entry = {
+                        "uuid": uuid,
+                        "name": username,
+                        "level": level,
+                        "bypassesPlayerLimit": bypass_limit
+                    }
+                
+                # Índice en memoria; el archivo se escribe en diferido
+                self.ops.put(entry)
+                
+                # Ejecutar comando RCON para aplicar cambios
+                await rcon_service.op_player(username)
             
             return True
         except Exception:
@@ -92,21 +83,13 @@ class OpService:
             True si fue exitoso
         """
         try:
-            ops = await self.get_operators()
-            
-            # Buscar y remover
-            op_to_remove = next((op for op in ops if op.get('uuid') == uuid), None)
-            if not op_to_remove:
-                return False
-            
-            ops = [op for op in ops if op.get('uuid') != uuid]
-            
-            # Guardar archivo
-            with open(self.ops_file, 'w') as f:
-                json.dump(ops, f, indent=2)
-            
-            # Ejecutar comando RCON
-            await rcon_service.deop_player(op_to_remove.get('name'))
+            async with self.ops.lock:
+                op_to_remove = self.ops.remove(uuid)
+                if not op_to_remove:
+                    return False
+                
+                # Ejecutar comando RCON
+                await rcon_service.deop_player(op_to_remove.get('name'))
             
             return True
         except Exception:
@@ -127,19 +110,13 @@ class OpService:
             if new_level < 1 or new_level > 4:
                 return False
             
-            ops = await self.get_operators()
-            
-            # Buscar operador
-            operator = next((op for op in ops if op.get('uuid') == uuid), None)
-            if not operator:
-                return False
-            
-            # Actualizar nivel
-            operator['level'] = new_level
-            
-            # Guardar archivo
-            with open(self.ops_file, 'w') as f:
-                json.dump(ops, f, indent=2)
+            async with self.ops.lock:
+                operator = self.ops.get(uuid)
+                if not operator:
+                    return False
+                
+                # Actualizar nivel
+                self.ops.put({**operator, "level": new_level})
             
             return True
         except Exception:
@@ -217,8 +194,7 @@ class OpService:
         Returns:
             Datos del operador o None
         """
-        ops = await self.get_operators()
-        return next((op for op in ops if op.get('uuid') == uuid), None)
+        return self.ops.get(uuid)
 
 
 # Instancia singleton
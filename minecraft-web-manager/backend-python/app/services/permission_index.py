@@ -0,0 +1,337 @@
+"""Índice de permisos: niveles de ops.json más grupos y nodos de LuckPerms"""
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+import yaml
+from app.core.config import settings
+from app.services.json_list_store import get_store
+from app.services.player_registry import normalize_uuid
+
+
+# Intervalo mínimo entre comprobaciones de cambios en yaml-storage
+RECHECK_SECONDS = 2.0
+
+DEFAULT_GROUP = "default"
+
+# (valor, origen) de un nodo efectivo
+Grant = Tuple[bool, str]
+
+
+def candidate_nodes(permission: str) -> List[str]:
+    """Nodos que pueden decidir un permiso, del más específico al menos"""
+    permission = permission.strip().lower()
+    parts = permission.split(".")
+    wildcards = [".".join(parts[:i]) + ".*" for i in range(len(parts) - 1, 0, -1)]
+    return [permission] + wildcards + ["*"]
+
+
+def _parse_node_list(raw: Any, now: float) -> Tuple[Dict[str, bool], int]:
+    """
+    Convertir la lista 'permissions' de LuckPerms en {nodo: valor}
+
+    Acepta '- nodo' y '- nodo: {value: false, expiry: ..., context: {...}}'.
+    Los nodos con contexto (server/world) no se resuelven aquí; se
+    devuelve cuántos se omitieron.
+    """
+    nodes: Dict[str, bool] = {}
+    contextual = 0
+    for item in raw or []:
+        if isinstance(item, str):
+            nodes[item.lower()] = True
+            continue
+        if not isinstance(item, dict):
+            continue
+        for node, attrs in item.items():
+            attrs = attrs if isinstance(attrs, dict) else {}
+            expiry = attrs.get("expiry")
+            if expiry and float(expiry) <= now:
+                continue
+            if attrs.get("context"):
+                contextual += 1
+                continue
+            nodes[str(node).lower()] = bool(attrs.get("value", True))
+    return nodes, contextual
+
+
+def _parse_holder(data: Dict, now: float) -> Dict[str, Any]:
+    """Grupo o usuario de yaml-storage: nodos, padres y peso"""
+    nodes, contextual = _parse_node_list(data.get("permissions"), now)
+
+    parents: List[str] = []
+    for parent in data.get("parents") or []:
+        if isinstance(parent, dict):
+            # '- grupo: {context: ...}'
+            parent = next(iter(parent), None)
+        if parent:
+            parents.append(str(parent).lower())
+    # LuckPerms 5 guarda la herencia como nodos group.<nombre>
+    for node, value in nodes.items():
+        if value and node.startswith("group."):
+            parents.append(node[len("group."):])
+
+    weight = 0
+    for node in nodes:
+        if node.startswith("weight."):
+            try:
+                weight = int(node[len("weight."):])
+            except ValueError:
+                pass
+
+    return {
+        "name": data.get("name"),
+        "nodes": nodes,
+        "parents": list(dict.fromkeys(parents)),
+        "weight": weight,
+        "primary_group": (data.get("primary-group") or "").lower() or None,
+        "contextual": contextual
+    }
+
+
+class PermissionIndex:
+    """
+    Responde "¿quién puede usar X?" sin releer YAML en cada petición
+
+    Los archivos de plugins/LuckPerms/yaml-storage se parsean una vez (en un
+    thread) y solo se vuelven a leer los que cambian de mtime/tamaño. Con
+    ellos se calculan los permisos efectivos de cada grupo y usuario
+    (propios > grupos por peso > herencia) y un índice invertido
+    nodo → titulares, así una consulta solo mira los nodos candidatos
+    (exacto y comodines). ops.json se lee del store compartido.
+    """
+
+    def __init__(self):
+        server_path = Path(settings.SERVER_PATH)
+        self.storage_path = server_path / "plugins" / "LuckPerms" / "yaml-storage"
+        self.ops = get_store(server_path / "ops.json")
+        self._signature: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._parsed: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+        self._groups: Dict[str, Dict] = {}
+        self._users: Dict[str, Dict] = {}
+        self._holders: Dict[str, Dict[str, Grant]] = {}
+        self._default_grants: Dict[str, Grant] = {}
+        self._reload_task: Optional[Tuple[Tuple, asyncio.Future]] = None
+
+    # ---------- Carga ----------
+
+    def _scan(self) -> Tuple:
+        """Firma de yaml-storage: (ruta, mtime, tamaño) de cada archivo"""
+        entries = []
+        for kind in ("groups", "users"):
+            try:
+                with os.scandir(self.storage_path / kind) as it:
+                    for entry in it:
+                        if entry.name.endswith((".yml", ".yaml")):
+                            stat = entry.stat()
+                            entries.append((entry.path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                continue
+        return tuple(sorted(entries))
+
+    async def _refresh(self):
+        """Reconstruir el índice si cambió algún archivo de LuckPerms"""
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < RECHECK_SECONDS:
+            return
+
+        loop = asyncio.get_running_loop()
+        signature = await loop.run_in_executor(None, self._scan)
+        self._checked_at = time.monotonic()
+        if signature == self._signature:
+            return
+
+        # Peticiones concurrentes esperan la misma reconstrucción
+        if self._reload_task is None:
+            self._reload_task = (signature, loop.run_in_executor(None, self._load, signature))
+
+        reload = self._reload_task
+        loaded_signature, future = reload
+        try:
+            indexes = await asyncio.shield(future)
+        finally:
+            if self._reload_task is reload:
+                self._reload_task = None
+
+        if loaded_signature != self._signature:
+            self._apply(indexes)
+            self._signature = loaded_signature
+
+    def _load(self, signature: Tuple) -> Dict:
+        """Parsear los YAML cambiados y calcular permisos efectivos (en un thread)"""
+        now = time.time()
+        parsed: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+        groups: Dict[str, Dict] = {}
+        users: Dict[str, Dict] = {}
+
+        for path, mtime, size in signature:
+            cached = self._parsed.get(path)
+            if cached and cached[0] == (mtime, size):
+                holder = cached[1]
+            else:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = yaml.safe_load(f) or {}
+                    holder = _parse_holder(data, now)
+                except (OSError, yaml.YAMLError, AttributeError, ValueError) as e:
+                    print(f"Error leyendo {path}: {e}")
+                    continue
+            parsed[path] = ((mtime, size), holder)
+
+            stem = Path(path).stem.lower()
+            if Path(path).parent.name == "groups":
+                groups[str(holder["name"] or stem).lower()] = holder
+            else:
+                users[normalize_uuid(stem)] = holder
+
+        self._parsed = parsed
+
+        # Permisos efectivos por grupo (memoizados, a prueba de ciclos)
+        effective: Dict[str, Dict[str, Grant]] = {}
+
+        def resolve_group(name: str, stack: Set[str]) -> Dict[str, Grant]:
+            if name in effective:
+                return effective[name]
+            group = groups.get(name)
+            if group is None or name in stack:
+                return {}
+            stack = stack | {name}
+            grants = {node: (value, f"group:{name}") for node, value in group["nodes"].items()}
+            for parent in self._by_weight(group["parents"], groups):
+                for node, grant in resolve_group(parent, stack).items():
+                    grants.setdefault(node, grant)
+            effective[name] = grants
+            return grants
+
+        holders: Dict[str, Dict[str, Grant]] = {}
+        for uuid, user in list(users.items()):
+            grants = {node: (value, "user") for node, value in user["nodes"].items()}
+            parents = list(user["parents"])
+            if user["primary_group"] and user["primary_group"] not in parents:
+                parents.append(user["primary_group"])
+            for group in self._by_weight(parents or [DEFAULT_GROUP], groups):
+                for node, grant in resolve_group(group, set()).items():
+                    grants.setdefault(node, grant)
+            # Copia: el holder parseado se reutiliza en la siguiente carga y
+            # el event loop sigue leyendo los índices actuales mientras tanto
+            users[uuid] = {**user, "groups": parents or [DEFAULT_GROUP]}
+            for node, grant in grants.items():
+                holders.setdefault(node, {})[uuid] = grant
+
+        return {
+            "groups": groups,
+            "users": users,
+            "holders": holders,
+            "default_grants": resolve_group(DEFAULT_GROUP, set())
+        }
+
+    @staticmethod
+    def _by_weight(names: List[str], groups: Dict[str, Dict]) -> List[str]:
+        return sorted(names, key=lambda n: groups.get(n, {}).get("weight", 0), reverse=True)
+
+    def _apply(self, indexes: Dict):
+        """Sustituir los índices de una vez (en el event loop)"""
+        self._groups = indexes["groups"]
+        self._users = indexes["users"]
+        self._holders = indexes["holders"]
+        self._default_grants = indexes["default_grants"]
+
+    # ---------- Consultas ----------
+
+    def _operators(self) -> Dict[str, Dict]:
+        return {normalize_uuid(op["uuid"]): op for op in self.ops.all() if op.get("uuid")}
+
+    async def who_can(self, permission: str, min_op_level: int = 1) -> Dict[str, Any]:
+        """
+        Jugadores que tienen un permiso (LuckPerms) o lo obtienen por ser OP
+
+        Args:
+            permission: Nodo de permiso (p. ej. essentials.fly)
+            min_op_level: Nivel mínimo de OP que cuenta como permitido
+
+        Returns:
+            Dict con players (uuid, name, source, node/level), denied y
+            default (si el grupo default lo concede a cualquier jugador)
+        """
+        await self._refresh()
+        candidates = candidate_nodes(permission)
+
+        # El nodo más específico de cada jugador decide
+        decided: Dict[str, Tuple[bool, str, str]] = {}
+        for node in candidates:
+            for uuid, (value, origin) in self._holders.get(node, {}).items():
+                if uuid not in decided:
+                    decided[uuid] = (value, origin, node)
+
+        ops = self._operators()
+        players = []
+        denied = []
+        for uuid, (value, origin, node) in decided.items():
+            entry = {
+                "uuid": uuid,
+                "name": self._users[uuid].get("name") or ops.get(uuid, {}).get("name"),
+                "source": origin,
+                "node": node
+            }
+            (players if value else denied).append(entry)
+
+        # Los OP tienen el permiso salvo que LuckPerms lo niegue expresamente
+        for uuid, op in ops.items():
+            if uuid in decided or op.get("level", 0) < min_op_level:
+                continue
+            players.append({
+                "uuid": uuid,
+                "name": op.get("name"),
+                "source": "op",
+                "level": op.get("level")
+            })
+
+        default = next((self._default_grants[n] for n in candidates if n in self._default_grants), None)
+        players.sort(key=lambda p: (p.get("name") or "").lower())
+        return {
+            "permission": permission.strip().lower(),
+            "players": players,
+            "denied": denied,
+            "default": bool(default and default[0])
+        }
+
+    async def get_player_permissions(self, uuid: str) -> Dict[str, Any]:
+        """
+        Grupos, nodos propios y nivel de OP de un jugador
+
+        Args:
+            uuid: UUID del jugador (con o sin guiones)
+
+        Returns:
+            Dict con groups, permissions y op_level
+        """
+        await self._refresh()
+        key = normalize_uuid(uuid)
+        user = self._users.get(key)
+        op = self._operators().get(key)
+        return {
+            "uuid": key,
+            "name": (user or {}).get("name") or (op or {}).get("name"),
+            "groups": (user or {}).get("groups", [DEFAULT_GROUP]),
+            "permissions": (user or {}).get("nodes", {}),
+            "op_level": op.get("level") if op else None
+        }
+
+    async def get_groups(self) -> List[Dict[str, Any]]:
+        """Grupos de LuckPerms con peso, padres y número de nodos"""
+        await self._refresh()
+        return [
+            {
+                "name": name,
+                "weight": group["weight"],
+                "parents": group["parents"],
+                "permissions": len(group["nodes"]),
+                "contextual": group["contextual"]
+            }
+            for name, group in sorted(self._groups.items(), key=lambda g: -g[1]["weight"])
+        ]
+
+
+# Instancia global
+permission_index = PermissionIndex()
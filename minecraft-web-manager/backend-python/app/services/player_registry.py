@@ -0,0 +1,219 @@
+"""Registro de jugadores en memoria indexado a partir de usercache.json"""
+import asyncio
+import json
+import os
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+
+
+# UUID normalizado (32 hex en minúsculas, ver normalize_uuid) y nombre de Minecraft
+UUID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+
+
+def normalize_uuid(uuid: str) -> str:
+    """UUID en minúsculas y sin guiones (acepta ambos formatos)"""
+    return uuid.replace("-", "").lower()
+
+
+def dashed_uuid(uuid: str) -> str:
+    """UUID con guiones, como lo guardan los JSON del servidor"""
+    h = normalize_uuid(uuid)
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PlayerRegistry:
+    """
+    Índices en memoria de los jugadores conocidos por el servidor
+
+    usercache.json se lee (en un thread) solo cuando cambia su mtime/tamaño,
+    y los índices se sustituyen de una vez al terminar. Si no se puede
+    leer se conservan los índices anteriores y no se reintenta hasta que
+    el archivo vuelva a cambiar. Se mantienen
+    diccionarios por UUID y por nombre en minúsculas, una lista ordenada de
+    nombres para búsquedas por prefijo (bisect) y un índice de trigramas
+    para búsquedas parciales. Los resultados conservan el orden del
+    historial (expiresOn más reciente primero).
+    """
+
+    def __init__(self, usercache_file: Optional[Path] = None):
+        self.usercache_file = usercache_file or Path(settings.SERVER_PATH) / "usercache.json"
+        self._signature: Optional[Tuple[int, int]] = None
+        self._players: List[Dict] = []
+        self._names: List[str] = []
+        self._by_uuid: Dict[str, Dict] = {}
+        self._by_name: Dict[str, Dict] = {}
+        self._sorted_names: List[Tuple[str, int]] = []
+        self._trigram_index: Dict[str, Set[int]] = {}
+        self._reload_task: Optional[Tuple[Optional[Tuple[int, int]], asyncio.Future]] = None
+
+    def _signature_now(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.usercache_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    async def _refresh(self):
+        """Reconstruir los índices si usercache.json cambió"""
+        signature = self._signature_now()
+        if signature == self._signature:
+            return
+
+        # Peticiones concurrentes esperan la misma recarga
+        if self._reload_task is None:
+            loop = asyncio.get_running_loop()
+            self._reload_task = (signature, loop.run_in_executor(None, self._load, signature))
+
+        reload = self._reload_task
+        loaded_signature, future = reload
+        try:
+            indexes = await asyncio.shield(future)
+        finally:
+            if self._reload_task is reload:
+                self._reload_task = None
+
+        if loaded_signature == self._signature:
+            return
+        if indexes is None:
+            print(f"⚠️  No se pudo leer {self.usercache_file}: se conservan los jugadores anteriores")
+        else:
+            self._apply(indexes)
+        # También tras un fallo: esa versión del archivo no se vuelve a leer
+        self._signature = loaded_signature
+
+    def _load(self, signature: Optional[Tuple[int, int]]) -> Optional[Dict]:
+        """Leer usercache.json y construir los índices (en un thread)"""
+        players: List[Dict] = []
+        if signature is not None:
+            try:
+                with open(self.usercache_file, 'r') as f:
+                    data = json.load(f)
+                players = [p for p in data if isinstance(p, dict)]
+            except (OSError, ValueError, TypeError):
+                # Archivo a medio escribir: conservar los índices anteriores
+                return None
+
+        players.sort(key=lambda x: x.get('expiresOn', ''), reverse=True)
+        names = [p.get('name', '').lower() for p in players]
+        by_uuid: Dict[str, Dict] = {}
+        by_name: Dict[str, Dict] = {}
+        trigram_index: Dict[str, Set[int]] = {}
+
+        # Recorrido inverso: ante duplicados gana la entrada más reciente
+        for position in range(len(players) - 1, -1, -1):
+            player = players[position]
+            name = names[position]
+            if player.get('uuid'):
+                by_uuid[normalize_uuid(player['uuid'])] = player
+            if name:
+                by_name[name] = player
+            for gram in _trigrams(name):
+                trigram_index.setdefault(gram, set()).add(position)
+
+        return {
+            "players": players,
+            "names": names,
+            "by_uuid": by_uuid,
+            "by_name": by_name,
+            "sorted_names": sorted((name, i) for i, name in enumerate(names) if name),
+            "trigram_index": trigram_index
+        }
+
+    def _apply(self, indexes: Dict):
+        """Sustituir los índices de una vez (en el event loop)"""
+        self._players = indexes["players"]
+        self._names = indexes["names"]
+        self._by_uuid = indexes["by_uuid"]
+        self._by_name = indexes["by_name"]
+        self._sorted_names = indexes["sorted_names"]
+        self._trigram_index = indexes["trigram_index"]
+
+    async def all(self) -> List[Dict]:
+        """Todos los jugadores, más recientes primero"""
+        await self._refresh()
+        return list(self._players)
+
+    async def get_by_uuid(self, uuid: str) -> Optional[Dict]:
+        await self._refresh()
+        return self._by_uuid.get(normalize_uuid(uuid))
+
+    async def get_by_name(self, name: str) -> Optional[Dict]:
+        await self._refresh()
+        return self._by_name.get(name.lower())
+
+    async def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Jugadores cuyo nombre empieza por un prefijo (orden alfabético)
+
+        Args:
+            prefix: Inicio del nombre (sin distinguir mayúsculas)
+            limit: Máximo de resultados
+        """
+        await self._refresh()
+        prefix = prefix.lower()
+        results = []
+        seen = set()
+
+        i = bisect_left(self._sorted_names, (prefix, -1))
+        while i < len(self._sorted_names) and len(results) < limit:
+            name, position = self._sorted_names[i]
+            if not name.startswith(prefix):
+                break
+            if name not in seen:
+                seen.add(name)
+                results.append(self._players[position])
+            i += 1
+
+        return results
+
+    async def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Jugadores cuyo nombre contiene el texto (orden del historial)
+
+        Args:
+            query: Texto parcial (sin distinguir mayúsculas)
+            limit: Máximo de resultados (None = todos)
+        """
+        await self._refresh()
+        query = query.lower()
+        if not query:
+            return self._players[:limit]
+
+        if len(query) < 3:
+            # Demasiado corto para trigramas: recorrido con corte anticipado
+            results = []
+            for position, name in enumerate(self._names):
+                if query in name:
+                    results.append(self._players[position])
+                    if limit is not None and len(results) >= limit:
+                        break
+            return results
+
+        candidate_sets = []
+        for gram in _trigrams(query):
+            positions = self._trigram_index.get(gram)
+            if not positions:
+                return []
+            candidate_sets.append(positions)
+
+        candidate_sets.sort(key=len)
+        candidates = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+
+        results = [
+            self._players[position]
+            for position in sorted(candidates)
+            if query in self._names[position]
+        ]
+        return results[:limit]
+
+
+# Instancia global
+player_registry = PlayerRegistry()
@@ -1,10 +1,11 @@
 """Servicio para gestión de jugadores de Minecraft"""
-import json
-import httpx
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
 from app.core.config import settings
+from app.services.mojang_service import mojang_service
+from app.services.player_registry import player_registry
+from app.services.player_tracker import player_tracker
 from app.services.rcon_service import rcon_service
 
 
@@ -13,8 +14,6 @@ class PlayerService:
     
     def __init__(self):
         self.server_path = Path(settings.SERVER_PATH)
-        self.usercache_file = self.server_path / "usercache.json"
-        self.mojang_api = "https://api.mojang.com"
     
     async def get_online_players(self) -> Dict:
         """
@@ -24,7 +23,12 @@ class PlayerService:
             Dict con 'online' (int), 'max' (int), 'players' (list)
         """
         try:
-            result = await rcon_service.list_players()
+            if player_tracker.active:
+                # Estado derivado de latest.log: sin consultas RCON
+                players = player_tracker.get_online()
+                result = {"online": len(players), "players": [p["name"] for p in players]}
+            else:
+                result = await rcon_service.list_players()
             
             # Leer max-players desde server.properties
             max_players = 20  # por defecto
@@ -52,58 +56,47 @@ class PlayerService:
             Lista de jugadores con name, uuid, expiresOn
         """
         try:
-            if not self.usercache_file.exists():
-                return []
-            
-            with open(self.usercache_file, 'r') as f:
-                cache = json.load(f)
-            
-            # Ordenar por fecha más reciente
-            cache_sorted = sorted(
-                cache, 
-                key=lambda x: x.get('expiresOn', ''), 
-                reverse=True
-            )
-            
-            return cache_sorted
+            return await player_registry.all()
         except Exception:
             return []
     
-    async def search_player(self, query: str) -> List[Dict]:
+    async def search_player(self, query: str, limit: Optional[int] = None) -> List[Dict]:
         """
         Buscar jugadores en el historial por nombre parcial
         
         Args:
             query: Texto a buscar (nombre parcial)
+            limit: Máximo de resultados (None = todos)
             
         Returns:
             Lista de jugadores que coinciden
         """
-        history = await self.get_player_history()
-        query_lower = query.lower()
+        return await player_registry.search(query, limit)
+    
+    async def autocomplete_player(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Sugerir jugadores cuyo nombre empieza por un prefijo
         
-        return [
-            player for player in history 
-            if query_lower in player.get('name', '').lower()
-        ]
+        Args:
+            prefix: Inicio del nombre
+            limit: Máximo de sugerencias
+            
+        Returns:
+            Lista de jugadores en orden alfabético
+        """
+        return await player_registry.autocomplete(prefix, limit)
     
     async def get_player_by_uuid(self, uuid: str) -> Optional[Dict]:
         """
         Buscar un jugador por UUID en el historial
         
         Args:
-            uuid: UUID del jugador
+            uuid: UUID del jugador (con o sin guiones)
             
         Returns:
             Datos del jugador o None
         """
-        history = await self.get_player_history()
-        
-        for player in history:
-            if player.get('uuid', '') == uuid:
-                return player
-        
-        return None
+        return await player_registry.get_by_uuid(uuid)
     
     async def get_player_by_name(self, name: str) -> Optional[Dict]:
         """
@@ -115,45 +108,52 @@ class PlayerService:
         Returns:
             Datos del jugador o None
         """
-        history = await self.get_player_history()
-        
-        for player in history:
-            if player.get('name', '').lower() == name.lower():
-                return player
-        
-        return None
+        return await player_registry.get_by_name(name)
     
     async def fetch_uuid_from_mojang(self, username: str) -> Optional[Dict]:
         """
-        Obtener UUID de un jugador desde la API de Mojang
+        Obtener UUID de un jugador desde la API de Mojang (con caché)
         
         Args:
             username: Nombre del jugador
             
         Returns:
-            Dict con 'name' y 'id' (UUID sin guiones) o None
+            Dict con 'name' y 'uuid' (UUID sin guiones) o None
         """
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.mojang_api}/users/profiles/minecraft/{username}",
-                    timeout=5.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        "name": data.get("name"),
-                        "uuid": data.get("id")
-                    }
-                
-                return None
-        except Exception:
-            return None
+        return await mojang_service.lookup_name(username)
+    
+    async def resolve_uuids(self, usernames: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Resolver varios nombres: primero el historial local, luego Mojang en lotes
+        
+        Args:
+            usernames: Nombres de jugadores
+            
+        Returns:
+            Dict nombre en minúsculas → {'name', 'uuid', 'source'} o None
+        """
+        results = {}
+        missing = []
+        
+        for username in usernames:
+            player = await player_registry.get_by_name(username)
+            if player:
+                results[username.lower()] = {
+                    "name": player.get('name'),
+                    "uuid": player.get('uuid'),
+                    "source": "local"
+                }
+            else:
+                missing.append(username)
+        
+        for name, data in (await mojang_service.lookup_names(missing)).items():
+            results[name] = {**data, "source": "mojang"} if data else None
+        
+        return results
     
     async def fetch_player_profile(self, uuid: str) -> Optional[Dict]:
         """
-        Obtener perfil completo de un jugador desde Mojang
+        Obtener perfil completo de un jugador desde Mojang (con caché)
         
         Args:
             uuid: UUID del jugador (con o sin guiones)
@@ -161,22 +161,7 @@ class PlayerService:
         Returns:
             Perfil del jugador con skin, capa, etc.
         """
-        try:
-            # Remover guiones del UUID si los tiene
-            uuid_clean = uuid.replace("-", "")
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.mojang_api}/session/minecraft/profile/{uuid_clean}",
-                    timeout=5.0
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                
-                return None
-        except Exception:
-            return None
+        return await mojang_service.get_profile(uuid)
     
     async def kick_player(self, username: str, reason: str = "Expulsado del servidor") -> bool:
         """
@@ -199,10 +184,10 @@ class PlayerService:
             uuid: UUID del jugador
             
         Returns:
-            URL del avatar (Crafatar)
+            URL del avatar (servido por el panel, ver avatar_service)
         """
         uuid_clean = uuid.replace("-", "")
-        return f"https://crafatar.com/avatars/{uuid_clean}?overlay=true"
+        return f"/api/players/avatar/{uuid_clean}?size=64"
 
 
 # Instancia singleton
@@ -0,0 +1,434 @@
+"""Seguimiento de sesiones de jugadores a partir de logs/latest.log"""
+import asyncio
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.player_session import PlayerSession
+
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+# Paper: "[12:34:56 INFO]: msg"  Vanilla: "[12:34:56] [Server thread/INFO]: msg"
+LINE_PREFIX = re.compile(r"^\[(\d{2}):(\d{2}):(\d{2})[^\]]*\](?: \[[^\]]*\])?: (.*)$")
+
+UUID_LINE = re.compile(r"^UUID of player (\S+) is ([0-9a-fA-F-]{32,36})$")
+LOGIN_LINE = re.compile(r"^(\S+?)\[/(.+)\] logged in with entity id")
+JOIN_LINE = re.compile(r"^(\S+)(?: \(formerly known as \S+\))? joined the game$")
+LEAVE_LINE = re.compile(r"^(\S+) left the game$")
+LOST_LINE = re.compile(r"^(\S+) lost connection: (.*)$")
+KICKED_LINE = re.compile(r"^Kicked (\S+): (.*)$")
+CHAT_LINE = re.compile(r"^(?:\[Not Secure\] )?<(\S+)> ")
+STARTING_LINE = re.compile(r"^Starting minecraft server version")
+STOPPING_LINE = re.compile(r"^Stopping server$")
+
+# Si la hora retrocede más que esto, el log pasó la medianoche
+DAY_ROLLOVER_SECONDS = 3600
+
+# Tamaño máximo de lectura por sondeo
+READ_CHUNK = 1024 * 1024
+
+
+def _clock_seconds(match) -> int:
+    return int(match.group(1)) * 3600 + int(match.group(2)) * 60 + int(match.group(3))
+
+
+class PlayerTracker:
+    """
+    Estado de jugadores conectados e historial de sesiones sin RCON
+
+    Lee latest.log de forma incremental (por offset; detecta rotación por
+    inode o truncado) y reconoce entradas, salidas, kicks y mensajes de
+    chat. Los conectados se mantienen en memoria; cada sesión queda en la
+    tabla player_sessions. Al arrancar se relee el log actual: las
+    escrituras son idempotentes (una sesión se identifica por nombre y hora
+    de entrada), así que no se duplican sesiones ya registradas.
+    """
+
+    def __init__(self):
+        self.log_file = Path(settings.SERVER_PATH) / "logs" / "latest.log"
+        self.poll_seconds = settings.PLAYER_TRACKER_POLL_SECONDS
+        # Un solo thread: las escrituras en la DB mantienen el orden del log
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="player-tracker")
+        self._task: Optional[asyncio.Task] = None
+
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._partial = b""
+        self._date: date = date.today()
+        self._last_clock: Optional[int] = None
+        self._last_event_at: Optional[datetime] = None
+
+        self.online: Dict[str, Dict[str, Any]] = {}
+        self._uuids: Dict[str, str] = {}
+        self._ips: Dict[str, str] = {}
+        self._leave_reasons: Dict[str, Tuple[str, str]] = {}
+
+    @property
+    def active(self) -> bool:
+        """True si el tracker está leyendo un latest.log"""
+        return self._task is not None and self._inode is not None
+
+    # ---------- Lectura del log ----------
+
+    def _read_new(self) -> Tuple[Optional[int], bytes, bool]:
+        """Leer bytes nuevos del log (en un thread); devuelve (inode, datos, archivo_nuevo)"""
+        try:
+            stat = os.stat(self.log_file)
+        except OSError:
+            return None, b"", False
+
+        reopened = stat.st_ino != self._inode or stat.st_size < self._offset
+        offset = 0 if reopened else self._offset
+
+        with open(self.log_file, "rb") as f:
+            f.seek(offset)
+            data = f.read() if reopened else f.read(READ_CHUNK)
+
+        return stat.st_ino, data, reopened
+
+    def _start_date(self, lines: List[str]) -> date:
+        """Fecha de la primera línea: fecha del archivo menos los cambios de día"""
+        rollovers = 0
+        previous = None
+        for line in lines:
+            match = LINE_PREFIX.match(line)
+            if not match:
+                continue
+            clock = _clock_seconds(match)
+            if previous is not None and clock < previous - DAY_ROLLOVER_SECONDS:
+                rollovers += 1
+            previous = clock
+
+        modified = datetime.fromtimestamp(os.stat(self.log_file).st_mtime).date()
+        return modified - timedelta(days=rollovers)
+
+    async def _poll(self):
+        loop = asyncio.get_running_loop()
+        inode, data, reopened = await loop.run_in_executor(self._executor, self._read_new)
+        if inode is None:
+            return
+
+        if reopened:
+            self._partial = b""
+            self._offset = 0
+            self._last_clock = None
+
+        self._inode = inode
+        self._offset += len(data)
+        data = self._partial + data
+        lines_data, _, self._partial = data.rpartition(b"\n")
+        if not lines_data:
+            return
+
+        lines = [ANSI_ESCAPE.sub("", l) for l in lines_data.decode("utf-8", errors="replace").split("\n")]
+        if reopened:
+            self._date = await loop.run_in_executor(self._executor, self._start_date, lines)
+
+        events = []
+        for line in lines:
+            event = self._parse_line(line.rstrip("\r"))
+            if event:
+                events.append(event)
+
+        if events:
+            await loop.run_in_executor(self._executor, self._persist, events)
+
+    def _timestamp(self, clock: int) -> datetime:
+        """Convertir la hora del log en fecha completa (detecta medianoche)"""
+        if self._last_clock is not None and clock < self._last_clock - DAY_ROLLOVER_SECONDS:
+            self._date += timedelta(days=1)
+        self._last_clock = clock
+        return datetime.combine(self._date, dtime()) + timedelta(seconds=clock)
+
+    def _parse_line(self, line: str) -> Optional[Tuple]:
+        """Actualizar el estado en memoria y devolver el evento a persistir"""
+        match = LINE_PREFIX.match(line)
+        if not match:
+            return None
+
+        at = self._timestamp(_clock_seconds(match))
+        previous_at, self._last_event_at = self._last_event_at, at
+        message = match.group(4)
+
+        m = CHAT_LINE.match(message)
+        if m:
+            player = self.online.get(m.group(1).lower())
+            if player:
+                player["chat_messages"] += 1
+            return None
+
+        m = UUID_LINE.match(message)
+        if m:
+            self._uuids[m.group(1).lower()] = m.group(2)
+            return None
+
+        m = LOGIN_LINE.match(message)
+        if m:
+            self._ips[m.group(1).lower()] = m.group(2).rsplit(":", 1)[0]
+            return None
+
+        m = JOIN_LINE.match(message)
+        if m:
+            name = m.group(1)
+            key = name.lower()
+            self._leave_reasons.pop(key, None)
+            self.online[key] = {
+                "name": name,
+                "uuid": self._uuids.get(key),
+                "ip": self._ips.pop(key, None),
+                "joined_at": at,
+                "chat_messages": 0
+            }
+            return ("join", at, self.online[key])
+
+        m = KICKED_LINE.match(message)
+        if m:
+            self._leave_reasons[m.group(1).lower()] = ("kick", m.group(2))
+            return None
+
+        m = LOST_LINE.match(message)
+        if m:
+            key = m.group(1).lower()
+            reason = m.group(2)
+            kicked = "kick" in reason.lower() or "banned" in reason.lower()
+            # "Kicked X: motivo" (comando /kick) ya dejó el motivo exacto
+            self._leave_reasons.setdefault(key, ("kick" if kicked else "quit", reason))
+            return None
+
+        m = LEAVE_LINE.match(message)
+        if m:
+            key = m.group(1).lower()
+            player = self.online.pop(key, None)
+            reason, detail = self._leave_reasons.pop(key, ("quit", None))
+            if player:
+                return ("leave", at, player, reason, detail)
+            return None
+
+        if STARTING_LINE.match(message) or STOPPING_LINE.match(message):
+            # Arranque tras una caída (nadie salió) o parada ordenada
+            reason = "shutdown" if STOPPING_LINE.match(message) else "crash"
+            closed_at = at if reason == "shutdown" else (previous_at or at)
+            self.online.clear()
+            self._leave_reasons.clear()
+            return ("reset", closed_at, reason)
+
+        return None
+
+    # ---------- Persistencia ----------
+
+    def _persist(self, events: List[Tuple]):
+        """Aplicar eventos a player_sessions (idempotente, en un thread)"""
+        db = SessionLocal()
+        try:
+            for event in events:
+                kind, at = event[0], event[1]
+
+                if kind == "join":
+                    player = event[2]
+                    exists = db.query(PlayerSession.id).filter(
+                        PlayerSession.name == player["name"],
+                        PlayerSession.joined_at == at
+                    ).first()
+                    if not exists:
+                        # Una sesión abierta anterior del mismo jugador quedó huérfana
+                        self._close_open(db, at, "crash", None, name=player["name"])
+                        db.add(PlayerSession(
+                            name=player["name"],
+                            uuid=player["uuid"],
+                            ip_address=player["ip"],
+                            joined_at=at,
+                            chat_messages=0
+                        ))
+                        db.flush()
+
+                elif kind == "leave":
+                    player, reason, detail = event[2], event[3], event[4]
+                    self._close_open(
+                        db, at, reason, detail,
+                        name=player["name"],
+                        chat_messages=player["chat_messages"]
+                    )
+
+                elif kind == "reset":
+                    self._close_open(db, at, event[2], None)
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error guardando sesiones de jugadores: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _close_open(
+        db,
+        at: datetime,
+        reason: str,
+        detail: Optional[str],
+        name: Optional[str] = None,
+        chat_messages: Optional[int] = None
+    ):
+        """Cerrar sesiones abiertas (de un jugador o todas) iniciadas antes de 'at'"""
+        query = db.query(PlayerSession).filter(
+            PlayerSession.left_at == None,
+            PlayerSession.joined_at <= at
+        )
+        if name is not None:
+            query = query.filter(PlayerSession.name == name)
+
+        for row in query.all():
+            row.left_at = at
+            row.duration_seconds = int((at - row.joined_at).total_seconds())
+            row.leave_reason = reason
+            row.leave_message = detail[:255] if detail else None
+            if chat_messages is not None:
+                row.chat_messages = chat_messages
+
+        # Sin autoflush: un "join" posterior del mismo lote vería la sesión aún abierta
+        db.flush()
+
+    # ---------- Ciclo de vida ----------
+
+    async def start(self):
+        """Leer el log actual y seguirlo en segundo plano"""
+        if self._task or not settings.PLAYER_TRACKER_ENABLED:
+            return
+
+        async def follow():
+            while True:
+                try:
+                    await self._poll()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Error leyendo latest.log: {e}")
+                await asyncio.sleep(self.poll_seconds)
+
+        self._task = asyncio.create_task(follow())
+
+    async def stop(self):
+        """Detener el seguimiento del log"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    # ---------- Consultas ----------
+
+    def get_online(self) -> List[Dict[str, Any]]:
+        """Jugadores conectados según el log, en orden de entrada"""
+        now = datetime.now()
+        players = sorted(self.online.values(), key=lambda p: p["joined_at"])
+        return [
+            {
+                "name": p["name"],
+                "uuid": p["uuid"],
+                "ip": p["ip"],
+                "joined_at": p["joined_at"].isoformat(),
+                "online_seconds": max(int((now - p["joined_at"]).total_seconds()), 0),
+                "chat_messages": p["chat_messages"]
+            }
+            for p in players
+        ]
+
+    async def get_sessions(
+        self,
+        name: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """Historial de sesiones (más recientes primero)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._query_sessions, name, limit, offset)
+
+    @staticmethod
+    def _query_sessions(name: Optional[str], limit: int, offset: int) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            query = db.query(PlayerSession)
+            if name:
+                query = query.filter(PlayerSession.name == name)
+
+            total = query.count()
+            rows = query.order_by(PlayerSession.joined_at.desc()).offset(offset).limit(limit).all()
+
+            return {
+                "sessions": [
+                    {
+                        "id": row.id,
+                        "name": row.name,
+                        "uuid": row.uuid,
+                        "ip": row.ip_address,
+                        "joined_at": row.joined_at.isoformat(),
+                        "left_at": row.left_at.isoformat() if row.left_at else None,
+                        "duration_seconds": row.duration_seconds,
+                        "leave_reason": row.leave_reason,
+                        "leave_message": row.leave_message,
+                        "chat_messages": row.chat_messages
+                    }
+                    for row in rows
+                ],
+                "total": total
+            }
+        finally:
+            db.close()
+
+    async def get_playtime(self, days: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Tiempo de juego por jugador (sesiones cerradas + sesión actual)
+
+        Args:
+            days: Solo sesiones iniciadas en los últimos N días (None = todas)
+            limit: Máximo de jugadores
+        """
+        since = datetime.now() - timedelta(days=days) if days else None
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, self._query_playtime, since)
+
+        stats = {
+            name.lower(): {
+                "name": name,
+                "uuid": uuid,
+                "sessions": count,
+                "playtime_seconds": int(total),
+                "last_seen": last_seen.isoformat() if last_seen else None,
+                "online": False
+            }
+            for name, uuid, count, total, last_seen in rows
+        }
+
+        for player in self.get_online():
+            entry = stats.get(player["name"].lower())
+            if entry:
+                entry["playtime_seconds"] += player["online_seconds"]
+                entry["online"] = True
+                entry["last_seen"] = datetime.now().isoformat()
+
+        return sorted(stats.values(), key=lambda s: s["playtime_seconds"], reverse=True)[:limit]
+
+    @staticmethod
+    def _query_playtime(since: Optional[datetime]) -> List[Tuple]:
+        """Sesiones cerradas agrupadas por jugador (en un thread)"""
+        db = SessionLocal()
+        try:
+            query = db.query(
+                PlayerSession.name,
+                func.max(PlayerSession.uuid),
+                func.count(PlayerSession.id),
+                func.coalesce(func.sum(PlayerSession.duration_seconds), 0),
+                func.max(PlayerSession.joined_at)
+            )
+            if since:
+                query = query.filter(PlayerSession.joined_at >= since)
+            return [tuple(row) for row in query.group_by(PlayerSession.name).all()]
+        finally:
+            db.close()
+
+
+# Instancia global
+player_tracker = PlayerTracker()
@@ -1,9 +1,11 @@
 """Servicio para gestión de comandos RCON en el servidor Minecraft"""
 import asyncio
-from typing import Optional, List, Dict
+import time
+from typing import Callable, Optional, List, Dict
 from mcrcon import MCRcon
 from pathlib import Path
 from app.core.config import settings
+from app.core.metrics import rcon_duration, rcon_errors
 
 
 class RCONService:
@@ -38,12 +40,54 @@ class RCONService:
         Returns:
             Respuesta del servidor
         """
+        started = time.perf_counter()
         try:
             with MCRcon(self.host, self.password, port=self.port) as mcr:
                 response = mcr.command(command)
                 return response
         except Exception as e:
+            rcon_errors.inc("single")
             raise Exception(f"Error ejecutando comando RCON: {str(e)}")
+        finally:
+            rcon_duration.observe(time.perf_counter() - started, "single")
+    
+    async def execute_batch(
+        self,
+        commands: List[str],
+        progress: Optional[Callable[[int], None]] = None,
+        chunk_size: int = 50
+    ) -> List[str]:
+        """
+        Ejecutar muchos comandos por una sola conexión RCON
+        
+        mcrcon usa SIGALRM y solo funciona en el thread principal, así que
+        los comandos se envían en tandas cediendo el event loop entre ellas.
+        
+        Args:
+            commands: Comandos a ejecutar en orden
+            progress: Callback con el número de comandos enviados
+            chunk_size: Comandos por tanda
+            
+        Returns:
+            Respuestas en el mismo orden
+        """
+        responses = []
+        started = time.perf_counter()
+        try:
+            with MCRcon(self.host, self.password, port=self.port) as mcr:
+                for start in range(0, len(commands), chunk_size):
+                    for command in commands[start:start + chunk_size]:
+                        responses.append(mcr.command(command))
+                    if progress:
+                        progress(len(responses))
+                    await asyncio.sleep(0)
+        except Exception as e:
+            rcon_errors.inc("batch")
+            raise Exception(f"Error ejecutando comandos RCON ({len(responses)}/{len(commands)}): {str(e)}")
+        finally:
+            rcon_duration.observe(time.perf_counter() - started, "batch")
+        
+        return responses
     
     async def list_players(self) -> Dict[str, any]:
         """
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from app.core.config import settings
 from app.services.bash_service import bash_service
+from app.services.player_tracker import player_tracker
 
 
 class ServerService:
@@ -13,6 +14,7 @@ class ServerService:
     def __init__(self):
         self.server_path = Path(settings.SERVER_PATH)
         self.pid_file = self.server_path / "server.pid"
+        self._process: Optional[psutil.Process] = None
     
     def get_pid(self) -> Optional[int]:
         """Obtener PID del servidor desde archivo"""
@@ -26,6 +28,13 @@ class ServerService:
             pass
         return None
     
+    def _get_process(self, pid: int) -> psutil.Process:
+        """Proceso del servidor reutilizado entre consultas (cpu_percent sin bloquear)"""
+        if self._process is None or self._process.pid != pid:
+            self._process = psutil.Process(pid)
+            self._process.cpu_percent(interval=None)
+        return self._process
+    
     def is_running(self) -> bool:
         """Verificar si el servidor está corriendo"""
         pid = self.get_pid()
@@ -72,6 +81,18 @@ class ServerService:
         
         return {"paper": "Desconocida", "minecraft": "Desconocida", "full": "Desconocida"}
     
+    def get_max_players(self) -> int:
+        """Leer max-players desde server.properties (20 por defecto)"""
+        props_file = self.server_path / "server.properties"
+        try:
+            with open(props_file, 'r') as f:
+                for line in f:
+                    if line.startswith('max-players='):
+                        return int(line.split('=')[1].strip())
+        except (OSError, ValueError):
+            pass
+        return 20
+    
     async def get_status(self) -> Dict[str, Any]:
         """
         Obtener estado completo del servidor
@@ -94,23 +115,27 @@ class ServerService:
         
         if running and pid:
             try:
-                process = psutil.Process(pid)
+                process = self._get_process(pid)
                 
                 # Memoria
                 mem_info = process.memory_info()
                 status["memory"]["used"] = mem_info.rss
                 
-                # CPU
-                status["cpu"] = process.cpu_percent(interval=0.1)
+                # CPU (desde la consulta anterior, sin dormir 100 ms en el event loop)
+                status["cpu"] = process.cpu_percent(interval=None)
                 
                 # Uptime
                 status["uptime"] = int(psutil.boot_time() - process.create_time())
                 
-                # Jugadores (via RCON - solo si mcrcon disponible)
+                # Jugadores: desde latest.log si el tracker está activo,
+                # si no via RCON (solo si mcrcon disponible)
                 try:
                     # Verificar si mcrcon está instalado antes de intentar usarlo
                     import shutil
-                    if shutil.which("mcrcon"):
+                    if player_tracker.active:
+                        status["players"]["online"] = len(player_tracker.online)
+                        status["players"]["max"] = self.get_max_players()
+                    elif shutil.which("mcrcon"):
                         result = await bash_service.rcon_command("list")
                         if result["success"]:
                             # Parsear "There are X of Y players online"
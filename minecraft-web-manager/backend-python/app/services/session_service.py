@@ -0,0 +1,139 @@
+"""Sesiones JWT: alta por hash del token, límite por usuario y purga"""
+import asyncio
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.security import token_fingerprint
+from app.db.session import AsyncSessionLocal
+from app.models.session import Session as UserSession
+
+
+class SessionService:
+    """
+    Tabla sessions acotada
+
+    Las búsquedas van por el SHA-256 del token (clave corta de longitud
+    fija e indexada) en vez de por el JWT completo. Cada usuario conserva
+    como mucho AUTH_MAX_SESSIONS_PER_USER sesiones (al crear una se borran
+    las más antiguas) y una tarea elimina las expiradas cada
+    AUTH_SESSION_PURGE_INTERVAL_MINUTES.
+    """
+
+    def __init__(self):
+        self._purge_task: Optional[asyncio.Task] = None
+
+    async def create(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        access_token: str,
+        refresh_token: str,
+        expires_at: datetime,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> UserSession:
+        """
+        Registrar una sesión (sin commit: lo hace quien llama)
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            user_id: Usuario que inicia sesión
+            access_token: JWT de acceso
+            refresh_token: JWT de renovación
+            expires_at: Expiración de la sesión (UTC)
+            ip_address: IP del cliente
+            user_agent: User-Agent del cliente
+
+        Returns:
+            Sesión creada
+        """
+        session = UserSession(
+            user_id=user_id,
+            token_hash=token_fingerprint(access_token),
+            refresh_token_hash=token_fingerprint(refresh_token),
+            expires_at=expires_at,
+            ip_address=ip_address,
+            user_agent=(user_agent or "")[:255],
+            created_at=datetime.utcnow()
+        )
+        db.add(session)
+        await db.flush()
+
+        limit = settings.AUTH_MAX_SESSIONS_PER_USER
+        if limit > 0:
+            oldest = (
+                select(UserSession.id)
+                .where(UserSession.user_id == user_id)
+                .order_by(UserSession.created_at.desc(), UserSession.id.desc())
+                .offset(limit)
+            )
+            await db.execute(
+                delete(UserSession)
+                .where(UserSession.id.in_(oldest))
+                .execution_options(synchronize_session=False)
+            )
+
+        return session
+
+    async def get_by_refresh_token(self, db: AsyncSession, refresh_token: str) -> Optional[UserSession]:
+        """Sesión vigente de un refresh token, o None"""
+        session = await db.scalar(
+            select(UserSession).where(UserSession.refresh_token_hash == token_fingerprint(refresh_token))
+        )
+        if session is None or session.expires_at < datetime.utcnow():
+            return None
+        return session
+
+    def rotate_access_token(self, session: UserSession, access_token: str):
+        """Asociar un nuevo access token a la sesión (sin commit)"""
+        session.token_hash = token_fingerprint(access_token)
+
+    async def delete_by_token(self, db: AsyncSession, access_token: str) -> int:
+        """Eliminar la sesión de un access token; devuelve las filas borradas"""
+        result = await db.execute(
+            delete(UserSession).where(UserSession.token_hash == token_fingerprint(access_token))
+        )
+        return result.rowcount
+
+    async def delete_for_user(self, db: AsyncSession, user_id: int) -> int:
+        """Eliminar todas las sesiones de un usuario"""
+        result = await db.execute(delete(UserSession).where(UserSession.user_id == user_id))
+        return result.rowcount
+
+    async def purge_expired(self) -> int:
+        """Eliminar las sesiones expiradas; devuelve cuántas"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(UserSession).where(UserSession.expires_at < datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount
+
+    async def start_purge(self):
+        """Iniciar la purga periódica en segundo plano"""
+        if self._purge_task or settings.AUTH_SESSION_PURGE_INTERVAL_MINUTES <= 0:
+            return
+
+        async def purge_loop():
+            while True:
+                try:
+                    purged = await self.purge_expired()
+                    if purged:
+                        print(f"Sesiones expiradas eliminadas: {purged}")
+                except Exception as e:
+                    print(f"Error purgando sesiones: {e}")
+                await asyncio.sleep(settings.AUTH_SESSION_PURGE_INTERVAL_MINUTES * 60)
+
+        self._purge_task = asyncio.create_task(purge_loop())
+
+    async def stop_purge(self):
+        """Detener la purga periódica"""
+        if self._purge_task:
+            self._purge_task.cancel()
+            self._purge_task = None
+
+
+# Instancia global
+session_service = SessionService()
@@ -0,0 +1,435 @@
+"""Destinos remotos para copias de backups (directorio, SFTP, S3 compatible)"""
+import abc
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+import httpx
+from app.core.config import settings
+from app.services.backup_verifier import ThrottledHashingReader, CHUNK_SIZE
+
+
+# S3 admite como máximo 10.000 partes por subida
+S3_MAX_PARTS = 10000
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class BandwidthLimiter:
+    """
+    Limitador de caudal compartido entre subidas concurrentes
+
+    Cada bloque reserva su franja de tiempo; quien llega después espera
+    a que terminen las franjas anteriores.
+    """
+
+    def __init__(self, bytes_per_second: int = 0):
+        self.rate = bytes_per_second
+        self._next_slot = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def consume(self, size: int):
+        if not self.rate:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            self._next_slot = max(self._next_slot, now) + size / self.rate
+            delay = self._next_slot - now - size / self.rate
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class StorageTarget(abc.ABC):
+    """Interfaz común de los destinos remotos"""
+
+    name = "base"
+
+    def __init__(self):
+        self.retries = max(settings.BACKUP_UPLOAD_RETRIES, 1)
+        self.limiter = BandwidthLimiter(settings.BACKUP_UPLOAD_MAX_MBPS * 1024 * 1024)
+
+    @abc.abstractmethod
+    async def upload(self, path: Path, key: str) -> Dict[str, Any]:
+        """
+        Subir un archivo al destino
+
+        Args:
+            path: Archivo local
+            key: Nombre/ruta relativa en el destino
+
+        Returns:
+            Dict con success, uri, bytes, duration_seconds
+        """
+
+    async def _retry(self, description: str, operation):
+        """Ejecutar una corrutina con reintentos y espera exponencial"""
+        for attempt in range(1, self.retries + 1):
+            try:
+                return await operation()
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                wait = min(2 ** attempt, 30)
+                print(f"Reintentando {description} en {wait}s ({attempt}/{self.retries}): {e}")
+                await asyncio.sleep(wait)
+
+
+class LocalDirectoryTarget(StorageTarget):
+    """Copia a otro directorio (p. ej. un disco o NFS montado)"""
+
+    name = "local"
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = Path(directory)
+
+    def _copy(self, path: Path, destination: Path) -> int:
+        """Copiar por bloques respetando el límite de caudal (en un thread)"""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp = destination.with_name(destination.name + ".part")
+
+        with open(path, "rb") as src, open(temp, "wb") as dst:
+            reader = ThrottledHashingReader(src, self.limiter.rate)
+            while True:
+                chunk = reader.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        os.replace(temp, destination)
+        return reader.bytes_read
+
+    async def upload(self, path: Path, key: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        destination = self.directory / key
+        loop = asyncio.get_running_loop()
+
+        size = await self._retry(
+            f"copia de {key}",
+            lambda: loop.run_in_executor(None, self._copy, path, destination)
+        )
+
+        return {
+            "success": True,
+            "uri": str(destination),
+            "bytes": size,
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+
+
+class SFTPTarget(StorageTarget):
+    """
+    Copia por SFTP (requiere el paquete opcional asyncssh)
+
+    Sin límite de caudal se usa sftp.put, que envía varios bloques en
+    paralelo; con BACKUP_UPLOAD_MAX_MBPS el archivo se escribe por bloques
+    pasando cada uno por el limitador.
+    """
+
+    name = "sftp"
+
+    def __init__(self):
+        super().__init__()
+        self.host = settings.BACKUP_SFTP_HOST
+        self.port = settings.BACKUP_SFTP_PORT
+        self.username = settings.BACKUP_SFTP_USER
+        self.password = settings.BACKUP_SFTP_PASSWORD or None
+        self.key_path = settings.BACKUP_SFTP_KEY_PATH or None
+        self.remote_dir = settings.BACKUP_SFTP_PATH.rstrip("/") or "."
+
+    async def upload(self, path: Path, key: str) -> Dict[str, Any]:
+        try:
+            import asyncssh
+        except ImportError:
+            raise RuntimeError("El destino SFTP requiere el paquete asyncssh (pip install asyncssh)")
+
+        started = time.monotonic()
+        remote_path = f"{self.remote_dir}/{key}"
+        temp_path = remote_path + ".part"
+
+        async def put():
+            async with asyncssh.connect(
+                self.host,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                client_keys=[self.key_path] if self.key_path else None
+            ) as conn:
+                async with conn.start_sftp_client() as sftp:
+                    await sftp.makedirs(os.path.dirname(remote_path) or ".", exist_ok=True)
+                    if self.limiter.rate:
+                        await self._put_limited(sftp, path, temp_path)
+                    else:
+                        # asyncssh envía varios bloques en paralelo por conexión
+                        await sftp.put(
+                            str(path),
+                            temp_path,
+                            block_size=256 * 1024,
+                            max_requests=settings.BACKUP_UPLOAD_CONCURRENCY * 16
+                        )
+                    await sftp.posix_rename(temp_path, remote_path)
+
+        await self._retry(f"subida SFTP de {key}", put)
+
+        return {
+            "success": True,
+            "uri": f"sftp://{self.host}{remote_path if remote_path.startswith('/') else '/' + remote_path}",
+            "bytes": path.stat().st_size,
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+
+    async def _put_limited(self, sftp, path: Path, remote_path: str):
+        """Escribir el archivo por bloques respetando el límite de caudal"""
+        loop = asyncio.get_running_loop()
+        with open(path, "rb") as src:
+            async with sftp.open(remote_path, "wb") as remote:
+                while True:
+                    chunk = await loop.run_in_executor(None, src.read, CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await self.limiter.consume(len(chunk))
+                    await remote.write(chunk)
+
+
+class S3Target(StorageTarget):
+    """
+    Destino S3 compatible (AWS, MinIO, Backblaze, ...) con firma SigV4
+
+    Los archivos grandes se suben con multipart: las partes se leen por
+    offset y se envían en paralelo (BACKUP_UPLOAD_CONCURRENCY), cada una
+    con sus propios reintentos y el caudal total limitado.
+    """
+
+    name = "s3"
+
+    def __init__(self):
+        super().__init__()
+        self.endpoint = settings.BACKUP_S3_ENDPOINT.rstrip("/")
+        self.bucket = settings.BACKUP_S3_BUCKET
+        self.access_key = settings.BACKUP_S3_ACCESS_KEY
+        self.secret_key = settings.BACKUP_S3_SECRET_KEY
+        self.region = settings.BACKUP_S3_REGION
+        self.prefix = settings.BACKUP_S3_PREFIX.strip("/")
+        self.part_size = max(settings.BACKUP_UPLOAD_PART_MB * 1024 * 1024, S3_MIN_PART_SIZE)
+        self.concurrency = max(settings.BACKUP_UPLOAD_CONCURRENCY, 1)
+        self.host = httpx.URL(self.endpoint).netloc.decode()
+
+    # ---------- Firma SigV4 ----------
+
+    def _signed_headers(
+        self,
+        method: str,
+        object_path: str,
+        query: Dict[str, str],
+        payload_hash: str,
+        extra_headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """Calcular cabeceras firmadas (AWS Signature Version 4)"""
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = now.strftime("%Y%m%d")
+
+        headers = {
+            "host": self.host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+        }
+        for name, value in (extra_headers or {}).items():
+            headers[name.lower()] = value
+
+        canonical_query = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+            for k, v in sorted(query.items())
+        )
+        signed_names = sorted(headers)
+        canonical_headers = "".join(f"{name}:{headers[name].strip()}\n" for name in signed_names)
+        signed_headers = ";".join(signed_names)
+
+        canonical_request = "\n".join([
+            method,
+            quote(object_path, safe="/-_.~"),
+            canonical_query,
+            canonical_headers,
+            signed_headers,
+            payload_hash
+        ])
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+
+        key = ("AWS4" + self.secret_key).encode()
+        for part in (date_stamp, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        del headers["host"]
+        return headers
+
+    async def _request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        object_path: str,
+        query: Dict[str, str],
+        body: bytes = b"",
+        payload_hash: Optional[str] = None,
+        extra_headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        """Enviar una petición firmada y fallar en respuestas de error"""
+        payload_hash = payload_hash or hashlib.sha256(body).hexdigest()
+        headers = self._signed_headers(method, object_path, query, payload_hash, extra_headers)
+        headers["content-length"] = str(len(body))
+
+        response = await client.request(
+            method,
+            self.endpoint + quote(object_path, safe="/-_.~"),
+            params=query,
+            headers=headers,
+            content=self._throttled(body) if body else b""
+        )
+        if response.status_code >= 300 or b"<Error>" in response.content[:512]:
+            raise RuntimeError(f"S3 {method} {response.status_code}: {response.text[:300]}")
+        return response
+
+    async def _throttled(self, body: bytes):
+        """Enviar el cuerpo en bloques respetando el límite de caudal"""
+        view = memoryview(body)
+        for offset in range(0, len(body), 256 * 1024):
+            chunk = view[offset:offset + 256 * 1024]
+            await self.limiter.consume(len(chunk))
+            yield bytes(chunk)
+
+    @staticmethod
+    def _read_part(path: Path, offset: int, size: int):
+        """Leer una parte del archivo y calcular su SHA-256 (en un thread)"""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size)
+        return data, hashlib.sha256(data).hexdigest()
+
+    # ---------- Subida ----------
+
+    async def upload(self, path: Path, key: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        size = path.stat().st_size
+        object_key = f"{self.prefix}/{key}" if self.prefix else key
+        object_path = f"/{self.bucket}/{object_key}"
+
+        # Ajustar el tamaño de parte para no pasar de 10.000 partes
+        part_size = max(self.part_size, -(-size // S3_MAX_PARTS))
+
+        timeout = httpx.Timeout(120.0, connect=10.0)
+        limits = httpx.Limits(max_connections=self.concurrency + 1)
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            if size <= part_size:
+                loop = asyncio.get_running_loop()
+                data, digest = await loop.run_in_executor(None, self._read_part, path, 0, size)
+                await self._retry(
+                    f"subida S3 de {key}",
+                    lambda: self._request(client, "PUT", object_path, {}, data, digest)
+                )
+            else:
+                await self._multipart_upload(client, path, object_path, size, part_size)
+
+        return {
+            "success": True,
+            "uri": f"s3://{self.bucket}/{object_key}",
+            "bytes": size,
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+
+    async def _multipart_upload(
+        self,
+        client: httpx.AsyncClient,
+        path: Path,
+        object_path: str,
+        size: int,
+        part_size: int
+    ):
+        """Subida multipart con partes en paralelo; aborta si alguna falla"""
+        response = await self._retry(
+            "inicio de subida multipart",
+            lambda: self._request(client, "POST", object_path, {"uploads": ""})
+        )
+        upload_id = self._xml_text(response.content, "UploadId")
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        part_count = -(-size // part_size)
+        etags: List[Optional[str]] = [None] * part_count
+
+        async def upload_part(number: int):
+            offset = (number - 1) * part_size
+            async with semaphore:
+                data, digest = await loop.run_in_executor(
+                    None, self._read_part, path, offset, min(part_size, size - offset)
+                )
+                query = {"partNumber": str(number), "uploadId": upload_id}
+                part_response = await self._retry(
+                    f"parte {number}/{part_count}",
+                    lambda: self._request(client, "PUT", object_path, query, data, digest)
+                )
+                etags[number - 1] = part_response.headers.get("etag")
+
+        try:
+            await asyncio.gather(*(upload_part(n) for n in range(1, part_count + 1)))
+
+            parts_xml = "".join(
+                f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>"
+                for n, etag in enumerate(etags, start=1)
+            )
+            body = f"<CompleteMultipartUpload>{parts_xml}</CompleteMultipartUpload>".encode()
+            await self._retry(
+                "cierre de subida multipart",
+                lambda: self._request(client, "POST", object_path, {"uploadId": upload_id}, body)
+            )
+        except BaseException:
+            try:
+                await self._request(client, "DELETE", object_path, {"uploadId": upload_id})
+            except Exception:
+                pass
+            raise
+
+    @staticmethod
+    def _xml_text(content: bytes, tag: str) -> str:
+        """Obtener el texto de una etiqueta de una respuesta XML de S3"""
+        root = ET.fromstring(content)
+        for element in root.iter():
+            if element.tag.rsplit("}", 1)[-1] == tag:
+                return element.text or ""
+        raise RuntimeError(f"Respuesta S3 sin {tag}")
+
+
+def get_storage_target() -> Optional[StorageTarget]:
+    """
+    Construir el destino remoto configurado en BACKUP_REMOTE_TARGET
+
+    Returns:
+        Destino o None si no hay ninguno configurado
+    """
+    target = settings.BACKUP_REMOTE_TARGET.lower()
+
+    if target == "local":
+        return LocalDirectoryTarget(settings.BACKUP_REMOTE_LOCAL_PATH)
+    if target == "sftp":
+        return SFTPTarget()
+    if target == "s3":
+        return S3Target()
+    return None
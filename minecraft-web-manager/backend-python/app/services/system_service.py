@@ -7,6 +7,10 @@ from typing import Dict, Any
 class SystemService:
     """Servicio para información del sistema"""
     
+    def __init__(self):
+        # Lectura de referencia: después cpu_percent(None) no bloquea
+        psutil.cpu_percent(interval=None)
+    
     async def get_system_info(self) -> Dict[str, Any]:
         """
         Obtener información del sistema
@@ -20,8 +24,8 @@ class SystemService:
         # Disco
         disk = psutil.disk_usage("/")
         
-        # CPU
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # CPU (uso desde la consulta anterior; interval=1 bloqueaba el event loop)
+        cpu_percent = psutil.cpu_percent(interval=None)
         
         return {
             "memory": {
@@ -2,6 +2,7 @@
 import asyncio
 from pathlib import Path
 from app.core.config import settings
+from app.core.metrics import socketio_emits
 from app.services.server_service import server_service
 
 
@@ -14,6 +15,11 @@ class WebSocketService:
         self.log_tasks = {}
         self.status_task = None
     
+    async def _emit(self, event, data, **kwargs):
+        """Emitir un evento contándolo en las métricas"""
+        socketio_emits.inc(event)
+        await self.sio.emit(event, data, **kwargs)
+    
     async def start_log_stream(self, sid):
         """Iniciar stream de logs para un cliente"""
         if sid in self.log_tasks:
@@ -25,7 +31,7 @@ class WebSocketService:
             try:
                 # Verificar que el archivo existe
                 if not log_file.exists():
-                    await self.sio.emit('log-error', {
+                    await self._emit('log-error', {
                         'error': f'Archivo de logs no encontrado: {log_file}'
                     }, room=sid)
                     return
@@ -38,15 +44,15 @@ class WebSocketService:
                 )
                 
                 # Enviar confirmación de conexión
-                await self.sio.emit('log-connected', {'message': 'Conectado a logs'}, room=sid)
+                await self._emit('log-connected', {'message': 'Conectado a logs'}, room=sid)
                 
                 async for line in process.stdout:
                     log_line = line.decode().strip()
-                    await self.sio.emit('log', {'line': log_line}, room=sid)
+                    await self._emit('log', {'line': log_line}, room=sid)
                 
             except Exception as e:
                 print(f"Error en stream de logs: {e}")
-                await self.sio.emit('log-error', {'error': str(e)}, room=sid)
+                await self._emit('log-error', {'error': str(e)}, room=sid)
         
         task = asyncio.create_task(stream_logs())
         self.log_tasks[sid] = task
@@ -66,7 +72,7 @@ class WebSocketService:
             while True:
                 try:
                     status = await server_service.get_status()
-                    await self.sio.emit('server-status-update', status)
+                    await self._emit('server-status-update', status)
                     await asyncio.sleep(5)
                 except Exception as e:
                     print(f"Error en actualización de estado: {e}")
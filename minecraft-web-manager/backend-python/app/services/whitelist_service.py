@@ -1,9 +1,18 @@
 """Servicio para gestión de whitelist del servidor"""
-import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from app.core.config import settings
+from app.services.json_list_store import get_store
+from app.services.player_registry import (
+    NAME_PATTERN, UUID_PATTERN, dashed_uuid, normalize_uuid, player_registry
+)
+from app.services.player_service import player_service
 from app.services.rcon_service import rcon_service
+from app.services.server_service import server_service
+
+
+# Diferencias mayores se aplican con un solo "whitelist reload"
+SYNC_MAX_RCON_COMMANDS = 50
 
 
 class WhitelistService:
@@ -13,6 +22,7 @@ class WhitelistService:
         self.server_path = Path(settings.SERVER_PATH)
         self.whitelist_file = self.server_path / "whitelist.json"
         self.properties_file = self.server_path / "server.properties"
+        self.whitelist = get_store(self.whitelist_file)
     
     async def get_whitelist(self) -> List[Dict]:
         """
@@ -22,13 +32,7 @@ class WhitelistService:
             Lista de jugadores con uuid y name
         """
         try:
-            if not self.whitelist_file.exists():
-                return []
-            
-            with open(self.whitelist_file, 'r') as f:
-                whitelist = json.load(f)
-            
-            return whitelist
+            return self.whitelist.all()
         except Exception:
             return []
     
@@ -44,24 +48,19 @@ class WhitelistService:
             True si fue exitoso
         """
         try:
-            whitelist = await self.get_whitelist()
-            
-            # Verificar si ya está en la whitelist
-            if any(player.get('uuid') == uuid for player in whitelist):
-                return True
-            
-            # Agregar jugador
-            whitelist.append({
-                "uuid": uuid,
-                "name": username
-            })
-            
-            # Guardar archivo
-            with open(self.whitelist_file, 'w') as f:
-                json.dump(whitelist, f, indent=2)
-            
-            # Ejecutar comando RCON
-            await rcon_service.whitelist_add(username)
+            async with self.whitelist.lock:
+                # Verificar si ya está en la whitelist
+                if self.whitelist.contains(uuid):
+                    return True
+                
+                # Índice en memoria; el archivo se escribe en diferido
+                self.whitelist.put({
+                    "uuid": uuid,
+                    "name": username
+                })
+                
+                # Ejecutar comando RCON
+                await rcon_service.whitelist_add(username)
             
             return True
         except Exception:
@@ -78,22 +77,13 @@ class WhitelistService:
             True si fue exitoso
         """
         try:
-            whitelist = await self.get_whitelist()
-            
-            # Buscar jugador para obtener su nombre
-            player = next((p for p in whitelist if p.get('uuid') == uuid), None)
-            if not player:
-                return False
-            
-            # Remover jugador
-            whitelist = [p for p in whitelist if p.get('uuid') != uuid]
-            
-            # Guardar archivo
-            with open(self.whitelist_file, 'w') as f:
-                json.dump(whitelist, f, indent=2)
-            
-            # Ejecutar comando RCON
-            await rcon_service.whitelist_remove(player.get('name'))
+            async with self.whitelist.lock:
+                player = self.whitelist.remove(uuid)
+                if not player:
+                    return False
+                
+                # Ejecutar comando RCON
+                await rcon_service.whitelist_remove(player.get('name'))
             
             return True
         except Exception:
@@ -107,17 +97,117 @@ class WhitelistService:
             True si fue exitoso
         """
         try:
-            # Guardar whitelist vacía
-            with open(self.whitelist_file, 'w') as f:
-                json.dump([], f, indent=2)
-            
-            # Recargar whitelist en el servidor
-            await rcon_service.whitelist_reload()
+            async with self.whitelist.lock:
+                # Guardar whitelist vacía antes de que el servidor la relea
+                self.whitelist.clear()
+                await self.whitelist.flush()
+                
+                # Recargar whitelist en el servidor
+                await rcon_service.whitelist_reload()
             
             return True
         except Exception:
             return False
     
+    async def sync_whitelist(self, desired: List[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Dejar la whitelist igual a la lista deseada aplicando solo la diferencia
+        
+        Los nombres sin UUID se resuelven en lotes (historial local y Mojang).
+        El archivo se escribe una vez; el servidor en marcha recibe los
+        whitelist add/remove por una sola conexión RCON, o un único
+        "whitelist reload" si la diferencia es grande o hay renombrados.
+        
+        Args:
+            desired: Lista de {'uuid', 'name'} (basta con uno de los dos)
+            dry_run: Solo calcular la diferencia, sin aplicarla
+            
+        Returns:
+            Dict con added, removed, renamed, unchanged, invalid, unresolved y applied
+        """
+        result = {
+            "added": [],
+            "removed": [],
+            "renamed": [],
+            "unchanged": 0,
+            "invalid": [],
+            "unresolved": [],
+            "applied": None
+        }
+        
+        # Normalizar la lista deseada (clave = UUID sin guiones)
+        wanted: Dict[str, Dict] = {}
+        unresolved: List[str] = []
+        for raw in desired:
+            uuid = normalize_uuid((raw.get("uuid") or "").strip())
+            name = (raw.get("name") or "").strip()
+            if uuid and not UUID_PATTERN.match(uuid):
+                result["invalid"].append(raw.get("uuid"))
+            elif name and not NAME_PATTERN.match(name):
+                result["invalid"].append(name)
+            elif uuid:
+                if not name:
+                    known = await player_registry.get_by_uuid(uuid)
+                    name = (known or {}).get("name") or ""
+                wanted[uuid] = {"uuid": dashed_uuid(uuid), "name": name}
+            elif name:
+                unresolved.append(name)
+        
+        if unresolved:
+            resolved = await player_service.resolve_uuids(unresolved)
+            for name in unresolved:
+                data = resolved.get(name.lower())
+                if not data or not data.get("uuid"):
+                    result["unresolved"].append(name)
+                    continue
+                uuid = normalize_uuid(data["uuid"])
+                wanted[uuid] = {"uuid": dashed_uuid(uuid), "name": data.get("name") or name}
+        
+        async with self.whitelist.lock:
+            current = {self.whitelist.make_key(p["uuid"]): p for p in self.whitelist.all()}
+            
+            for key, entry in wanted.items():
+                existing = current.get(key)
+                if existing is None:
+                    result["added"].append(entry)
+                elif not entry["name"]:
+                    result["unchanged"] += 1
+                elif entry["name"] != existing.get("name"):
+                    result["renamed"].append({**existing, "name": entry["name"]})
+                else:
+                    result["unchanged"] += 1
+            result["removed"] = [entry for key, entry in current.items() if key not in wanted]
+            
+            changes = len(result["added"]) + len(result["removed"]) + len(result["renamed"])
+            if dry_run or not changes:
+                return result
+            
+            for entry in result["added"] + result["renamed"]:
+                self.whitelist.put(entry)
+            for entry in result["removed"]:
+                self.whitelist.remove(entry["uuid"])
+            await self.whitelist.flush()
+            result["applied"] = "file"
+            
+            if server_service.is_running():
+                commands = [f"whitelist remove {e['name']}" for e in result["removed"] if e.get("name")]
+                commands += [f"whitelist add {e['name']}" for e in result["added"] if e["name"]]
+                if (
+                    result["renamed"]
+                    or len(commands) > SYNC_MAX_RCON_COMMANDS
+                    or len(commands) < len(result["removed"]) + len(result["added"])
+                ):
+                    # Renombrados (no hay comando para ello), diferencia grande o
+                    # entradas sin nombre: que el servidor relea el archivo; si no,
+                    # volvería a escribir los nombres antiguos en el próximo cambio
+                    await rcon_service.whitelist_reload()
+                    result["applied"] = "reload"
+                elif commands:
+                    await rcon_service.execute_batch(commands)
+                    result["applied"] = "rcon"
+        
+        return result
+    
     async def is_whitelist_enabled(self) -> bool:
         """
         Verificar si la whitelist está activada en server.properties
@@ -239,8 +329,7 @@ class WhitelistService:
         Returns:
             True si está en la whitelist
         """
-        whitelist = await self.get_whitelist()
-        return any(player.get('uuid') == uuid for player in whitelist)
+        return self.whitelist.contains(uuid)
 
 
 # Instancia singleton
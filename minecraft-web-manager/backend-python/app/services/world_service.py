@@ -1,4 +1,5 @@
 """Servicio para gestión de mundos con symlinks"""
+import asyncio
 import json
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -6,6 +7,10 @@ from app.core.config import settings
 from app.services.bash_service import bash_service
 
 
+# `du` simultáneos como máximo: cada uno recorre un mundo entero en disco
+MAX_CONCURRENT_DU = 4
+
+
 class WorldService:
     """Servicio para gestión multi-mundo"""
     
@@ -13,6 +18,7 @@ class WorldService:
         self.server_path = Path(settings.SERVER_PATH)
         self.worlds_path = self.server_path / "worlds"
         self.active_symlink = self.worlds_path / "active"
+        self._du_slots = asyncio.Semaphore(MAX_CONCURRENT_DU)
     
     async def list_worlds(self) -> List[Dict[str, Any]]:
         """
@@ -21,18 +27,17 @@ class WorldService:
         Returns:
             Lista de mundos con metadata
         """
-        worlds = []
-        
         if not self.worlds_path.exists():
-            return worlds
+            return []
         
-        for world_dir in self.worlds_path.iterdir():
-            if world_dir.is_dir() and world_dir.name != "active":
-                world_info = await self.get_world_info(world_dir.name)
-                if world_info:
-                    worlds.append(world_info)
+        world_ids = [
+            world_dir.name for world_dir in self.worlds_path.iterdir()
+            if world_dir.is_dir() and world_dir.name != "active"
+        ]
         
-        return worlds
+        # Un `du` por mundo, como mucho MAX_CONCURRENT_DU a la vez
+        infos = await asyncio.gather(*(self.get_world_info(world_id) for world_id in world_ids))
+        return [info for info in infos if info]
     
     async def get_world_info(self, world_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -81,10 +86,11 @@ class WorldService:
     async def _get_world_size(self, world_dir: Path) -> int:
         """Obtener tamaño del mundo en MB"""
         try:
-            result = await bash_service.exec_command(
-                f"du -sb {world_dir}",
-                cwd=self.server_path
-            )
+            async with self._du_slots:
+                result = await bash_service.exec_command(
+                    f"du -sb {world_dir}",
+                    cwd=self.server_path
+                )
             if result["success"]:
                 size_bytes = int(result["stdout"].split()[0])
                 return size_bytes // (1024 * 1024)
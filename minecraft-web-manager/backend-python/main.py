@@ -2,20 +2,31 @@
 import socketio
 from fastapi import FastAPI, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 from typing import Optional
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.deps import get_current_user_optional
+from app.core.metrics import MetricsMiddleware, socketio_clients
+from app.core.static_assets import AssetFiles
 from app.models.user import User
-from app.api.routes import auth, server, worlds, plugins, backups, config, system, users, console, admins, resourcepacks, mmorpg
+from app.api.routes import audit, auth, dashboard, metrics, server, worlds, plugins, backups, config, system, users, console, admins, resourcepacks, mmorpg
 from app.services.websocket_service import WebSocketService
 from app.services.recommended_plugins_service import recommended_plugins_service
 from app.services.mmorpg_service import mmorpg_service
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, close_db, init_db
+from app.services.backup_scheduler import backup_scheduler
+from app.services.backup_service import backup_service
+from app.services.backup_verifier import backup_verifier
+from app.services.mojang_service import mojang_service
+from app.services.player_tracker import player_tracker
+from app.services.audit_service import audit_service, audit_writer
+from app.services.ban_service import ban_service
+from app.services.session_service import session_service
+from app.services.json_list_store import flush_all
 from app.models.app_settings import AppSettings
 
 # Crear aplicación FastAPI
@@ -34,13 +45,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Montar archivos estáticos
+# Compresión gzip/Brotli de JSON, HTML y texto
+if settings.RESPONSE_COMPRESSION_MIN_BYTES > 0:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES)
+
+# Latencia por ruta para /metrics (el último añadido es el más externo: mide también la compresión)
+if settings.metrics_active:
+    app.add_middleware(MetricsMiddleware)
+
+# Montar archivos estáticos (URLs versionadas y variantes comprimidas)
 static_path = Path(__file__).parent / "static"
-app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+static_files = AssetFiles(directory=str(static_path))
+app.mount("/static", static_files, name="static")
 
 # Templates Jinja2
 templates_path = Path(__file__).parent / "templates"
 templates = Jinja2Templates(directory=str(templates_path))
+templates.env.globals["static_url"] = static_files.asset_url
 
 # Registrar routers de API
 app.include_router(auth.router)
@@ -50,6 +71,9 @@ app.include_router(plugins.router)
 app.include_router(backups.router)
 app.include_router(config.router)
 app.include_router(system.router)
+app.include_router(audit.router)
+app.include_router(dashboard.router)
+app.include_router(metrics.router)
 app.include_router(users.router, prefix="/api")
 app.include_router(console.router, prefix="/api")
 app.include_router(admins.router, prefix="/api")
@@ -74,6 +98,7 @@ async def connect(sid, environ, auth=None):
     """Cliente conectado"""
     print(f"✅ Cliente WebSocket conectado: {sid}")
     print(f"   Environ keys: {list(environ.keys())[:5]}")
+    socketio_clients.inc()
     # Siempre aceptar conexión
     return True
 
@@ -82,6 +107,7 @@ async def connect(sid, environ, auth=None):
 async def disconnect(sid):
     """Cliente desconectado"""
     print(f"Cliente desconectado: {sid}")
+    socketio_clients.dec()
     ws_service.cleanup_client(sid)
 
 
@@ -102,7 +128,38 @@ async def stop_logs(sid, data=None):
 async def startup_event():
     """Evento de inicio"""
     print("Iniciando servidor...")
+    if settings.METRICS_ENABLED and not settings.METRICS_TOKEN:
+        print("⚠️  METRICS_ENABLED sin METRICS_TOKEN: /metrics no se servirá")
+    init_db()
+    await static_files.warm()
+    await audit_writer.start()
+    await audit_service.start_retention()
+    await session_service.start_purge()
     await ws_service.start_status_updates()
+    if settings.BACKUP_SCHEDULER_ENABLED:
+        await backup_scheduler.start()
+    await backup_service.start_catalog_watcher()
+    await backup_service.start_retention()
+    await backup_verifier.start()
+    await player_tracker.start()
+    await ban_service.start_sweeper()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Evento de cierre"""
+    await player_tracker.stop()
+    await ban_service.stop_sweeper()
+    await backup_verifier.stop()
+    await backup_scheduler.stop()
+    await backup_service.stop_retention()
+    await backup_service.stop_catalog_watcher()
+    await mojang_service.close()
+    await audit_service.stop_retention()
+    await session_service.stop_purge()
+    await flush_all()
+    await audit_writer.stop()
+    await close_db()
 
 
 # Rutas de templates HTML
@@ -0,0 +1,36 @@
+"""Configuración común de los tests: entorno aislado en un directorio temporal"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Settings se instancia al importar app.core.config: el entorno debe estar
+# listo antes de que cualquier test importe la aplicación
+_root = Path(tempfile.mkdtemp(prefix="mc-manager-tests-"))
+(_root / "server").mkdir()
+(_root / "backups").mkdir()
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ["SERVER_PATH"] = str(_root / "server")
+os.environ["BACKUP_PATH"] = str(_root / "backups")
+os.environ["DATABASE_URL"] = f"sqlite:///{_root / 'test.db'}"
+os.environ["METRICS_TOKEN"] = ""
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+
+@pytest.fixture
+def database():
+    """Base de datos de pruebas con el esquema al día y las tablas vacías"""
+    from app.db.base import Base
+    from app.db.migrations import init_db
+    from app.db.session import engine
+
+    init_db()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    return engine
@@ -0,0 +1,182 @@
+"""Tests de la escritura por lotes y la consulta de la auditoría"""
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.session import SessionLocal, async_engine
+from app.models.audit_log import AuditLog
+from app.models.user import User
+from app.services import audit_service as audit_module
+from app.services.audit_service import MAX_BATCH_ATTEMPTS, AuditWriter, audit_service
+
+
+def run(coro):
+    """Ejecutar en un loop nuevo sin dejar conexiones asíncronas atadas a él"""
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(wrapper())
+
+
+def stored_actions():
+    db = SessionLocal()
+    try:
+        return [row.action for row in db.query(AuditLog).order_by(AuditLog.id)]
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def writer(database, tmp_path):
+    writer = AuditWriter()
+    writer.batch_size = 3
+    writer.quarantine_path = tmp_path / "audit-archive"
+    return writer
+
+
+def test_flush_inserts_in_batches_and_in_order(writer):
+    for i in range(7):
+        writer.record(f"action-{i}", details={"n": i})
+    run(writer.flush())
+
+    assert stored_actions() == [f"action-{i}" for i in range(7)]
+    assert writer.get_stats()["batches"] == 3
+    assert writer.get_stats()["written"] == 7
+    assert writer.get_stats()["queued"] == 0
+
+
+def test_full_queue_drops_new_events(writer):
+    writer.max_queue = 2
+    assert writer.record("a") and writer.record("b")
+    assert not writer.record("c")
+    assert writer.get_stats()["dropped"] == 1
+
+
+def test_poison_row_is_set_aside_after_the_retry_cap(writer):
+    writer.record("before")
+    writer.record(None)  # action es NOT NULL: el lote entero falla
+    writer.record("after")
+    writer.record("next-batch")
+
+    for _ in range(MAX_BATCH_ATTEMPTS - 1):
+        with pytest.raises(Exception):
+            run(writer.flush())
+        assert stored_actions() == []
+        assert writer.get_stats()["queued"] == 4
+
+    run(writer.flush())
+
+    assert stored_actions() == ["before", "after", "next-batch"]
+    stats = writer.get_stats()
+    assert stats["rejected"] == 1
+    assert stats["written"] == 3
+    assert stats["queued"] == 0
+
+    [quarantine] = writer.quarantine_path.glob("audit-rejected-*.ndjson")
+    [line] = quarantine.read_text(encoding="utf-8").splitlines()
+    assert json.loads(line)["action"] is None
+
+
+def test_stop_drains_the_queue(writer):
+    writer.interval = 60
+
+    async def scenario():
+        await writer.start()
+        for i in range(5):
+            writer.record(f"action-{i}")
+        writer.record(None)
+        await writer.stop()
+
+    run(scenario())
+
+    assert stored_actions() == [f"action-{i}" for i in range(5)]
+    assert writer.get_stats()["queued"] == 0
+    assert writer.get_stats()["rejected"] == 1
+
+
+def test_stop_drains_when_the_writer_never_started(writer):
+    writer.record("queued-before-start")
+    run(writer.stop())
+    assert stored_actions() == ["queued-before-start"]
+
+
+def add_logs(count, action="event", created_at=None):
+    db = SessionLocal()
+    try:
+        rows = [AuditLog(action=action, resource_id=str(i), created_at=created_at) for i in range(count)]
+        db.add_all(rows)
+        db.commit()
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def all_pages(limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page = run(audit_service.query(limit=limit, cursor=cursor, **filters))
+        pages.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_row_once_newest_first(database):
+    ids = add_logs(7)
+    add_logs(2, action="other")
+
+    pages = all_pages(3, action="event")
+    assert pages == [ids[6:3:-1], ids[3:0:-1], ids[:1]]
+
+    # Una página exacta no deja una última página vacía
+    assert all_pages(7, action="event") == [ids[::-1]]
+
+
+def test_new_events_do_not_shift_later_pages(database):
+    ids = add_logs(6)
+    first = run(audit_service.query(limit=3))
+    add_logs(4)
+    second = run(audit_service.query(limit=3, cursor=first["next_cursor"]))
+
+    assert [item["id"] for item in first["items"]] == ids[:2:-1]
+    assert [item["id"] for item in second["items"]] == ids[2::-1]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", ["abc", "-1", "0", "1.5", "²", str(2 ** 63)])
+def test_malformed_cursor_is_a_bad_request(database, cursor):
+    from fastapi.testclient import TestClient
+    from app.core.deps import require_admin
+    from main import app
+
+    app.dependency_overrides[require_admin] = lambda: User(id=1, username="admin", role="admin")
+    try:
+        response = TestClient(app).get("/api/audit/", params={"cursor": cursor})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 400
+
+
+def test_archive_moves_old_rows_to_files_then_deletes_them(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_module, "ARCHIVE_CHUNK_ROWS", 2)
+    monkeypatch.setattr(audit_service, "archive_path", tmp_path / "archive")
+    old = add_logs(3, action="old", created_at=datetime.utcnow() - timedelta(days=400))
+    recent = add_logs(2, action="recent")
+
+    result = run(audit_service.archive_old(30))
+
+    assert result["success"] and result["archived"] == 3
+    assert len(result["files"]) == 2
+    archived = []
+    for name in sorted(result["files"]):
+        with gzip.open(tmp_path / "archive" / name, "rt", encoding="utf-8") as f:
+            archived += [json.loads(line)["id"] for line in f]
+    assert sorted(archived) == old
+    assert stored_actions() == ["recent", "recent"]
+    assert run(audit_service.archive_old(30))["archived"] == 0
+    assert [item["id"] for item in run(audit_service.query())["items"]] == recent[::-1]
@@ -0,0 +1,129 @@
+"""Tests de emisión de tokens y login"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token, decode_token, get_password_hash
+from app.db.session import SessionLocal
+from app.models.session import Session as UserSession
+from app.models.user import User
+
+
+@pytest.fixture
+def same_second(monkeypatch):
+    """Todas las llamadas a utcnow caen en el mismo segundo"""
+    frozen = datetime.utcnow().replace(microsecond=0)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return frozen
+
+    monkeypatch.setattr(security, "datetime", FrozenDatetime)
+
+
+def client_from(ip: str) -> TestClient:
+    """TestClient cuyas peticiones llegan desde una IP (Starlette no fija scope["client"])"""
+    from main import app
+
+    async def with_client(scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            scope = {**scope, "client": (ip, 50000)}
+        await app(scope, receive, send)
+
+    return TestClient(with_client)
+
+
+def test_tokens_issued_in_the_same_second_differ(same_second):
+    data = {"user_id": 1, "username": "admin", "role": "admin"}
+
+    first, second = create_refresh_token(data), create_refresh_token(data)
+    assert first != second
+    assert decode_token(first)["jti"] != decode_token(second)["jti"]
+    assert create_access_token(data) != create_access_token(data)
+
+
+def test_two_logins_in_the_same_second(database, same_second, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    db = SessionLocal()
+    db.add(User(username="admin", password_hash=get_password_hash("secret"), role="admin"))
+    db.commit()
+    db.close()
+
+    client = client_from("203.0.113.1")
+    credentials = {"username": "admin", "password": "secret"}
+    assert client.post("/api/auth/login", json=credentials).status_code == 200
+    assert client.post("/api/auth/login", json=credentials).status_code == 200
+
+    db = SessionLocal()
+    assert db.query(UserSession).count() == 2
+    db.close()
+
+
+def test_failed_logins_from_another_ip_do_not_lock_out_the_user(database, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    db = SessionLocal()
+    db.add(User(username="owner", password_hash=get_password_hash("secret"), role="admin"))
+    db.commit()
+    db.close()
+
+    attacker, owner = client_from("198.51.100.9"), client_from("203.0.113.1")
+    for _ in range(settings.LOGIN_RATE_LIMIT_PER_USER):
+        assert attacker.post("/api/auth/login", json={"username": "owner", "password": "x"}).status_code == 401
+
+    assert attacker.post("/api/auth/login", json={"username": "owner", "password": "secret"}).status_code == 429
+    assert owner.post("/api/auth/login", json={"username": "owner", "password": "secret"}).status_code == 200
+
+
+def test_refresh_issues_a_new_access_token_for_the_session(database, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    db = SessionLocal()
+    db.add(User(username="mod", password_hash=get_password_hash("secret"), role="moderator"))
+    db.commit()
+    db.close()
+
+    client = client_from("203.0.113.3")
+    assert client.post("/api/auth/login", json={"username": "mod", "password": "secret"}).status_code == 200
+    first_access = client.cookies["access_token"]
+
+    db = SessionLocal()
+    db.query(User).filter(User.username == "mod").update({"role": "viewer"})
+    db.commit()
+    db.close()
+
+    response = client.post("/api/auth/refresh")
+    assert response.status_code == 200
+    assert response.json()["user"]["role"] == "viewer"
+    access = client.cookies["access_token"]
+    assert access != first_access
+    assert decode_token(access)["role"] == "viewer"
+    assert client.get("/api/auth/me").json()["role"] == "viewer"
+
+    db = SessionLocal()
+    [session] = db.query(UserSession).all()
+    assert session.token_hash == security.token_fingerprint(access)
+    db.close()
+
+    # Un access token no sirve como refresh token
+    client.cookies.set("refresh_token", access)
+    assert client.post("/api/auth/refresh").status_code == 401
+
+
+def test_refresh_fails_after_logout(database, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    db = SessionLocal()
+    db.add(User(username="admin", password_hash=get_password_hash("secret"), role="admin"))
+    db.commit()
+    db.close()
+
+    client = client_from("203.0.113.4")
+    client.post("/api/auth/login", json={"username": "admin", "password": "secret"})
+    refresh_token = client.cookies["refresh_token"]
+    assert client.post("/api/auth/logout").status_code == 200
+
+    client.cookies.set("refresh_token", refresh_token)
+    assert client.post("/api/auth/refresh").status_code == 401
+    assert client_from("203.0.113.4").post("/api/auth/refresh").status_code == 401
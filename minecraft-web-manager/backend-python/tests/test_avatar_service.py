@@ -0,0 +1,182 @@
+"""Tests del códec PNG y de la caché de avatares"""
+import asyncio
+import base64
+import json
+import struct
+import zlib
+
+import pytest
+
+from app.services import avatar_service as avatar_module
+from app.services.avatar_service import (
+    AVATAR_RETRY_SECONDS, AVATAR_SIZES, DEFAULT_FACE, PNG_SIGNATURE,
+    AvatarService, decode_png, encode_png, render_head, scale,
+)
+
+STEVE = "8667ba71b85a4004af54457a9734eed7"
+
+
+def chunk(chunk_type, body):
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+
+def paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+
+
+def filtered(rows, channels):
+    """Filas con los cinco filtros PNG (uno por fila, en rotación)"""
+    out = b""
+    previous = bytes(len(rows[0]))
+    for y, line in enumerate(rows):
+        kind = y % 5
+        encoded = bytearray()
+        for x, value in enumerate(line):
+            left = line[x - channels] if x >= channels else 0
+            up = previous[x]
+            up_left = previous[x - channels] if x >= channels else 0
+            predictor = [0, left, up, (left + up) >> 1, paeth(left, up, up_left)][kind]
+            encoded.append((value - predictor) & 0xFF)
+        out += bytes([kind]) + bytes(encoded)
+        previous = line
+    return out
+
+
+def png(width, height, color_type, rows, channels, extra=b"", interlace=0):
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, interlace)
+    return (
+        PNG_SIGNATURE + chunk(b"IHDR", header) + extra
+        + chunk(b"IDAT", zlib.compress(filtered(rows, channels)))
+        + chunk(b"IEND", b"")
+    )
+
+
+def gradient(width=8, height=10):
+    return [
+        [((x * 31) % 256, (y * 17) % 256, (x * y * 7) % 256, (255 - x * 9) % 256) for x in range(width)]
+        for y in range(height)
+    ]
+
+
+def test_encode_decode_round_trip():
+    pixels = gradient()
+    assert decode_png(encode_png(pixels)) == pixels
+
+
+def test_decodes_every_filter_type_in_rgba_and_rgb():
+    pixels = gradient()
+    rgba_rows = [bytes(v for pixel in row for v in pixel) for row in pixels]
+    assert decode_png(png(8, 10, 6, rgba_rows, 4)) == pixels
+
+    rgb_rows = [bytes(v for pixel in row for v in pixel[:3]) for row in pixels]
+    assert decode_png(png(8, 10, 2, rgb_rows, 3)) == [[p[:3] + (255,) for p in row] for row in pixels]
+
+
+def test_decodes_palette_with_transparency():
+    palette = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+    plte = chunk(b"PLTE", bytes(v for color in palette for v in color))
+    trns = chunk(b"tRNS", bytes([0, 128]))  # el tercer color queda opaco
+    rows = [bytes([0, 1, 2, 1]), bytes([2, 2, 0, 0])]
+
+    assert decode_png(png(4, 2, 3, rows, 1, extra=plte + trns)) == [
+        [(255, 0, 0, 0), (0, 255, 0, 128), (0, 0, 255, 255), (0, 255, 0, 128)],
+        [(0, 0, 255, 255), (0, 0, 255, 255), (255, 0, 0, 0), (255, 0, 0, 0)],
+    ]
+
+
+def test_rejects_interlaced_and_non_png_input():
+    rows = [bytes(4 * 4)] * 4
+    with pytest.raises(ValueError, match="no soportado"):
+        decode_png(png(4, 4, 6, rows, 4, interlace=1))
+    with pytest.raises(ValueError, match="No es un PNG"):
+        decode_png(b"GIF89a" + bytes(20))
+
+
+@pytest.mark.parametrize("cut", [20, 40, -20])
+def test_truncated_png_raises_a_decoding_error(cut):
+    data = encode_png(gradient(64, 32))
+    with pytest.raises((ValueError, zlib.error, struct.error, IndexError)):
+        decode_png(data[:cut])
+
+
+def test_scale_and_render_head():
+    face = render_head(None)
+    assert face == [list(row) for row in DEFAULT_FACE]
+
+    big = scale(face, 32)
+    assert len(big) == len(big[0]) == 32
+    assert big[17][9] == face[4][2]
+
+    skin = [[(10, 20, 30, 255)] * 64 for _ in range(64)]
+    skin[8][40] = (250, 250, 250, 255)  # sombrero opaco sobre (8, 8)
+    head = render_head(skin)
+    assert head[0][0] == (250, 250, 250, 255)
+    assert head[0][1] == (10, 20, 30, 255)
+
+
+def textures(url):
+    value = base64.b64encode(json.dumps({"textures": {"SKIN": {"url": url}}}).encode()).decode()
+    return {"id": STEVE, "properties": [{"name": "textures", "value": value}]}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = AvatarService()
+    service.cache_dir = tmp_path
+    profile = {"value": None}
+    skin = {"png": None}
+
+    async def get_profile(uuid):
+        return profile["value"]
+
+    async def download(url):
+        return skin["png"]
+
+    monkeypatch.setattr(avatar_module.mojang_service, "get_profile", get_profile)
+    monkeypatch.setattr(avatar_module.mojang_service, "download", download)
+    service.profile, service.skin = profile, skin
+    return service
+
+
+def test_mojang_failure_serves_the_default_face_without_caching_it(service):
+    content, etag, max_age = asyncio.run(service.get_avatar(STEVE, 32))
+
+    assert decode_png(content) == scale(render_head(None), 32)
+    assert max_age == AVATAR_RETRY_SECONDS
+    assert etag.startswith('"default-32-')
+    assert not service._path(STEVE, 32).exists()
+
+    # Mojang vuelve: la skin real se renderiza en la siguiente petición
+    skin = [[(10, 20, 30, 255)] * 64 for _ in range(64)]
+    service.profile["value"] = textures("http://textures.minecraft.net/skin")
+    service.skin["png"] = encode_png(skin)
+    content, etag, max_age = asyncio.run(service.get_avatar(STEVE, 16))
+
+    assert decode_png(content)[0][0] == (10, 20, 30, 255)
+    assert max_age == service.ttl_seconds
+    assert all(service._path(STEVE, size).exists() for size in AVATAR_SIZES)
+
+
+@pytest.mark.parametrize("value", ["%%%not-base64", base64.b64encode(b"{not json").decode(), None])
+def test_malformed_textures_mean_no_skin(service, value):
+    service.profile["value"] = {"id": STEVE, "properties": [{"name": "textures", "value": value}]}
+    ok, skin_png = asyncio.run(service._fetch_skin(STEVE))
+    assert (ok, skin_png) == (True, None)
+
+    content, _, max_age = asyncio.run(service.get_avatar(STEVE, 16))
+    assert decode_png(content) == scale(render_head(None), 16)
+    assert max_age == service.ttl_seconds
+
+
+def test_failed_refresh_keeps_the_previous_copy(service):
+    service.profile["value"] = textures("http://textures.minecraft.net/skin")
+    service.skin["png"] = encode_png([[(1, 2, 3, 255)] * 64 for _ in range(64)])
+    first, _, _ = asyncio.run(service.get_avatar(STEVE, 64))
+
+    service.profile["value"] = None
+    service.ttl_seconds = 0
+    again, _, max_age = asyncio.run(service.get_avatar(STEVE, 64))
+    assert again == first
+    assert max_age == 0
@@ -0,0 +1,97 @@
+"""Tests del catálogo de backups (backup_history)"""
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.db.session import SessionLocal
+from app.models.backup_history import BackupHistory
+from app.services.backup_service import backup_service, to_utc
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    """Zona horaria local distinta de UTC (UTC-5 en marzo antes del cambio)"""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def scanned(filename, local_time, size=10):
+    return {
+        "filename": filename,
+        "path": f"/backups/{filename}",
+        "type": backup_service._type_from_filename(filename),
+        "size_bytes": size,
+        "created_at": local_time,
+    }
+
+
+def rows():
+    db = SessionLocal()
+    try:
+        return {row.filename: row for row in db.query(BackupHistory).all()}
+    finally:
+        db.close()
+
+
+def test_reconcile_stores_filename_dates_in_utc(database, new_york):
+    backup_service.reconcile_history([scanned("world-20260301-030000.tar.gz", datetime(2026, 3, 1, 3, 0))])
+    assert rows()["world-20260301-030000.tar.gz"].created_at == datetime(2026, 3, 1, 8, 0)
+
+
+def test_reconcile_fixes_rows_stored_in_local_time(database, new_york):
+    db = SessionLocal()
+    db.add(BackupHistory(filename="world-20260301-030000.tar.gz", type="world", path="/backups/x",
+                         status="completed", size_bytes=10, created_at=datetime(2026, 3, 1, 3, 0)))
+    db.commit()
+    db.close()
+
+    backup_service.reconcile_history([scanned("world-20260301-030000.tar.gz", datetime(2026, 3, 1, 3, 0))])
+    assert rows()["world-20260301-030000.tar.gz"].created_at == datetime(2026, 3, 1, 8, 0)
+
+
+def test_listing_sorts_and_filters_both_sources_in_utc(database, new_york):
+    # Fila del programador: CURRENT_TIMESTAMP (UTC) de SQLite
+    db = SessionLocal()
+    db.add(BackupHistory(filename="world-20260301-040000.tar.gz", type="world", path="/b/sched",
+                         status="completed", created_at=to_utc(datetime(2026, 3, 1, 4, 0))))
+    db.commit()
+    db.close()
+    # Fila del watcher: fecha local del nombre
+    backup_service.reconcile_history([
+        scanned("world-20260301-040000.tar.gz", datetime(2026, 3, 1, 4, 0)),
+        scanned("world-20260301-030000.tar.gz", datetime(2026, 3, 1, 3, 0)),
+    ])
+
+    result = asyncio.run(backup_service.list_backups(date_from=datetime(2026, 3, 1, 3, 30)))
+    assert [b["filename"] for b in result["backups"]] == ["world-20260301-040000.tar.gz"]
+    assert result["backups"][0]["created_at"] == "2026-03-01T09:00:00+00:00"
+
+    result = asyncio.run(backup_service.list_backups())
+    assert [b["filename"] for b in result["backups"]] == [
+        "world-20260301-040000.tar.gz", "world-20260301-030000.tar.gz"
+    ]
+
+
+def test_full_history_keeps_failed_rows_and_metadata(database):
+    db = SessionLocal()
+    db.add_all([
+        BackupHistory(filename="", type="full", path="", status="failed", error_message="disk full", created_by=None),
+        BackupHistory(filename="backup-20260301-030000.tar.gz", type="full", path="/b/a",
+                      status="completed", description="antes de actualizar"),
+    ])
+    db.commit()
+    db.close()
+
+    catalog = asyncio.run(backup_service.list_backups())
+    assert [b["status"] for b in catalog["backups"]] == ["completed"]
+
+    history = asyncio.run(backup_service.list_backups(statuses=None))
+    assert sorted(b["status"] for b in history["backups"]) == ["completed", "failed"]
+    described = next(b for b in history["backups"] if b["status"] == "completed")
+    assert described["description"] == "antes de actualizar"
+    assert "created_by" in described
@@ -0,0 +1,153 @@
+"""Tests del planificador de retención abuelo-padre-hijo (GFS)"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.services.backup_service import BackupService, backup_service
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    def set_policy(last=1, daily=0, weekly=0, monthly=0, budget=None):
+        monkeypatch.setattr(settings, "BACKUP_RETENTION_LAST", last)
+        monkeypatch.setattr(settings, "BACKUP_RETENTION_DAILY", daily)
+        monkeypatch.setattr(settings, "BACKUP_RETENTION_WEEKLY", weekly)
+        monkeypatch.setattr(settings, "BACKUP_RETENTION_MONTHLY", monthly)
+        monkeypatch.setattr(settings, "BACKUP_SIZE_BUDGET_MB", budget or {})
+    return set_policy
+
+
+def archive(filename, created_at, size_mb=1):
+    return {
+        "filename": filename,
+        "path": f"/backups/{filename}",
+        "type": BackupService._type_from_filename(filename),
+        "size_bytes": size_mb * 1024 * 1024,
+        "created_at": created_at,
+    }
+
+
+def nightly(prefix, start, days, hour=3):
+    return [
+        archive(f"{prefix}{(start - timedelta(days=n)).strftime('%Y%m%d')}-0{hour}0000.tar.gz",
+                (start - timedelta(days=n)).replace(hour=hour))
+        for n in range(days)
+    ]
+
+
+def kept_names(plan):
+    return sorted(a["filename"] for a in plan["keep"])
+
+
+def test_keeps_last_n(policy):
+    policy(last=3)
+    archives = nightly("world-", datetime(2026, 3, 10), 10)
+    plan = backup_service.plan_retention(archives)
+    assert kept_names(plan) == sorted(a["filename"] for a in archives[:3])
+    assert len(plan["prune"]) == 7
+
+
+def test_daily_tier_keeps_newest_of_each_day(policy):
+    policy(last=1, daily=2)
+    day = datetime(2026, 3, 10)
+    archives = [
+        archive("world-20260310-230000.tar.gz", day.replace(hour=23)),
+        archive("world-20260310-010000.tar.gz", day.replace(hour=1)),
+        archive("world-20260309-230000.tar.gz", day.replace(day=9, hour=23)),
+        archive("world-20260309-010000.tar.gz", day.replace(day=9, hour=1)),
+        archive("world-20260308-230000.tar.gz", day.replace(day=8, hour=23)),
+    ]
+    plan = backup_service.plan_retention(archives)
+    assert kept_names(plan) == ["world-20260309-230000.tar.gz", "world-20260310-230000.tar.gz"]
+
+
+def test_weekly_and_monthly_tiers(policy):
+    policy(last=1, weekly=3, monthly=3)
+    archives = nightly("backup-", datetime(2026, 3, 31), 90)
+    plan = backup_service.plan_retention(archives)
+    kept = {a["created_at"].date() for a in plan["keep"]}
+    # Semanal: el más reciente de cada semana ISO (domingos, salvo la semana en curso)
+    assert {datetime(2026, 3, 29).date(), datetime(2026, 3, 22).date()} <= kept
+    # Mensual: el último día de marzo, febrero y enero
+    assert {datetime(2026, 3, 31).date(), datetime(2026, 2, 28).date(), datetime(2026, 1, 31).date()} <= kept
+    assert len(kept) == 5
+
+
+def test_types_are_planned_independently(policy):
+    policy(last=2)
+    day = datetime(2026, 3, 10)
+    archives = nightly("world-", day, 4) + nightly("plugins-", day, 4)
+    plan = backup_service.plan_retention(archives)
+    assert len(plan["keep"]) == 4
+    assert sorted({a["type"] for a in plan["keep"]}) == ["plugins", "world"]
+
+
+def test_pre_restore_snapshots_do_not_displace_full_backups(policy):
+    policy(last=1, daily=3)
+    day = datetime(2026, 3, 10)
+    fulls = nightly("backup-", day, 3, hour=3)
+    snapshots = [
+        archive(f"pre-restore-202603{10 - n:02d}-120000.tar.gz", (day - timedelta(days=n)).replace(hour=12))
+        for n in range(3)
+    ]
+    plan = backup_service.plan_retention(fulls + snapshots)
+    kept = kept_names(plan)
+    assert all(a["filename"] in kept for a in fulls)
+    # Las pre-restore solo conservan los últimos N, sin niveles diarios
+    assert [name for name in kept if name.startswith("pre-restore-")] == ["pre-restore-20260310-120000.tar.gz"]
+    assert snapshots[0]["type"] == "pre-restore"
+
+
+def test_size_budget_always_keeps_newest(policy):
+    policy(last=5, budget={"world": 2})
+    archives = [
+        archive(f"world-2026031{n}-030000.tar.gz", datetime(2026, 3, 10 + n, 3), size_mb=3 - n % 2)
+        for n in range(5)
+    ]
+    plan = backup_service.plan_retention(archives)
+    kept = kept_names(plan)
+    newest = max(archives, key=lambda a: a["created_at"])
+    assert newest["filename"] in kept
+    assert sum(a["size_bytes"] for a in plan["keep"]) <= max(2 * 1024 * 1024, newest["size_bytes"])
+
+
+def test_unknown_files_are_never_pruned(policy):
+    policy(last=1)
+    archives = [archive("manual-copy.tar.gz", datetime(2020, 1, 1))] + nightly("world-", datetime(2026, 3, 10), 3)
+    plan = backup_service.plan_retention(archives)
+    assert "manual-copy.tar.gz" in kept_names(plan)
+
+
+def test_retention_is_opt_in():
+    assert type(settings).model_fields["BACKUP_RETENTION_ENABLED"].default is False
+
+
+def test_reconcile_marks_missing_files_pruned_and_keeps_history(database):
+    from app.db.session import SessionLocal
+    from app.models.backup_history import BackupHistory
+
+    db = SessionLocal()
+    db.add_all([
+        BackupHistory(filename="world-20260301-030000.tar.gz", type="world", path="/b/old",
+                      status="verified", duration_seconds=12.5, size_bytes=100),
+        BackupHistory(filename="world-20260310-030000.tar.gz", type="world", path="/b/new",
+                      status="completed", size_bytes=200),
+        BackupHistory(filename="world-20260310-030000.tar.gz", type="world", path="/b/new",
+                      status="completed", size_bytes=200, duration_seconds=8.0),
+    ])
+    db.commit()
+    db.close()
+
+    backup_service.reconcile_history([
+        archive("world-20260310-030000.tar.gz", datetime(2026, 3, 10, 3)) | {"size_bytes": 200, "path": "/b/new"}
+    ])
+
+    db = SessionLocal()
+    rows = {(row.filename, row.status): row for row in db.query(BackupHistory).all()}
+    db.close()
+    assert len(rows) == 2
+    old = rows[("world-20260301-030000.tar.gz", "pruned")]
+    assert old.duration_seconds == 12.5 and old.size_bytes == 100
+    # El duplicado se fusiona en la primera fila sin perder la duración
+    assert rows[("world-20260310-030000.tar.gz", "completed")].duration_seconds == 8.0
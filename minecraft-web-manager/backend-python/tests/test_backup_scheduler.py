@@ -0,0 +1,86 @@
+"""Tests de la ejecución de backups programados"""
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.db.session import SessionLocal
+from app.models.backup_history import BackupHistory
+from app.models.scheduled_backup import ScheduledBackup
+from app.services import backup_scheduler as scheduler_module
+from app.services.backup_scheduler import BackupScheduler
+
+
+def add_schedule() -> int:
+    db = SessionLocal()
+    try:
+        schedule = ScheduledBackup(name="Diario", type="world", cron_expression="@daily", enabled=True)
+        db.add(schedule)
+        db.commit()
+        return schedule.id
+    finally:
+        db.close()
+
+
+def history():
+    db = SessionLocal()
+    try:
+        return [(row.status, row.filename) for row in db.query(BackupHistory).all()]
+    finally:
+        db.close()
+
+
+def test_backup_runs_without_holding_a_session(database, monkeypatch):
+    schedule_id = add_schedule()
+    checked_out = []
+    statement_threads = set()
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statement_threads.add(threading.get_ident())
+
+    async def create_backup(backup_type, skip_if_running=False):
+        checked_out.append(database.pool.checkedout())
+        return {"success": True, "filename": "world.tar.gz", "path": "/b/world.tar.gz", "size_bytes": 10}
+
+    monkeypatch.setattr(scheduler_module.backup_service, "create_backup", create_backup)
+    next_run = datetime.now() + timedelta(days=1)
+    event.listen(database, "before_cursor_execute", before_execute)
+    try:
+        asyncio.run(BackupScheduler()._execute(schedule_id, "world", next_run))
+    finally:
+        event.remove(database, "before_cursor_execute", before_execute)
+
+    # Las consultas corren en threads del executor, no en el del event loop
+    assert statement_threads and threading.get_ident() not in statement_threads
+    assert checked_out == [0]
+    assert history() == [("completed", "world.tar.gz")]
+
+    db = SessionLocal()
+    try:
+        schedule = db.get(ScheduledBackup, schedule_id)
+        assert schedule.last_run is not None
+        assert schedule.next_run == next_run
+    finally:
+        db.close()
+
+
+def test_skipped_backup_leaves_no_history(database, monkeypatch):
+    schedule_id = add_schedule()
+
+    async def create_backup(backup_type, skip_if_running=False):
+        return {"success": False, "skipped": True, "message": "en curso"}
+
+    monkeypatch.setattr(scheduler_module.backup_service, "create_backup", create_backup)
+    asyncio.run(BackupScheduler()._execute(schedule_id, "world", datetime.now()))
+
+    assert history() == []
+
+
+def test_load_reads_enabled_schedules(database):
+    schedule_id = add_schedule()
+    scheduler = BackupScheduler()
+    asyncio.run(scheduler.reload())
+
+    assert list(scheduler._schedules) == [schedule_id]
+    assert scheduler._heap[0][1] == schedule_id
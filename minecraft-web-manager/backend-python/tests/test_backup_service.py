@@ -0,0 +1,26 @@
+"""Tests del servicio de backups"""
+import asyncio
+
+from app.services.backup_service import backup_service
+
+
+def test_skip_if_running_does_not_queue_behind_running_backup(monkeypatch):
+    started = []
+
+    async def fake_run(backup_type):
+        started.append(backup_type)
+        await asyncio.sleep(0.05)
+        return {"success": False, "message": "fake"}
+
+    monkeypatch.setattr(backup_service, "_run_backup_script", fake_run)
+
+    async def run():
+        first = asyncio.create_task(backup_service.create_backup("world"))
+        await asyncio.sleep(0)
+        second = await backup_service.create_backup("world", skip_if_running=True)
+        return await first, second
+
+    first, second = asyncio.run(run())
+    assert started == ["world"]
+    assert second["skipped"] is True
+    assert "skipped" not in first
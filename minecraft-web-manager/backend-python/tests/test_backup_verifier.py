@@ -0,0 +1,171 @@
+"""Tests de la verificación de integridad de backups"""
+import asyncio
+import gzip
+import io
+import random
+import tarfile
+import threading
+import zlib
+
+import pytest
+
+from app.db.session import SessionLocal
+from app.models.backup_history import BackupHistory
+from app.services.backup_verifier import BackupVerifier
+
+
+def tar_bytes(files=3, size=64 * 1024) -> bytes:
+    rng = random.Random(42)
+    words = [b"stone", b"dirt", b"grass", b"oak_log", b"water", b"air", b"bedrock"]
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for n in range(files):
+            # Datos comprimibles: bloques deflate con Huffman, donde un byte
+            # cambiado rompe el stream (zlib.error) y no solo el CRC
+            data = b" ".join(rng.choice(words) for _ in range(size // 5))[:size]
+            info = tarfile.TarInfo(f"world/region/r.{n}.mca")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def make_archive(path):
+    path.write_bytes(gzip.compress(tar_bytes()))
+    return path
+
+
+def make_archive_with_bad_block(path):
+    """
+    .tar.gz cuyo stream deflate se rompe a mitad del archivo
+
+    Tras un Z_FULL_FLUSH el siguiente bloque empieza alineado a byte; se le
+    pone el tipo reservado (BTYPE=11). tarfile ya leyó el primer miembro, así
+    que el error llega como zlib.error sin envolver.
+    """
+    data = tar_bytes()
+    half = len(data) // 2
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    head = compressor.compress(data[:half]) + compressor.flush(zlib.Z_FULL_FLUSH)
+    tail = bytearray(compressor.compress(data[half:]) + compressor.flush())
+    tail[0] |= 0b110
+    path.write_bytes(head + bytes(tail))
+    return path
+
+
+def flip_bytes(path, offsets):
+    data = bytearray(path.read_bytes())
+    for offset in offsets:
+        data[offset] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+@pytest.fixture
+def verifier():
+    return BackupVerifier()
+
+
+def test_valid_archive(tmp_path, verifier):
+    result = verifier.check_archive(make_archive(tmp_path / "world-ok.tar.gz"))
+    assert result["ok"] is True
+    assert result["members"] == 3
+    assert len(result["checksum"]) == 64
+
+
+def test_corrupted_deflate_stream(tmp_path, verifier):
+    path = make_archive_with_bad_block(tmp_path / "world-deflate.tar.gz")
+    with pytest.raises(zlib.error):
+        with gzip.open(path) as gz:
+            with tarfile.open(fileobj=gz, mode="r|") as tar:
+                for _ in tar:
+                    pass
+
+    result = verifier.check_archive(path)
+    assert result["ok"] is False
+    assert "invalid block type" in result["error"]
+    assert result["members"] >= 1
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_byte_flipped_archives_are_reported_not_raised(tmp_path, verifier, seed):
+    path = make_archive(tmp_path / "world-bad.tar.gz")
+    size = path.stat().st_size
+    rng = random.Random(seed)
+    flip_bytes(path, [rng.randrange(10, size - 8) for _ in range(3)])
+
+    result = verifier.check_archive(path)
+    assert result["ok"] is False
+    assert result["error"]
+
+
+def test_truncated_archive(tmp_path, verifier):
+    path = make_archive(tmp_path / "world-short.tar.gz")
+    path.write_bytes(path.read_bytes()[:-1000])
+    assert verifier.check_archive(path)["ok"] is False
+
+
+def test_scrubber_marks_corrupt_row_and_moves_on(tmp_path, verifier, database):
+    bad = make_archive_with_bad_block(tmp_path / "world-20260301-030000.tar.gz")
+    good = make_archive(tmp_path / "world-20260302-030000.tar.gz")
+
+    db = SessionLocal()
+    db.add_all([
+        BackupHistory(filename=bad.name, type="world", path=str(bad), status="completed"),
+        BackupHistory(filename=good.name, type="world", path=str(good), status="completed"),
+    ])
+    db.commit()
+    db.close()
+
+    async def scrub_twice():
+        statuses = []
+        for _ in range(2):
+            backup_id = verifier._next_due()
+            statuses.append((await verifier.verify(backup_id, throttle=True))["status"])
+        return statuses
+
+    assert asyncio.run(scrub_twice()) == ["corrupt", "verified"]
+    assert verifier._next_due() is None
+
+
+def test_on_demand_checks_do_not_queue_behind_scrub(verifier, database):
+    release = threading.Event()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        # Ocupar el thread del scrubber con una verificación lenta
+        busy = loop.run_in_executor(verifier._scrub_executor, release.wait)
+        try:
+            return await asyncio.wait_for(verifier.verify(-1), timeout=5)
+        finally:
+            release.set()
+            await busy
+
+    assert asyncio.run(run()) == {"success": False, "message": "Backup no encontrado"}
+
+
+def test_archive_is_read_without_holding_a_session(tmp_path, verifier, database, monkeypatch):
+    from app.db.session import engine
+
+    path = make_archive(tmp_path / "world-20260303-030000.tar.gz")
+    db = SessionLocal()
+    row = BackupHistory(filename=path.name, type="world", path=str(path), status="completed")
+    db.add(row)
+    db.commit()
+    backup_id = row.id
+    db.close()
+
+    checked_out = []
+    check_archive = verifier.check_archive
+
+    def watched(archive, rate=0):
+        checked_out.append(engine.pool.checkedout())
+        return check_archive(archive, rate)
+
+    monkeypatch.setattr(verifier, "check_archive", watched)
+    result = asyncio.run(verifier.verify(backup_id, throttle=True))
+
+    assert checked_out == [0]
+    assert result["status"] == "verified"
+    db = SessionLocal()
+    row = db.query(BackupHistory).get(backup_id)
+    assert (row.status, row.checksum) == ("verified", result["checksum"])
+    db.close()
@@ -0,0 +1,149 @@
+"""Tests de la importación masiva de baneos"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import ban_service as ban_module
+from app.services.ban_service import BanService
+from app.services.ban_store import BanList, IPBanList
+
+STEVE = "8667ba71-b85a-4004-af54-457a9734eed7"
+ALEX = "ec561538-f3fd-461d-aff5-086b22154bce"
+UNKNOWN = "00000000-0000-4000-8000-000000000000"
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    service = BanService()
+    service.player_bans = BanList(tmp_path / "banned-players.json")
+    service.ip_bans = IPBanList(tmp_path / "banned-ips.json")
+
+    async def get_by_uuid(uuid):
+        return {"name": "Alex", "uuid": ALEX} if uuid == ALEX else None
+
+    async def resolve_uuids(names):
+        return {"steve": {"name": "Steve", "uuid": STEVE.replace("-", "")}}
+
+    monkeypatch.setattr(ban_module.player_registry, "get_by_uuid", get_by_uuid)
+    monkeypatch.setattr(ban_module.player_service, "resolve_uuids", resolve_uuids)
+    return service
+
+
+@pytest.fixture
+def rcon(monkeypatch):
+    sent = []
+
+    async def execute_batch(commands, progress=None):
+        sent.extend(commands)
+
+    monkeypatch.setattr(ban_module.rcon_service, "execute_batch", execute_batch)
+    return sent
+
+
+def run_import(service, content, running, monkeypatch, **kwargs):
+    monkeypatch.setattr(ban_module.server_service, "is_running", lambda: running)
+
+    async def main():
+        job = service.start_import(content, fmt="json", **kwargs)
+        await asyncio.gather(*service._import_tasks)
+        return job
+
+    return asyncio.run(main())
+
+
+BANS = json.dumps([
+    {"name": "Steve", "reason": "Griefing"},
+    {"uuid": ALEX, "expires": "2030-01-01 00:00:00 -0500"},
+    {"uuid": ALEX.replace("-", "").upper(), "reason": "Spam"},
+    {"uuid": UNKNOWN},
+])
+
+
+def test_running_server_only_gets_what_rcon_can_apply(service, rcon, monkeypatch):
+    job = run_import(service, BANS, True, monkeypatch)
+
+    assert job["status"] == "completed"
+    assert job["duplicates"] == 1
+    assert sorted(rcon) == ["ban Alex Spam", "ban Steve Griefing"]
+    assert [e["line"] for e in job["errors"]] == [4]
+    assert all(entry["expires"] == "forever" for entry in service.player_bans.all())
+    assert service.player_bans.get(ALEX)["uuid"] == ALEX
+
+
+def test_temporary_bans_are_rejected_while_running(service, rcon, monkeypatch):
+    content = json.dumps([{"uuid": ALEX, "expires": "2030-01-01 00:00:00 +0000"}])
+    job = run_import(service, content, True, monkeypatch)
+
+    assert rcon == []
+    assert job["applied"] == 0
+    assert "temporales" in job["errors"][0]["error"]
+
+    job = run_import(service, content, False, monkeypatch)
+    assert job["applied"] == 1
+    assert service.player_bans.get(ALEX)["expires"] == "2030-01-01 00:00:00 +0000"
+
+
+def test_manual_temporary_bans_are_rejected_while_running(service, monkeypatch):
+    sent = []
+
+    async def ban_player(name, reason):
+        sent.append(("ban", name))
+
+    async def ban_ip(ip, reason):
+        sent.append(("ban-ip", ip))
+
+    monkeypatch.setattr(ban_module.rcon_service, "ban_player", ban_player)
+    monkeypatch.setattr(ban_module.rcon_service, "ban_ip", ban_ip)
+    monkeypatch.setattr(ban_module.server_service, "is_running", lambda: True)
+    expires = "2030-01-01 00:00:00 +0000"
+
+    with pytest.raises(ValueError, match="temporales"):
+        asyncio.run(service.ban_player("Alex", ALEX, "Spam", expires=expires))
+    with pytest.raises(ValueError, match="temporales"):
+        asyncio.run(service.ban_ip("203.0.113.7", "Spam", expires=expires))
+    assert service.player_bans.get(ALEX) is None
+    assert sent == []
+
+    # Los rangos solo los aplica el panel, así que pueden ser temporales
+    assert asyncio.run(service.ban_ip("198.51.100.0/24", "Spam", expires=expires))
+    assert asyncio.run(service.ban_player("Alex", ALEX, "Spam"))
+    assert sent == [("ban", "Alex")]
+
+    # Un ban permanente existente no pasa a temporal sin detener el servidor
+    with pytest.raises(ValueError):
+        asyncio.run(service.ban_player("Alex", ALEX, "Spam", expires=expires))
+    assert service.player_bans.get(ALEX)["expires"] == "forever"
+
+    monkeypatch.setattr(ban_module.server_service, "is_running", lambda: False)
+    assert asyncio.run(service.ban_player("Alex", ALEX, "Spam", expires=expires))
+    assert service.player_bans.get(ALEX)["expires"] == expires
+    assert sent == [("ban", "Alex")]
+
+
+def test_stopped_server_gets_every_entry_in_the_file(service, rcon, monkeypatch):
+    job = run_import(service, BANS, False, monkeypatch)
+
+    assert rcon == []
+    assert job["applied"] == 3
+    written = {entry["uuid"]: entry for entry in json.loads(service.player_bans.path.read_text())}
+    assert written[ALEX]["name"] == "Alex"
+    assert written[UNKNOWN]["name"] == ""
+    assert written[STEVE]["reason"] == "Griefing"
+
+
+def test_pardons_use_the_stored_name(service, rcon, monkeypatch):
+    run_import(service, json.dumps([{"uuid": ALEX, "name": "Alex"}]), False, monkeypatch)
+    job = run_import(service, json.dumps([{"uuid": ALEX}]), True, monkeypatch, action="pardon")
+
+    assert job["applied"] == 1
+    assert rcon == ["pardon Alex"]
+
+
+def test_import_endpoints_require_a_moderator():
+    from main import app
+
+    client = TestClient(app)
+    assert client.post("/api/bans/import", content="[]").status_code == 401
+    assert client.get("/api/bans/import/abc").status_code == 401
@@ -0,0 +1,101 @@
+"""Tests de las fechas y los índices de las listas de baneos"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.ban_import import validate_player
+from app.services.ban_store import BanList, IPBanList, format_ban_date, is_expired, parse_ban_date
+
+UTC = timezone.utc
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-03-01 10:00:00 +0000", datetime(2026, 3, 1, 10, 0, tzinfo=UTC)),
+    ("2026-03-01 10:00:00 -0500", datetime(2026, 3, 1, 15, 0, tzinfo=UTC)),
+    ("2026-03-01 10:00:00 +0530", datetime(2026, 3, 1, 4, 30, tzinfo=UTC)),
+    ("forever", None),
+    ("", None),
+    (None, None),
+    ("mañana", None),
+])
+def test_parse_ban_date(value, expected):
+    assert parse_ban_date(value) == expected
+
+
+def test_dates_without_offset_are_local_time(new_york):
+    assert parse_ban_date("2026-03-01 10:00:00") == datetime(2026, 3, 1, 15, 0, tzinfo=UTC)
+
+
+def test_format_ban_date_round_trips_in_utc(new_york):
+    value = datetime(2026, 3, 1, 10, 0, tzinfo=timezone(timedelta(hours=-5)))
+    assert format_ban_date(value) == "2026-03-01 15:00:00 +0000"
+    assert parse_ban_date(format_ban_date(value)) == value
+
+
+def test_expiry_honours_negative_offsets():
+    entry = {"expires": "2026-03-01 10:00:00 -0500"}
+    # Expira a las 15:00 UTC, no a las 10:00 UTC
+    assert not is_expired(entry, datetime(2026, 3, 1, 14, 59, tzinfo=UTC))
+    assert is_expired(entry, datetime(2026, 3, 1, 15, 0, tzinfo=UTC))
+    assert not is_expired({"expires": "forever"}, datetime(2100, 1, 1, tzinfo=UTC))
+
+
+def test_expiry_index_orders_mixed_offsets(tmp_path):
+    bans = BanList(tmp_path / "banned-players.json")
+    bans._rebuild({
+        "a": {"uuid": "a", "expires": "2026-03-01 12:00:00 +0000", "created": "2026-03-01 09:00:00 +0000"},
+        "b": {"uuid": "b", "expires": "2026-03-01 10:00:00 -0500", "created": "2026-03-01 09:00:00 -0500"},
+        "c": {"uuid": "c", "expires": "forever", "created": "2026-03-01 09:00:00 +0000"},
+    })
+    bans._signature = bans._file_signature()
+
+    assert bans.next_expiry() == datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+    assert bans.temporary_count == 2
+
+    async def pop():
+        expired = bans.pop_expired(datetime(2026, 3, 1, 14, 0, tzinfo=UTC))
+        bans._flush_handle.cancel()
+        return expired
+
+    expired = asyncio.run(pop())
+    assert [entry["uuid"] for entry in expired] == ["a"]
+    assert bans.next_expiry() == datetime(2026, 3, 1, 15, 0, tzinfo=UTC)
+
+
+def test_expired_exact_ip_falls_through_to_ranges(tmp_path):
+    bans = IPBanList(tmp_path / "banned-ips.json")
+    bans._rebuild({
+        "203.0.113.7": {"ip": "203.0.113.7", "expires": "2020-01-01 00:00:00 +0000"},
+        "203.0.113.0/24": {"ip": "203.0.113.0/24", "expires": "forever"},
+        "198.51.100.0/24": {"ip": "198.51.100.0/24", "expires": "2020-01-01 00:00:00 +0000"},
+        "198.51.0.0/16": {"ip": "198.51.0.0/16", "expires": "forever"},
+        "192.0.2.1": {"ip": "192.0.2.1", "expires": "2020-01-01 00:00:00 +0000"},
+    })
+    bans._signature = bans._file_signature()
+
+    assert bans.match("203.0.113.7")["ip"] == "203.0.113.0/24"
+    assert bans.match("198.51.100.9")["ip"] == "198.51.0.0/16"
+    assert bans.match("192.0.2.1") is None
+    assert not bans.contains("192.0.2.1")
+    assert bans.contains("203.0.113.7")
+
+
+def test_import_accepts_any_offset():
+    entry = validate_player(
+        {"name": "Steve", "expires": "2030-01-01 00:00:00 -0500"}, "Import", format_ban_date()
+    )
+    assert entry["expires"] == "2030-01-01 00:00:00 -0500"
+
+    with pytest.raises(ValueError):
+        validate_player({"name": "Steve", "expires": "2030-01-01"}, "Import", format_ban_date())
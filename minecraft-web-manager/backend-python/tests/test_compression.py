@@ -0,0 +1,235 @@
+"""Tests de la compresión de respuestas y de los archivos estáticos versionados"""
+import asyncio
+import gzip
+import json
+import os
+import threading
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.core.http_cache import RouteCache
+from app.core.static_assets import IMMUTABLE, AssetFiles
+
+BIG = {"items": ["x" * 40] * 100}
+
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("GZIP;Q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip; q=0.000", None),
+    ("gzip;q=nope", None),
+    ("*", "gzip"),
+    ("gzip;q=0, *", None),
+    ("identity", None),
+    ("", None),
+    ("br, gzip;q=0.8", "gzip"),
+])
+def test_choose_encoding(no_brotli, header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_prefers_brotli_when_available(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+
+
+def compressed_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    cache = RouteCache(ttl=60, watch=lambda: [])
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/big")
+    async def big():
+        return JSONResponse(BIG, headers={"ETag": '"big-1"'})
+
+    @app.get("/binary")
+    async def binary():
+        return Response(b"\0" * 4096, media_type="application/octet-stream")
+
+    @app.get("/encoded")
+    async def encoded():
+        body = gzip.compress(json.dumps(BIG).encode())
+        return Response(body, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(3):
+                yield json.dumps({"line": i}) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/cached")
+    async def cached(request: Request):
+        return await cache.respond(request, lambda: BIG)
+
+    return TestClient(app)
+
+
+def test_size_threshold_and_weak_etag(no_brotli):
+    client = compressed_app()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.headers["etag"] == 'W/"big-1"'
+    assert "Accept-Encoding" in big.headers["vary"]
+    assert big.json() == BIG
+
+    refused = client.get("/big", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+    assert refused.headers["etag"] == '"big-1"'
+
+
+def test_binary_and_encoded_responses_pass_through(no_brotli):
+    client = compressed_app()
+
+    binary = client.get("/binary", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in binary.headers
+    assert binary.content == b"\0" * 4096
+
+    encoded = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.json() == BIG  # una sola capa de gzip
+
+
+def test_streams_are_compressed_incrementally(no_brotli):
+    response = compressed_app().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == [{"line": i} for i in range(3)]
+
+
+def test_route_cache_revalidates_with_the_weak_etag(no_brotli):
+    client = compressed_app()
+    first = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["etag"].startswith('W/"')
+
+    again = client.get("/cached", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+
+
+def test_dashboard_revalidates_with_the_weak_etag(no_brotli, monkeypatch):
+    from app.api.routes import dashboard as dashboard_route
+    from app.core.deps import require_any_role
+    from main import app
+
+    async def get_summary(sections=None):
+        return BIG, '"summary-1"'
+
+    monkeypatch.setattr(dashboard_route.dashboard_service, "get_summary", get_summary)
+    app.dependency_overrides[require_any_role] = lambda: None
+    try:
+        client = TestClient(app)
+        first = client.get("/api/dashboard/summary", headers={"Accept-Encoding": "gzip"})
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.headers["etag"] == 'W/"summary-1"'
+
+        again = client.get(
+            "/api/dashboard/summary",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]}
+        )
+        assert again.status_code == 304
+    finally:
+        app.dependency_overrides.clear()
+
+
+# ---------- Archivos estáticos ----------
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "js" / "app.js").write_text("console.log('hola');\n" * 200)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + os.urandom(2048))
+    return tmp_path
+
+
+def static_client(files):
+    app = FastAPI()
+    app.mount("/static", files)
+    return TestClient(app)
+
+
+def test_versioned_urls_are_immutable(no_brotli, static_dir):
+    files = AssetFiles(directory=str(static_dir))
+    assert asyncio.run(files.warm()) == 2
+    client = static_client(files)
+
+    url = files.asset_url("js/app.js")
+    assert "?v=" in url
+    assert client.get(url).headers["cache-control"] == IMMUTABLE
+    assert client.get("/static/js/app.js").headers["cache-control"] == "no-cache"
+    assert client.get("/static/js/app.js?v=000000000000").headers["cache-control"] == "no-cache"
+
+
+def test_precompressed_variant_and_revalidation(no_brotli, static_dir):
+    files = AssetFiles(directory=str(static_dir))
+    asyncio.run(files.warm())
+    client = static_client(files)
+
+    response = client.get("/static/js/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith('W/"')
+    assert response.text == (static_dir / "js" / "app.js").read_text()
+
+    revalidated = client.get(
+        "/static/js/app.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+    image = client.get("/static/logo.png", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+    assert image.content == (static_dir / "logo.png").read_bytes()
+
+
+def test_files_are_read_off_the_event_loop(no_brotli, static_dir, monkeypatch):
+    files = AssetFiles(directory=str(static_dir))
+    client = static_client(files)
+
+    # Sin calentar: asset_url no lee el archivo y devuelve la URL sin versión
+    assert files.asset_url("js/app.js") == "/static/js/app.js"
+
+    threads = {}
+    prepare, file_response = files._prepare, files.file_response
+
+    def recording_prepare(*args):
+        threads["prepare"] = threading.get_ident()
+        return prepare(*args)
+
+    def recording_file_response(*args, **kwargs):
+        threads["response"] = threading.get_ident()
+        return file_response(*args, **kwargs)
+
+    monkeypatch.setattr(files, "_prepare", recording_prepare)
+    monkeypatch.setattr(files, "file_response", recording_file_response)
+
+    response = client.get("/static/js/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert threads["prepare"] != threads["response"]
+    assert "?v=" in files.asset_url("js/app.js")
+
+    # Al cambiar el archivo cambia la versión
+    old_url = files.asset_url("js/app.js")
+    path = static_dir / "js" / "app.js"
+    path.write_text("console.log('adiós');\n" * 300)
+    client.get("/static/js/app.js")
+    assert files.asset_url("js/app.js") != old_url
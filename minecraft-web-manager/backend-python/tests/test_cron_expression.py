@@ -0,0 +1,82 @@
+"""Tests del parser de expresiones cron del programador de backups"""
+from datetime import datetime
+
+import pytest
+
+from app.services.backup_scheduler import CronExpression
+
+
+def test_every_fifteen_minutes():
+    cron = CronExpression("*/15 * * * *")
+    assert cron.next_after(datetime(2026, 1, 1, 10, 0)) == datetime(2026, 1, 1, 10, 15)
+    assert cron.next_after(datetime(2026, 1, 1, 10, 59)) == datetime(2026, 1, 1, 11, 0)
+
+
+def test_next_is_strictly_after_reference():
+    cron = CronExpression("30 3 * * *")
+    assert cron.next_after(datetime(2026, 1, 1, 3, 30)) == datetime(2026, 1, 2, 3, 30)
+    assert cron.next_after(datetime(2026, 1, 1, 3, 29, 59)) == datetime(2026, 1, 1, 3, 30)
+
+
+def test_aliases():
+    assert CronExpression("@daily").next_after(datetime(2026, 3, 5, 12, 0)) == datetime(2026, 3, 6, 0, 0)
+    assert CronExpression("@hourly").next_after(datetime(2026, 3, 5, 12, 0)) == datetime(2026, 3, 5, 13, 0)
+    # 2026-03-08 es domingo
+    assert CronExpression("@weekly").next_after(datetime(2026, 3, 5, 12, 0)) == datetime(2026, 3, 8, 0, 0)
+    assert CronExpression("@monthly").next_after(datetime(2026, 12, 15)) == datetime(2027, 1, 1, 0, 0)
+
+
+def test_ranges_lists_and_steps():
+    cron = CronExpression("0 9-17/4 * * 1-5")
+    assert cron.hours == [9, 13, 17]
+    # Viernes 2026-03-06 a las 18:00 -> lunes a las 9:00
+    assert cron.next_after(datetime(2026, 3, 6, 18, 0)) == datetime(2026, 3, 9, 9, 0)
+    assert CronExpression("5,35 * * * *").minutes == [5, 35]
+
+
+def test_sunday_as_zero_or_seven():
+    assert CronExpression("0 0 * * 0").weekdays == CronExpression("0 0 * * 7").weekdays == {6}
+
+
+def test_restricted_day_and_weekday_match_either():
+    # Día 1 del mes o cualquier lunes
+    cron = CronExpression("0 0 1 * 1")
+    assert cron.next_after(datetime(2026, 3, 1, 0, 0)) == datetime(2026, 3, 2, 0, 0)
+    assert cron.next_after(datetime(2026, 3, 30, 0, 0)) == datetime(2026, 4, 1, 0, 0)
+
+
+def test_stepped_star_day_requires_both_fields():
+    # Vixie cron: */2 cuenta como '*', así que se exigen día impar Y lunes
+    cron = CronExpression("0 0 */2 * 1")
+    # 2026-03-02 es lunes pero día par; 2026-03-09 es lunes y día impar
+    assert cron.next_after(datetime(2026, 3, 1, 0, 0)) == datetime(2026, 3, 9, 0, 0)
+
+
+def test_stepped_star_weekday_requires_both_fields():
+    cron = CronExpression("0 0 13 * */7")
+    # */7 en día-semana es solo domingo: el primer 13 en domingo tras la fecha
+    assert cron.next_after(datetime(2026, 1, 1)) == datetime(2026, 9, 13, 0, 0)
+
+
+def test_leap_day():
+    assert CronExpression("0 0 29 2 *").next_after(datetime(2026, 1, 1)) == datetime(2028, 2, 29, 0, 0)
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "a * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_never_runs():
+    with pytest.raises(ValueError):
+        CronExpression("0 0 31 2 *").next_after(datetime(2026, 1, 1))
@@ -0,0 +1,56 @@
+"""Tests del resumen del dashboard y del tamaño de los mundos"""
+import asyncio
+
+import pytest
+
+from app.services import dashboard_service as dashboard_module
+from app.services import world_service as world_module
+from app.services.dashboard_service import DashboardService
+from app.services.world_service import MAX_CONCURRENT_DU, WorldService
+
+
+def test_summary_only_loads_requested_sections(monkeypatch):
+    loaded = []
+
+    def loader(section):
+        async def load():
+            loaded.append(section)
+            return {"section": section}
+        return load
+
+    service = DashboardService()
+    monkeypatch.setattr(dashboard_module.server_service, "get_status", loader("server"))
+    monkeypatch.setattr(dashboard_module.system_service, "get_system_info", loader("system"))
+    for section in ("worlds", "backups", "plugins"):
+        monkeypatch.setattr(service, f"_load_{section}", loader(section))
+
+    payload, _ = asyncio.run(service.get_summary(["server", "system", "server"]))
+
+    assert sorted(loaded) == ["server", "system"]
+    assert payload["server"] == {"section": "server"}
+    assert "worlds" not in payload
+
+    with pytest.raises(ValueError, match="worldz"):
+        asyncio.run(service.get_summary(["worldz"]))
+
+
+def test_world_sizes_run_a_bounded_number_of_du(tmp_path, monkeypatch):
+    running = {"now": 0, "max": 0}
+
+    async def exec_command(command, cwd=None):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return {"success": True, "stdout": f"{1024 * 1024}\t{command.split()[-1]}"}
+
+    monkeypatch.setattr(world_module.bash_service, "exec_command", exec_command)
+    service = WorldService()
+    service.worlds_path = tmp_path
+
+    async def main():
+        worlds = [tmp_path / f"world{n}" for n in range(MAX_CONCURRENT_DU * 3)]
+        return await asyncio.gather(*(service._get_world_size(world) for world in worlds))
+
+    assert asyncio.run(main()) == [1] * (MAX_CONCURRENT_DU * 3)
+    assert running["max"] == MAX_CONCURRENT_DU
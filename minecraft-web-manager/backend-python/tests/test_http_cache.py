@@ -0,0 +1,68 @@
+"""Tests de la caché de respuestas con ETag/Last-Modified"""
+from typing import List
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core import http_cache
+from app.core.http_cache import RouteCache
+from app.schemas.schemas import PluginInfo
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"monotonic": 1000.0, "time": 1_700_000_000.2}
+    monkeypatch.setattr(http_cache.time, "monotonic", lambda: now["monotonic"])
+    monkeypatch.setattr(http_cache.time, "time", lambda: now["time"])
+    return now
+
+
+def app_for(cache, data):
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(request: Request):
+        return await cache.respond(request, lambda: data["value"])
+
+    return TestClient(app)
+
+
+def test_last_modified_follows_body_changes_not_file_mtimes(tmp_path, clock):
+    data = {"value": [1]}
+    client = app_for(RouteCache(ttl=10, watch=lambda: [tmp_path]), data)
+
+    first = client.get("/items")
+    since = {"If-Modified-Since": first.headers["last-modified"]}
+    assert client.get("/items", headers=since).status_code == 304
+
+    # Sin tocar el disco el TTL vence y el cuerpo es otro, en el mismo segundo
+    data["value"] = [2]
+    clock["monotonic"] += 11
+    clock["time"] += 0.5
+    changed = client.get("/items", headers=since)
+    assert changed.status_code == 200
+    assert changed.json() == [2]
+    assert changed.headers["last-modified"] != first.headers["last-modified"]
+
+    # Mismo cuerpo tras vencer el TTL: Last-Modified no se mueve
+    clock["monotonic"] += 11
+    clock["time"] += 60
+    since = {"If-Modified-Since": changed.headers["last-modified"]}
+    again = client.get("/items", headers=since)
+    assert again.status_code == 304
+    assert again.headers["last-modified"] == changed.headers["last-modified"]
+
+
+def test_model_validates_and_filters_before_caching(tmp_path):
+    plugin = {"name": "Essentials", "filename": "Essentials.jar", "enabled": True, "size_mb": 1.5}
+    data = {"value": [{**plugin, "internal": "x"}]}
+    cache = RouteCache(ttl=10, watch=lambda: [tmp_path], model=List[PluginInfo])
+    client = app_for(cache, data)
+
+    assert client.get("/items").json() == [plugin]
+
+    cache.clear()
+    data["value"] = [{"name": "Broken"}]
+    with pytest.raises(ValueError):
+        client.get("/items")
@@ -0,0 +1,74 @@
+"""Tests de las listas JSON en memoria con escritura diferida"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.config_service import config_service
+from app.services.json_list_store import JsonListStore, get_store
+
+STEVE = "8667ba71-b85a-4004-af54-457a9734eed7"
+ALEX = "ec561538-f3fd-461d-aff5-086b22154bce"
+
+
+def test_explicit_flush_waits_for_a_debounced_flush(tmp_path):
+    store = JsonListStore(tmp_path / "whitelist.json")
+    writing = {"now": 0, "max": 0}
+    guard = threading.Lock()
+    write = store._write
+
+    def slow_write(data):
+        with guard:
+            writing["now"] += 1
+            writing["max"] = max(writing["max"], writing["now"])
+        time.sleep(0.1)
+        try:
+            return write(data)
+        finally:
+            with guard:
+                writing["now"] -= 1
+
+    store._write = slow_write
+
+    async def main():
+        store.put({"uuid": STEVE, "name": "Steve"})
+        store._flush_handle.cancel()
+        store._start_flush()  # la escritura diferida arranca...
+        await asyncio.sleep(0.02)
+        store.put({"uuid": ALEX, "name": "Alex"})
+        await store.flush()  # ...y la explícita no se cruza con ella
+        if store._flush_task:
+            await store._flush_task
+
+    asyncio.run(main())
+
+    assert writing["max"] == 1
+    written = json.loads(store.path.read_text())
+    assert sorted(entry["name"] for entry in written) == ["Alex", "Steve"]
+
+
+def test_replace_rejects_entries_without_key(tmp_path):
+    store = JsonListStore(tmp_path / "ops.json")
+    store.path.write_text(json.dumps([{"uuid": STEVE, "name": "Steve"}]))
+
+    with pytest.raises(ValueError, match="posiciones: 2, 3"):
+        store.replace([{"uuid": ALEX, "name": "Alex"}, {"name": "NoUuid"}, "Steve"])
+
+    assert [entry["name"] for entry in store.all()] == ["Steve"]
+    assert store._pending == {}
+
+
+def test_config_service_reports_rejected_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_service, "server_path", tmp_path)
+    (tmp_path / "whitelist.json").write_text(json.dumps([{"uuid": STEVE, "name": "Steve"}]))
+
+    result = asyncio.run(config_service.update_whitelist([{"name": "Alex"}]))
+    assert result["success"] is False
+    assert "uuid" in result["message"]
+    assert json.loads((tmp_path / "whitelist.json").read_text())[0]["name"] == "Steve"
+
+    result = asyncio.run(config_service.update_whitelist([{"uuid": ALEX, "name": "Alex"}]))
+    assert result["success"] is True
+    assert [e["name"] for e in get_store(tmp_path / "whitelist.json").all()] == ["Alex"]
@@ -0,0 +1,56 @@
+"""Tests de las migraciones de esquema"""
+from sqlalchemy import inspect, text
+
+from app.db import migrations
+from app.db.session import engine
+
+
+def test_upgrade_schema_adds_missing_nullable_columns_and_indexes():
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS backup_history"))
+        conn.execute(text(
+            "CREATE TABLE backup_history ("
+            "id INTEGER PRIMARY KEY, filename VARCHAR(255) NOT NULL, "
+            "type VARCHAR(50) NOT NULL, path VARCHAR(500) NOT NULL, "
+            "status VARCHAR(50))"
+        ))
+
+    migrations.init_db()
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("backup_history")}
+    assert "duration_seconds" in columns
+    assert inspector.get_indexes("backup_history")
+
+    # Idempotente
+    migrations.init_db()
+
+
+def test_upgrade_schema_adds_not_null_columns_with_server_default(monkeypatch, capsys):
+    from sqlalchemy import Column, Integer, MetaData, String, Table
+
+    metadata = MetaData()
+    Table(
+        "migration_probe", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("kind", String(20), nullable=False, server_default="full"),
+        Column("owner", String(50), nullable=False),
+        Column("note", String(100)),
+    )
+    monkeypatch.setattr(migrations, "Base", type("Base", (), {"metadata": metadata}))
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS migration_probe"))
+        conn.execute(text("CREATE TABLE migration_probe (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO migration_probe (id) VALUES (1)"))
+
+    migrations.upgrade_schema()
+
+    columns = {column["name"]: column for column in inspect(engine).get_columns("migration_probe")}
+    assert {"kind", "note"} <= set(columns)
+    assert not columns["kind"]["nullable"]
+    assert "owner" not in columns
+    assert "migration_probe.owner" in capsys.readouterr().out
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT kind FROM migration_probe")).scalar() == "full"
+        conn.execute(text("DROP TABLE migration_probe"))
@@ -0,0 +1,191 @@
+"""Tests del cliente de Mojang contra un servidor HTTP local"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.services.mojang_service import MojangService
+
+PLAYERS = {
+    "steve": {"name": "Steve", "id": "8667ba71b85a4004af54457a9734eed7"},
+    "alex": {"name": "Alex", "id": "ec561538f3fd461daff5086b22154bce"},
+}
+
+
+class FakeMojang:
+    """API de perfiles mínima que registra cada lote recibido"""
+
+    def __init__(self):
+        self.batches = []
+        self.profile_requests = []
+        self.delay = 0.0
+        self.status = 200
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                names = json.loads(self.rfile.read(int(self.headers["content-length"])))
+                fake.batches.append(names)
+                time.sleep(fake.delay)
+                found = [PLAYERS[n.lower()] for n in names if n.lower() in PLAYERS]
+                self._reply(fake.status, json.dumps(found).encode())
+
+            def do_GET(self):
+                fake.profile_requests.append(self.path)
+                time.sleep(fake.delay)
+                self._reply(204, b"")
+
+            def _reply(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def mojang(database, monkeypatch):
+    server = FakeMojang()
+    monkeypatch.setattr(settings, "MOJANG_API_URL", server.url)
+    monkeypatch.setattr(settings, "MOJANG_SESSION_URL", server.url)
+    yield server
+    server.close()
+
+
+def run(service, coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+def test_names_are_sent_in_batches_of_ten(mojang):
+    service = MojangService()
+    names = [f"player{i}" for i in range(23)] + ["Steve"]
+    results = run(service, service.lookup_names(names))
+
+    assert sorted(len(batch) for batch in mojang.batches) == [4, 10, 10]
+    assert results["steve"]["uuid"] == PLAYERS["steve"]["id"]
+    assert results["player0"] is None
+
+
+def test_concurrent_lookups_share_batches_and_requests(mojang):
+    mojang.delay = 0.1
+    service = MojangService()
+
+    async def lookups():
+        return await asyncio.gather(
+            service.lookup_name("Steve"),
+            service.lookup_name(" steve "),
+            service.lookup_name("Alex"),
+            service.get_profile(PLAYERS["steve"]["id"]),
+            service.get_profile(PLAYERS["steve"]["id"]),
+        )
+
+    steve, steve_again, alex, profile, profile_again = run(service, lookups())
+
+    assert mojang.batches == [["steve", "alex"]]
+    assert len(mojang.profile_requests) == 1
+    assert steve == steve_again == {"name": "Steve", "uuid": PLAYERS["steve"]["id"]}
+    assert alex["name"] == "Alex"
+    assert profile is None and profile_again is None
+
+
+def test_unknown_names_are_cached_negatively(mojang):
+    service = MojangService()
+    assert run(service, service.lookup_name("Nobody")) is None
+    assert run(service, service.lookup_name("nobody")) is None
+    assert len(mojang.batches) == 1
+
+    # La caché negativa también sobrevive en SQLite a un reinicio
+    restarted = MojangService()
+    assert run(restarted, restarted.lookup_name("Nobody")) is None
+    assert len(mojang.batches) == 1
+
+
+def test_failed_batches_are_not_cached(mojang):
+    mojang.status = 500
+    service = MojangService()
+    assert run(service, service.lookup_name("Steve")) is None
+
+    mojang.status = 200
+    assert run(service, service.lookup_name("Steve"))["name"] == "Steve"
+    assert len(mojang.batches) == 2
+    assert service._inflight == {}
+
+
+def test_cancelled_batch_releases_waiters(mojang):
+    mojang.delay = 0.5
+    service = MojangService()
+
+    async def cancel_midway():
+        waiter = asyncio.create_task(service.lookup_name("Steve"))
+        while not mojang.batches:
+            await asyncio.sleep(0.01)
+        for task in list(service._batches):
+            task.cancel()
+        return await asyncio.wait_for(waiter, timeout=2)
+
+    assert run(service, cancel_midway()) is None
+    assert service._inflight == {}
+
+
+def test_close_releases_names_not_yet_sent(mojang):
+    service = MojangService()
+
+    async def close_before_flush():
+        waiter = asyncio.create_task(service.lookup_name("Steve"))
+        while not service._pending:
+            await asyncio.sleep(0.001)
+        await service.close()
+        return await asyncio.wait_for(waiter, timeout=2)
+
+    assert run(service, close_before_flush()) is None
+    assert mojang.batches == []
+    assert service._inflight == {}
+
+
+def test_cache_misses_use_one_query_off_the_event_loop(mojang):
+    from sqlalchemy import event
+    from app.db.session import engine
+
+    service = MojangService()
+    names = [f"player{i}" for i in range(600)]
+    run(service, service.lookup_names(names))
+    assert sum(len(batch) for batch in mojang.batches) == 600
+
+    selects = []
+    loop_thread = threading.get_ident()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "mojang_cache" in statement:
+            selects.append(threading.get_ident())
+
+    # Tras un reinicio todo sale de SQLite: una consulta por bloque de 500
+    restarted = MojangService()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        results = run(restarted, restarted.lookup_names(names))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(mojang.batches) == 60
+    assert all(value is None for value in results.values())
+    assert len(selects) == 2
+    assert loop_thread not in selects
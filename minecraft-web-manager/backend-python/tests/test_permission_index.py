@@ -0,0 +1,132 @@
+"""Tests del índice de permisos sobre un yaml-storage de LuckPerms"""
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.services.json_list_store import JsonListStore
+from app.services.permission_index import PermissionIndex, candidate_nodes
+
+FIXTURES = Path(__file__).parent / "fixtures" / "luckperms" / "yaml-storage"
+
+STEVE = "00000000000000000000000000000001"
+ALEX = "00000000000000000000000000000002"
+HEROBRINE = "00000000000000000000000000000003"
+NOTCH = "00000000000000000000000000000004"
+JEB = "00000000000000000000000000000005"
+
+
+@pytest.fixture
+def index(tmp_path):
+    storage = tmp_path / "yaml-storage"
+    shutil.copytree(FIXTURES, storage)
+    ops = tmp_path / "ops.json"
+    ops.write_text(json.dumps([
+        {"uuid": "00000000-0000-0000-0000-000000000004", "name": "Notch", "level": 4},
+        {"uuid": "00000000-0000-0000-0000-000000000005", "name": "Jeb", "level": 2},
+    ]))
+
+    index = PermissionIndex()
+    index.storage_path = storage
+    index.ops = JsonListStore(ops)
+    return index
+
+
+def who_can(index, permission, **kwargs):
+    result = asyncio.run(index.who_can(permission, **kwargs))
+    players = {p["uuid"]: p for p in result["players"]}
+    denied = {p["uuid"]: p for p in result["denied"]}
+    return result, players, denied
+
+
+def test_candidate_nodes_go_from_specific_to_wildcard():
+    assert candidate_nodes(" Essentials.Kit.Tools ") == [
+        "essentials.kit.tools", "essentials.kit.*", "essentials.*", "*"
+    ]
+
+
+def test_wildcards_and_inheritance(index):
+    result, players, denied = who_can(index, "essentials.kit.tools")
+
+    assert players[STEVE]["node"] == "essentials.kit.*"
+    assert players[STEVE]["source"] == "group:vip"
+    # admin concede '*' y hereda de mod, que a su vez hereda de admin
+    assert players[HEROBRINE]["node"] == "*"
+    assert players[HEROBRINE]["source"] == "group:admin"
+    assert not result["default"]
+
+
+def test_inheritance_cycle_resolves_both_groups(index):
+    _, players, _ = who_can(index, "essentials.kick")
+    assert players[HEROBRINE]["source"] == "group:mod"
+
+    groups = {g["name"]: g for g in asyncio.run(index.get_groups())}
+    assert groups["mod"]["parents"] == ["admin"]
+    assert groups["admin"]["parents"] == ["mod"]
+    assert [g["name"] for g in asyncio.run(index.get_groups())][0] == "admin"
+
+
+def test_heavier_group_wins(index):
+    _, players, denied = who_can(index, "essentials.fly")
+
+    assert players[STEVE]["source"] == "group:vip"
+    # probation (peso 50) niega lo que vip (peso 10) concede
+    assert denied[ALEX]["source"] == "group:probation"
+    assert ALEX not in players
+
+
+def test_group_nodes_define_membership(index):
+    steve = asyncio.run(index.get_player_permissions(STEVE))
+    alex = asyncio.run(index.get_player_permissions(ALEX))
+    nobody = asyncio.run(index.get_player_permissions(JEB))
+
+    assert steve["groups"] == ["vip"]
+    assert alex["groups"] == ["vip", "probation"]
+    assert nobody["groups"] == ["default"]
+    assert nobody["op_level"] == 2
+
+    # Default llega por group.default de vip y como grupo de cualquier jugador
+    result, players, _ = who_can(index, "essentials.spawn")
+    assert players[STEVE]["source"] == "group:default"
+    assert result["default"]
+
+
+def test_expired_and_contextual_nodes_are_skipped(index):
+    _, players, _ = who_can(index, "essentials.tpa")
+    assert STEVE not in players
+
+    _, players, _ = who_can(index, "essentials.warp")
+    assert players[STEVE]["node"] == "essentials.warp"
+
+    _, players, _ = who_can(index, "essentials.home")
+    assert STEVE not in players
+    groups = {g["name"]: g for g in asyncio.run(index.get_groups())}
+    assert groups["vip"]["contextual"] == 1
+
+
+def test_explicit_denial_overrides_op(index):
+    _, players, denied = who_can(index, "essentials.fly")
+
+    assert denied[NOTCH]["source"] == "user"
+    assert NOTCH not in players
+    assert players[JEB]["source"] == "op"
+
+    _, players, _ = who_can(index, "essentials.fly", min_op_level=3)
+    assert JEB not in players
+
+
+def test_reload_does_not_touch_cached_holders(index):
+    asyncio.run(index.who_can("essentials.fly"))
+    first = index._users[STEVE]
+
+    (index.storage_path / "groups" / "vip.yml").write_text("name: vip\npermissions:\n- weight.10\n")
+    signature = index._scan()
+    indexes = index._load(signature)
+
+    # El índice publicado no cambia hasta _apply
+    assert first["groups"] == ["vip"]
+    assert index._users[STEVE] is first
+    assert all("groups" not in holder for _, holder in index._parsed.values())
+    assert indexes["users"][STEVE] is not first
@@ -0,0 +1,106 @@
+"""Tests del registro de jugadores indexado desde usercache.json"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.services.player_registry import PlayerRegistry
+
+UUID = "{:032x}".format
+
+
+def write_cache(path, players, mtime=None):
+    path.write_text(json.dumps(players))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def player(number, name, expires):
+    return {"uuid": UUID(number), "name": name, "expiresOn": f"2026-03-{expires:02d} 10:00:00 +0000"}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    path = tmp_path / "usercache.json"
+    write_cache(path, [
+        player(1, "Steve", 1),
+        player(2, "Stevie_G", 3),
+        player(3, "Alex", 2),
+        player(4, "steve", 4),  # mismo nombre con otro UUID, más reciente
+        player(5, "MasterSteve", 5),
+    ])
+    return PlayerRegistry(path)
+
+
+def names(players):
+    return [p["name"] for p in players]
+
+
+def test_lookups_by_uuid_and_name(registry):
+    async def main():
+        return (
+            await registry.get_by_uuid("00000000-0000-0000-0000-000000000003"),
+            await registry.get_by_name("STEVE"),
+            await registry.get_by_name("nobody"),
+        )
+
+    alex, steve, missing = asyncio.run(main())
+    assert alex["name"] == "Alex"
+    assert steve["uuid"] == UUID(4)
+    assert missing is None
+
+
+def test_autocomplete_is_alphabetical_and_deduplicated(registry):
+    assert names(asyncio.run(registry.autocomplete("ste"))) == ["steve", "Stevie_G"]
+    assert names(asyncio.run(registry.autocomplete("ste", limit=1))) == ["steve"]
+    assert asyncio.run(registry.autocomplete("zz")) == []
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("eve", ["MasterSteve", "steve", "Steve"]),
+    ("tevi", ["Stevie_G"]),
+    ("STEVE", ["MasterSteve", "steve", "Steve"]),
+    ("ev", ["MasterSteve", "steve", "Stevie_G", "Steve"]),
+    ("vex", []),
+    ("", ["MasterSteve", "steve", "Stevie_G", "Alex", "Steve"]),
+])
+def test_search_uses_history_order(registry, query, expected):
+    assert names(asyncio.run(registry.search(query))) == expected
+
+
+def test_search_limit(registry):
+    assert names(asyncio.run(registry.search("eve", limit=2))) == ["MasterSteve", "steve"]
+
+
+def test_reloads_only_when_the_file_changes(registry, monkeypatch):
+    loads = []
+    load = registry._load
+    monkeypatch.setattr(registry, "_load", lambda signature: loads.append(signature) or load(signature))
+
+    asyncio.run(registry.all())
+    asyncio.run(registry.all())
+    assert len(loads) == 1
+
+    write_cache(registry.usercache_file, [player(9, "Herobrine", 9)])
+    assert names(asyncio.run(registry.all())) == ["Herobrine"]
+    assert len(loads) == 2
+
+
+def test_unparseable_cache_is_not_reread_until_it_changes(registry, monkeypatch):
+    assert len(asyncio.run(registry.all())) == 5
+
+    loads = []
+    load = registry._load
+    monkeypatch.setattr(registry, "_load", lambda signature: loads.append(signature) or load(signature))
+
+    registry.usercache_file.write_text('[{"name": "Her')
+    for _ in range(3):
+        # Se conservan los índices anteriores
+        assert asyncio.run(registry.get_by_name("alex"))["uuid"] == UUID(3)
+    assert len(loads) == 1
+
+    write_cache(registry.usercache_file, [player(9, "Herobrine", 9)])
+    assert asyncio.run(registry.get_by_name("alex")) is None
+    assert names(asyncio.run(registry.all())) == ["Herobrine"]
+    assert len(loads) == 2
@@ -0,0 +1,128 @@
+"""Tests del seguimiento de sesiones a partir de logs reales de Paper y Vanilla"""
+import asyncio
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.db.session import SessionLocal
+from app.models.player_session import PlayerSession
+from app.services.player_tracker import PlayerTracker
+
+FIXTURES = Path(__file__).parent / "fixtures" / "latest_log"
+
+
+def tracker_for(fixture: str, tmp_path: Path, modified: datetime) -> PlayerTracker:
+    """Tracker que lee una copia del log con la fecha de modificación indicada"""
+    log_file = tmp_path / "latest.log"
+    shutil.copy(FIXTURES / fixture, log_file)
+    os.utime(log_file, (modified.timestamp(), modified.timestamp()))
+
+    tracker = PlayerTracker()
+    tracker.log_file = log_file
+    return tracker
+
+
+def sessions():
+    db = SessionLocal()
+    try:
+        return [
+            (row.name, row.joined_at, row.left_at, row.leave_reason, row.leave_message, row.chat_messages)
+            for row in db.query(PlayerSession).order_by(PlayerSession.joined_at).all()
+        ]
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("line, event", [
+    ("[12:00:00 INFO]: Steve joined the game", "join"),
+    ("[12:00:00] [Server thread/INFO]: Steve joined the game", "join"),
+    ("[12:00:00 INFO]: Steve (formerly known as Old_Steve) joined the game", "join"),
+    ("[12:00:00 INFO]: <Steve> joined the game", None),
+    ("[12:00:00 INFO]: Steve joined the game extra", None),
+    ("Steve joined the game", None),
+])
+def test_join_lines(line, event):
+    result = PlayerTracker()._parse_line(line)
+    assert (result[0] if result else None) == event
+
+
+def test_leave_keeps_kick_reason_from_kick_command():
+    tracker = PlayerTracker()
+    tracker._parse_line("[12:00:00 INFO]: Steve joined the game")
+    tracker._parse_line("[12:01:00 INFO]: Kicked Steve: Griefing")
+    tracker._parse_line("[12:01:00 INFO]: Steve lost connection: Kicked by an operator")
+    kind, _, player, reason, detail = tracker._parse_line("[12:01:00 INFO]: Steve left the game")
+
+    assert (kind, player["name"], reason, detail) == ("leave", "Steve", "kick", "Griefing")
+    assert tracker.online == {}
+
+
+@pytest.mark.parametrize("message, reason", [
+    ("Disconnected", "quit"),
+    ("Timed out", "quit"),
+    ("You are banned from this server.", "kick"),
+    ("Kicked for spamming", "kick"),
+])
+def test_lost_connection_reasons(message, reason):
+    tracker = PlayerTracker()
+    tracker._parse_line("[12:00:00 INFO]: Steve joined the game")
+    tracker._parse_line(f"[12:01:00 INFO]: Steve lost connection: {message}")
+    event = tracker._parse_line("[12:01:00 INFO]: Steve left the game")
+    assert event[3:] == (reason, message)
+
+
+def test_chat_counts_only_online_players():
+    tracker = PlayerTracker()
+    tracker._parse_line("[12:00:00 INFO]: Steve joined the game")
+    for line in [
+        "[12:00:01 INFO]: <Steve> hola",
+        "[12:00:02 INFO]: [Not Secure] <steve> adiós",
+        "[12:00:03 INFO]: <Alex> no está conectado",
+        "[12:00:04 INFO]: [Server] <Steve> no es chat del jugador",
+    ]:
+        assert tracker._parse_line(line) is None
+
+    assert tracker.online["steve"]["chat_messages"] == 2
+    assert "alex" not in tracker.online
+
+
+def test_paper_log_sessions_across_midnight(database, tmp_path):
+    tracker = tracker_for("paper.log", tmp_path, datetime(2026, 3, 2, 0, 12))
+    asyncio.run(tracker._poll())
+
+    assert sessions() == [
+        ("Steve", datetime(2026, 3, 1, 23, 58, 40), datetime(2026, 3, 2, 0, 10), "quit", "Disconnected", 2),
+        ("Alex", datetime(2026, 3, 2, 0, 0, 31), datetime(2026, 3, 2, 0, 1), "kick", "Spamming", 0),
+        ("Alex", datetime(2026, 3, 2, 0, 11), datetime(2026, 3, 2, 0, 12), "shutdown", None, 0),
+    ]
+    db = SessionLocal()
+    steve = db.query(PlayerSession).filter(PlayerSession.name == "Steve").one()
+    db.close()
+    assert (steve.uuid, steve.ip_address, steve.duration_seconds) == (
+        "8667ba71-b85a-4004-af54-457a9734eed7", "203.0.113.5", 680
+    )
+
+
+def test_vanilla_log_closes_sessions_left_open_by_a_crash(database, tmp_path):
+    tracker = tracker_for("vanilla.log", tmp_path, datetime(2026, 3, 1, 10, 30))
+    asyncio.run(tracker._poll())
+
+    assert [row[:5] for row in sessions()] == [
+        ("Steve", datetime(2026, 3, 1, 10, 1), datetime(2026, 3, 1, 10, 2), "kick",
+         "You are banned from this server."),
+        ("Alex", datetime(2026, 3, 1, 10, 3), datetime(2026, 3, 1, 10, 4), "crash", None),
+    ]
+    assert tracker.online == {}
+
+
+def test_rereading_the_log_does_not_duplicate_sessions(database, tmp_path):
+    modified = datetime(2026, 3, 2, 0, 12)
+    asyncio.run(tracker_for("paper.log", tmp_path, modified)._poll())
+    first = sessions()
+
+    # Un reinicio de la aplicación vuelve a leer el mismo latest.log
+    asyncio.run(tracker_for("paper.log", tmp_path, modified)._poll())
+    assert sessions() == first
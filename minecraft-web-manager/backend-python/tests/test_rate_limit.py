@@ -0,0 +1,55 @@
+"""Tests del límite de intentos de login"""
+import pytest
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import LoginRateLimiter
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 10)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_USER", 3)
+    return LoginRateLimiter()
+
+
+def fail(limiter, ip, username, times):
+    for _ in range(times):
+        assert limiter.check(ip, username) == 0
+        limiter.failed(ip, username)
+
+
+def test_failures_lock_the_user_only_from_that_ip(limiter):
+    fail(limiter, "198.51.100.9", "admin", 3)
+
+    assert limiter.check("198.51.100.9", "Admin ") > 0
+    assert limiter.check("203.0.113.1", "admin") == 0
+
+
+def test_success_resets_only_that_ip(limiter):
+    fail(limiter, "198.51.100.9", "admin", 2)
+    fail(limiter, "203.0.113.1", "admin", 2)
+    limiter.succeeded("203.0.113.1", "admin")
+
+    fail(limiter, "203.0.113.1", "admin", 2)
+    limiter.failed("198.51.100.9", "admin")
+    assert limiter.check("198.51.100.9", "admin") > 0
+    assert limiter.check("203.0.113.1", "admin") == 0
+
+
+def test_per_ip_limit_counts_every_attempt(limiter):
+    for number in range(10):
+        assert limiter.check("198.51.100.9", f"user{number}") == 0
+
+    assert limiter.check("198.51.100.9", "admin") > 0
+    assert limiter.stats == {"allowed": 10, "blocked": 1}
+
+
+def test_window_expiry(limiter, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    fail(limiter, "198.51.100.9", "admin", 3)
+    assert limiter.check("198.51.100.9", "admin") == pytest.approx(settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)
+
+    now[0] += settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+    assert limiter.check("198.51.100.9", "admin") == 0
@@ -0,0 +1,299 @@
+"""Tests de los destinos remotos contra un S3 falso local"""
+import asyncio
+import hashlib
+import hmac
+import os
+import re
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import pytest
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.backup_history import BackupHistory
+from app.services.backup_service import backup_service
+from app.services.storage_targets import S3Target, SFTPTarget, StorageTarget
+
+ACCESS_KEY = "test-access"
+SECRET_KEY = "test-secret-key"
+REGION = "eu-test-1"
+MB = 1024 * 1024
+
+
+def expected_signature(method, path, query, headers, signed_names, amz_date):
+    """Firma SigV4 calculada de forma independiente a S3Target"""
+    canonical_query = "&".join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(query)
+    )
+    canonical_headers = "".join(f"{name}:{headers[name].strip()}\n" for name in signed_names)
+    canonical_request = "\n".join([
+        method, path, canonical_query, canonical_headers,
+        ";".join(signed_names), headers["x-amz-content-sha256"]
+    ])
+    scope = f"{amz_date[:8]}/{REGION}/s3/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    key = ("AWS4" + SECRET_KEY).encode()
+    for part in (amz_date[:8], REGION, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+class FakeS3:
+    """Servidor S3 mínimo: multipart, PUT simple y abort, con fallos inyectables"""
+
+    def __init__(self):
+        self.requests = []
+        self.parts = {}
+        self.objects = {}
+        self.aborted = []
+        self.fail = {}  # partNumber -> nº de respuestas 500 antes de aceptar
+        self.bad_signatures = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                url = urlsplit(self.path)
+                query = parse_qsl(url.query, keep_blank_values=True)
+                params = dict(query)
+                body = self.rfile.read(int(self.headers.get("content-length") or 0))
+                headers = {k.lower(): v for k, v in self.headers.items()}
+
+                auth = headers.get("authorization", "")
+                signed_names = auth.split("SignedHeaders=")[1].split(",")[0].split(";")
+                signature = auth.split("Signature=")[1]
+                valid = (
+                    auth.startswith(f"AWS4-HMAC-SHA256 Credential={ACCESS_KEY}/")
+                    and headers["x-amz-content-sha256"] == hashlib.sha256(body).hexdigest()
+                    and signature == expected_signature(
+                        self.command, url.path, query, headers, signed_names, headers["x-amz-date"]
+                    )
+                )
+                fake.requests.append((self.command, params.get("partNumber")))
+                if not valid:
+                    fake.bad_signatures += 1
+                    return self._reply(403, b"<Error><Code>SignatureDoesNotMatch</Code></Error>")
+
+                if self.command == "POST" and "uploads" in params:
+                    return self._reply(200, b"<InitiateMultipartUploadResult><UploadId>up-1</UploadId>"
+                                            b"</InitiateMultipartUploadResult>")
+                if self.command == "PUT" and "partNumber" in params:
+                    number = int(params["partNumber"])
+                    if fake.fail.get(number, 0) > 0:
+                        fake.fail[number] -= 1
+                        return self._reply(500, b"<Error><Code>InternalError</Code></Error>")
+                    fake.parts[number] = body
+                    return self._reply(200, b"", {"ETag": f'"etag-{number}"'})
+                if self.command == "POST" and "uploadId" in params:
+                    fake.complete_body = body.decode()
+                    order = [int(n) for n in re.findall(r"<PartNumber>(\d+)</PartNumber>", fake.complete_body)]
+                    fake.objects[url.path] = b"".join(fake.parts[n] for n in order)
+                    return self._reply(200, b"<CompleteMultipartUploadResult/>")
+                if self.command == "DELETE" and "uploadId" in params:
+                    fake.aborted.append(params["uploadId"])
+                    return self._reply(204, b"")
+                if self.command == "PUT":
+                    fake.objects[url.path] = body
+                    return self._reply(200, b"")
+                return self._reply(400, b"<Error><Code>BadRequest</Code></Error>")
+
+            def _reply(self, status, body, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_PUT = do_POST = do_DELETE = _handle
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_s3(monkeypatch):
+    server = FakeS3()
+    for name, value in {
+        "BACKUP_S3_ENDPOINT": server.endpoint,
+        "BACKUP_S3_BUCKET": "backups",
+        "BACKUP_S3_ACCESS_KEY": ACCESS_KEY,
+        "BACKUP_S3_SECRET_KEY": SECRET_KEY,
+        "BACKUP_S3_REGION": REGION,
+        "BACKUP_S3_PREFIX": "mc",
+        "BACKUP_UPLOAD_PART_MB": 5,
+        "BACKUP_UPLOAD_CONCURRENCY": 3,
+        "BACKUP_UPLOAD_RETRIES": 3,
+        "BACKUP_UPLOAD_MAX_MBPS": 0,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+    # Sin esperas entre reintentos
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay, *args: real_sleep(0))
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "world-20260301-030000.tar.gz"
+    path.write_bytes(os.urandom(12 * MB))
+    return path
+
+
+def test_storage_target_is_abstract():
+    with pytest.raises(TypeError):
+        StorageTarget()
+
+
+def test_multipart_upload_signs_requests_and_orders_parts(fake_s3, archive):
+    fake_s3.fail = {2: 1}  # la parte 2 falla una vez y se reintenta
+    result = asyncio.run(S3Target().upload(archive, archive.name))
+
+    assert result["uri"] == f"s3://backups/mc/{archive.name}"
+    assert fake_s3.bad_signatures == 0
+    assert sorted(fake_s3.parts) == [1, 2, 3]
+    assert [r for r in fake_s3.requests if r == ("PUT", "2")] == [("PUT", "2"), ("PUT", "2")]
+    assert re.findall(r"<PartNumber>(\d+)</PartNumber><ETag>\"etag-(\d+)\"</ETag>", fake_s3.complete_body) == [
+        ("1", "1"), ("2", "2"), ("3", "3")
+    ]
+    assert fake_s3.objects[f"/backups/mc/{archive.name}"] == archive.read_bytes()
+    assert fake_s3.aborted == []
+
+
+def test_multipart_upload_aborts_when_a_part_keeps_failing(fake_s3, archive):
+    fake_s3.fail = {3: 10}
+    with pytest.raises(RuntimeError):
+        asyncio.run(S3Target().upload(archive, archive.name))
+
+    assert fake_s3.requests.count(("PUT", "3")) == 3
+    assert fake_s3.aborted == ["up-1"]
+    assert fake_s3.objects == {}
+
+
+def test_small_file_uses_single_signed_put(fake_s3, tmp_path):
+    path = tmp_path / "config-20260301-030000.tar.gz"
+    path.write_bytes(b"x" * 1000)
+    asyncio.run(S3Target().upload(path, path.name))
+
+    assert fake_s3.requests == [("PUT", None)]
+    assert fake_s3.bad_signatures == 0
+    assert fake_s3.objects[f"/backups/mc/{path.name}"] == b"x" * 1000
+
+
+def test_upload_backup_records_remote_uri(database, fake_s3, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BACKUP_REMOTE_TARGET", "s3")
+    path = tmp_path / "world-20260301-030000.tar.gz"
+    path.write_bytes(b"data")
+    db = SessionLocal()
+    row = BackupHistory(filename=path.name, type="world", path=str(path), status="completed")
+    db.add(row)
+    db.commit()
+    backup_id = row.id
+    db.close()
+
+    result = asyncio.run(backup_service.upload_backup(backup_id))
+
+    assert result["success"] is True
+    db = SessionLocal()
+    row = db.query(BackupHistory).filter(BackupHistory.id == backup_id).first()
+    assert row.remote_uri == f"s3://backups/mc/{path.name}"
+    assert row.uploaded_at is not None
+    db.close()
+
+
+class FakeSFTP:
+    """Cliente SFTP de asyncssh sobre un directorio local"""
+
+    def __init__(self, root):
+        self.root = root
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def _local(self, remote):
+        return self.root / remote.lstrip("/")
+
+    async def makedirs(self, path, exist_ok=False):
+        self._local(path).mkdir(parents=True, exist_ok=exist_ok)
+
+    async def put(self, local, remote, **kwargs):
+        self.calls.append("put")
+        self._local(remote).write_bytes(open(local, "rb").read())
+
+    def open(self, remote, mode):
+        self.calls.append("open")
+        sftp = self
+
+        class RemoteFile:
+            async def __aenter__(self):
+                self.file = open(sftp._local(remote), mode)
+                return self
+
+            async def __aexit__(self, *exc):
+                self.file.close()
+
+            async def write(self, data):
+                self.file.write(data)
+
+        return RemoteFile()
+
+    async def posix_rename(self, old, new):
+        self._local(old).rename(self._local(new))
+
+
+@pytest.fixture
+def fake_sftp(tmp_path, monkeypatch):
+    sftp = FakeSFTP(tmp_path / "remote")
+    sftp.root.mkdir()
+
+    class Connection:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def start_sftp_client(self):
+            return sftp
+
+    monkeypatch.setitem(sys.modules, "asyncssh", types.SimpleNamespace(connect=lambda *a, **kw: Connection()))
+    monkeypatch.setattr(settings, "BACKUP_SFTP_PATH", "/backups")
+    return sftp
+
+
+@pytest.mark.parametrize("max_mbps, call", [(0, "put"), (5, "open")])
+def test_sftp_upload_honours_the_bandwidth_cap(fake_sftp, archive, monkeypatch, max_mbps, call):
+    monkeypatch.setattr(settings, "BACKUP_UPLOAD_MAX_MBPS", max_mbps)
+    target = SFTPTarget()
+    consumed = []
+
+    async def consume(size):
+        consumed.append(size)
+
+    monkeypatch.setattr(target.limiter, "consume", consume)
+    result = asyncio.run(target.upload(archive, "world/" + archive.name))
+
+    assert fake_sftp.calls == [call]
+    assert sum(consumed) == (archive.stat().st_size if max_mbps else 0)
+    uploaded = fake_sftp.root / "backups" / "world" / archive.name
+    assert uploaded.read_bytes() == archive.read_bytes()
+    assert result["uri"] == f"sftp://{settings.BACKUP_SFTP_HOST}/backups/world/{archive.name}"
@@ -0,0 +1,114 @@
+"""Tests de la caché de usuarios autenticados"""
+import pytest
+
+from app.core import user_cache as cache_module
+from app.core.user_cache import UserCache, user_cache
+from app.db.session import SessionLocal
+from app.models.user import User
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def stored_user(database):
+    db = SessionLocal()
+    try:
+        user = User(username="admin", password_hash="x", role="admin")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        user_cache.clear()
+        user_cache.put("token-a", user)
+        user_cache.put("token-b", user)
+        return user.id
+    finally:
+        db.close()
+
+
+def test_hit_and_miss(clock):
+    cache = UserCache(10, 60)
+    assert cache.get("token") is None
+    cache.put("token", User(id=1, username="admin", role="admin"))
+
+    cached = cache.get("token")
+    assert cached.username == "admin"
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "invalidations": 0, "entries": 1}
+
+
+def test_entries_expire_with_the_ttl_or_the_token(clock):
+    cache = UserCache(10, 60)
+    user = User(id=1, username="admin", role="admin")
+    cache.put("short-token", user, token_exp=clock[0] + 5)
+    cache.put("long-token", user, token_exp=clock[0] + 3600)
+
+    clock[0] += 6
+    assert cache.get("short-token") is None
+    assert cache.get("long-token") is not None
+
+    clock[0] += 55
+    assert cache.get("long-token") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = UserCache(2, 60)
+    for token in ("a", "b"):
+        cache.put(token, User(id=1, username="admin", role="admin"))
+    cache.get("a")
+    cache.put("c", User(id=2, username="mod", role="moderator"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_role_change_invalidates_on_commit(stored_user):
+    db = SessionLocal()
+    try:
+        db.get(User, stored_user).role = "viewer"
+        db.flush()
+        # Sin commit el cambio no es visible: la entrada sigue siendo válida
+        assert user_cache.get("token-a") is not None
+
+        db.commit()
+        assert user_cache.get("token-a") is None
+        assert user_cache.get("token-b") is None
+    finally:
+        db.close()
+
+
+def test_rolled_back_change_keeps_the_entry(stored_user):
+    db = SessionLocal()
+    try:
+        db.get(User, stored_user).role = "viewer"
+        db.flush()
+        db.rollback()
+        assert user_cache.get("token-a") is not None
+    finally:
+        db.close()
+
+
+def test_bulk_update_invalidates_on_commit(stored_user):
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == stored_user).update({"role": "viewer"})
+        assert user_cache.get("token-a") is not None
+
+        db.commit()
+        assert user_cache.get("token-a") is None
+    finally:
+        db.close()
+
+
+def test_bulk_delete_invalidates_on_commit(stored_user):
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == stored_user).delete()
+        db.commit()
+        assert user_cache.get("token-a") is None
+    finally:
+        db.close()
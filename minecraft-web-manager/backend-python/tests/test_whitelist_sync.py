@@ -0,0 +1,115 @@
+"""Tests de la sincronización de la whitelist por diferencias"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.services import whitelist_service as whitelist_module
+from app.services.json_list_store import JsonListStore
+from app.services.player_registry import dashed_uuid
+from app.services.whitelist_service import WhitelistService
+
+
+def uuid_of(number: int) -> str:
+    return dashed_uuid(f"{number:032x}")
+
+
+def entries(numbers, prefix="player"):
+    return [{"uuid": uuid_of(n), "name": f"{prefix}{n}"} for n in numbers]
+
+
+@pytest.fixture
+def rcon(monkeypatch):
+    calls = []
+
+    async def execute_batch(commands, progress=None):
+        calls.append(("batch", list(commands)))
+
+    async def whitelist_reload():
+        calls.append(("reload", None))
+
+    monkeypatch.setattr(whitelist_module.rcon_service, "execute_batch", execute_batch)
+    monkeypatch.setattr(whitelist_module.rcon_service, "whitelist_reload", whitelist_reload)
+    monkeypatch.setattr(whitelist_module.server_service, "is_running", lambda: True)
+    return calls
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    async def get_by_uuid(uuid):
+        return None
+
+    async def resolve_uuids(names):
+        return {"alex": {"name": "Alex", "uuid": f"{999:032x}"}}
+
+    monkeypatch.setattr(whitelist_module.player_registry, "get_by_uuid", get_by_uuid)
+    monkeypatch.setattr(whitelist_module.player_service, "resolve_uuids", resolve_uuids)
+
+    service = WhitelistService()
+    service.whitelist = JsonListStore(tmp_path / "whitelist.json")
+    return service
+
+
+def write(service, data):
+    service.whitelist.path.write_text(json.dumps(data))
+
+
+def written(service):
+    return {entry["uuid"]: entry["name"] for entry in json.loads(service.whitelist.path.read_text())}
+
+
+def test_small_diff_is_sent_over_rcon(service, rcon):
+    write(service, entries([1, 2]))
+    desired = entries([1, 3]) + [{"name": "alex"}, {"name": "bad name!"}, {"uuid": "xyz"}]
+
+    result = asyncio.run(service.sync_whitelist(desired))
+
+    assert [e["name"] for e in result["added"]] == ["player3", "Alex"]
+    assert [e["name"] for e in result["removed"]] == ["player2"]
+    assert result["unchanged"] == 1
+    assert result["invalid"] == ["bad name!", "xyz"]
+    assert result["applied"] == "rcon"
+    assert rcon == [("batch", ["whitelist remove player2", "whitelist add player3", "whitelist add Alex"])]
+    assert written(service) == {uuid_of(1): "player1", uuid_of(3): "player3", uuid_of(999): "Alex"}
+
+
+def test_renames_are_pushed_with_a_reload(service, rcon):
+    write(service, entries([1, 2]))
+    desired = entries([1]) + entries([2], prefix="renamed")
+
+    result = asyncio.run(service.sync_whitelist(desired))
+
+    assert [e["name"] for e in result["renamed"]] == ["renamed2"]
+    assert result["applied"] == "reload"
+    assert rcon == [("reload", None)]
+    assert written(service)[uuid_of(2)] == "renamed2"
+
+
+def test_dry_run_does_not_touch_file_or_server(service, rcon):
+    write(service, entries([1]))
+    result = asyncio.run(service.sync_whitelist(entries([2]), dry_run=True))
+
+    assert result["applied"] is None
+    assert (len(result["added"]), len(result["removed"])) == (1, 1)
+    assert rcon == []
+    assert written(service) == {uuid_of(1): "player1"}
+
+
+def test_large_sync_uses_one_write_and_one_reload(service, rcon):
+    # Escala de la descripción original: 5000 deseadas, 3000 altas, 1000 bajas
+    write(service, entries(range(0, 3000)))
+    writes = []
+    original_write = service.whitelist._write
+    service.whitelist._write = lambda data: writes.append(len(data)) or original_write(data)
+    desired = entries(range(1000, 3000)) + entries(range(3000, 6000))
+
+    started = time.perf_counter()
+    result = asyncio.run(service.sync_whitelist(desired))
+    elapsed = time.perf_counter() - started
+
+    assert (len(result["added"]), len(result["removed"]), result["unchanged"]) == (3000, 1000, 2000)
+    assert writes == [5000]
+    assert rcon == [("reload", None)]
+    # Cota holgada: la diferencia es O(n) y no hay consultas por entrada
+    assert elapsed < 2.0